@@ -1,4 +1,5 @@
-from app import app
+from app import app, startup
 
 if __name__ == '__main__':
+    startup()
     app.run(debug=True)
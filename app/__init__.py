@@ -1,37 +1,29 @@
-from flask import Flask
-from .routes import home, login, register, userprofile, get_user_data, purchase_plan, purchase_form, logout, interpreter, delete_account, reset_password, reset_with_token, reset_password_link, pricing, get_plan_price, get_plans, generate_reset_token
-from .database import init_db
-from flask_socketio import SocketIO
-from .models import websocket_index, handle_image
+"""
+Package: app
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'AEH'
-socketio = SocketIO(app)
+Sign Language Interpreter web application.
 
-# Adding URL rules for the initial routes
-app.add_url_rule('/', view_func=home)
-app.add_url_rule('/login', view_func=login, methods=['GET', 'POST'])
-app.add_url_rule('/register', view_func=register, methods=['GET', 'POST'])
-app.add_url_rule('/userprofile', view_func=userprofile, methods=['GET'])
-app.add_url_rule('/get-user-data', view_func=get_user_data, methods=['GET'])
-app.add_url_rule('/purchase_form', view_func=purchase_form, methods=['GET'])
-app.add_url_rule('/purchase_plan', view_func=purchase_plan, methods=['POST'])
-app.add_url_rule('/logout', view_func=logout, methods=['GET'])
-app.add_url_rule('/sli', view_func=interpreter)
-app.add_url_rule('/pricing', view_func=pricing)
-app.add_url_rule('/websocket', view_func=websocket_index)
-app.add_url_rule('/delete_account', view_func=delete_account, methods=['POST'])
-app.add_url_rule('/reset_password', view_func=reset_password, methods=['POST'])
-app.add_url_rule('/reset_password_link', view_func=reset_password_link, methods=['POST'])
-app.add_url_rule('/reset/<token>', view_func=reset_with_token, methods=['GET', 'POST'])
-app.add_url_rule('/get-plans', view_func=get_plans, methods=['GET'])
-app.add_url_rule('/get-plan-price/<plan_name>', view_func=get_plan_price, methods=['GET'])
-app.add_url_rule('/generate_reset_token', view_func=generate_reset_token, methods=['GET', 'POST'])
-# Initialize the database
-init_db()
+The Flask application and the Socket.IO server are built by ``app.server`` on first access of
+``app.app`` or ``app.socketio``, and ``app.startup()`` prepares a serving process. The migration command, the training scripts and the inference
+service import only the modules they need, without the routes, the database pool or the model
+of the web tier.
+"""
 
-# Adding SocketIO event handler
-socketio.on_event('image', handle_image)
+# Attributes built by app.server on first access
+_SERVER_ATTRIBUTES = ('app', 'socketio', 'startup')
 
-if __name__ == '__main__':
-    socketio.run(app, debug=True)
+
+def __getattr__(name):
+    """
+    Import the web application on first access of one of its attributes.
+
+    Args:
+        name (str): The attribute name.
+
+    Returns:
+        object: The attribute of ``app.server``.
+    """
+    if name in _SERVER_ATTRIBUTES:
+        from . import server
+        return getattr(server, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
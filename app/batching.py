@@ -0,0 +1,184 @@
+"""
+Module: batching
+
+This module contains the inference scheduler that groups landmark vectors coming from all
+connected Socket.IO sessions into a single forward pass of the gesture recognition model.
+
+A request is queued together with a future. A background thread takes the oldest request,
+waits until either the batch is full or the oldest request has waited for the configured
+deadline, runs one forward pass on the stacked batch and resolves every future with its own
+row of the output, so each handler can send the result back to its own socket.
+
+Classes:
+    - InferenceBatcher: Collects landmark vectors into batches and runs the model on them.
+
+Dependencies:
+    - NumPy
+    - threading
+    - queue
+    - concurrent.futures
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class InferenceBatcher:
+    """
+    Cross-session micro-batching scheduler for model inference.
+
+    Args:
+        predict_fn (callable): Function taking a 2-D array of shape (batch, features) and
+            returning an array of shape (batch, classes).
+        max_batch_size (int): Number of vectors that triggers an immediate flush.
+        max_wait_ms (float): Maximum time in milliseconds the oldest queued vector waits
+            before the batch is flushed.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'batches': 0,
+            'items': 0,
+            'max_batch_size': 0,
+            'flush_full': 0,
+            'flush_deadline': 0,
+            'errors': 0,
+            'queue_wait_total_ms': 0.0,
+            'queue_wait_max_ms': 0.0,
+        }
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, vector):
+        """
+        Queue a single landmark vector for inference.
+
+        Args:
+            vector (np.ndarray): A 1-D feature vector or a 2-D array with one row.
+
+        Returns:
+            Future: Resolves to the 1-D output row of the model for this vector.
+        """
+        if self._closed:
+            raise RuntimeError("InferenceBatcher is closed.")
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(vector, dtype=np.float32).reshape(-1), time.monotonic(), future))
+        return future
+
+    def predict(self, vector, timeout=None):
+        """
+        Queue a landmark vector and block until its prediction is available.
+
+        Args:
+            vector (np.ndarray): A 1-D feature vector or a 2-D array with one row.
+            timeout (float, optional): Maximum number of seconds to wait for the result.
+
+        Returns:
+            np.ndarray: The 1-D output row of the model for this vector.
+        """
+        return self.submit(vector).result(timeout=timeout)
+
+    def stats(self):
+        """
+        Return a snapshot of the batching counters.
+
+        Returns:
+            dict: Number of batches and items, flush reasons, batch size and queue wait figures.
+        """
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        batches = snapshot['batches']
+        items = snapshot['items']
+        snapshot['mean_batch_size'] = items / batches if batches else 0.0
+        snapshot['mean_queue_wait_ms'] = snapshot['queue_wait_total_ms'] / items if items else 0.0
+        snapshot['queue_depth'] = self._queue.qsize()
+        return snapshot
+
+    def close(self):
+        """
+        Stop the background thread after the already queued vectors have been served.
+        """
+        self._closed = True
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join()
+
+    def _ensure_worker(self):
+        """
+        Start the background thread on first use.
+        """
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='inference-batcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """
+        Main loop of the background thread: collect a batch, then run it.
+        """
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = first[1] + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch):
+        """
+        Run one forward pass on a batch and resolve the futures of its requests.
+
+        Args:
+            batch (list): Queued (vector, enqueued_at, future) tuples.
+        """
+        started = time.monotonic()
+        waits = [(started - enqueued_at) * 1000.0 for _, enqueued_at, _ in batch]
+        try:
+            outputs = np.asarray(self.predict_fn(np.stack([vector for vector, _, _ in batch])))
+        except Exception as e:
+            with self._stats_lock:
+                self._stats['errors'] += 1
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._stats_lock:
+            stats = self._stats
+            stats['batches'] += 1
+            stats['items'] += len(batch)
+            stats['max_batch_size'] = max(stats['max_batch_size'], len(batch))
+            if len(batch) >= self.max_batch_size:
+                stats['flush_full'] += 1
+            else:
+                stats['flush_deadline'] += 1
+            stats['queue_wait_total_ms'] += sum(waits)
+            stats['queue_wait_max_ms'] = max(stats['queue_wait_max_ms'], max(waits))
+
+        for row, (_, _, future) in zip(outputs, batch):
+            future.set_result(row)
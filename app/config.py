@@ -0,0 +1,211 @@
+"""
+Module: config
+
+This module collects the tunable settings of the application in one place. Every setting
+has a sensible default and can be overridden with an environment variable of the same name
+prefixed with ``SLI_`` (for example ``SLI_INFERENCE_BATCH_SIZE=64``).
+
+Settings:
+    - DB_BACKEND: Storage backend, 'mysql' or 'sqlite' for an embedded database file.
+    - DB_HOST, DB_USER, DB_PASSWORD, DB_NAME: MySQL server and database of the application.
+    - SQLITE_PATH: Database file of the SQLite backend.
+    - DB_POOL_SIZE: Maximum number of pooled database connections.
+    - DB_CHECKOUT_TIMEOUT: Seconds a request waits for a free database connection.
+    - DB_HEALTH_CHECK_INTERVAL: Idle seconds after which a pooled connection is pinged before use.
+    - PLAN_CACHE_TTL: Seconds the subscription plans are served from memory before they are reloaded.
+    - PAGE_CACHE_TTL: Seconds a rendered home, interpreter or pricing page is served before it is
+      rendered again, 0 disables the page cache.
+    - QUOTA_CONTEXT_TTL: Seconds the quota of a connected socket is kept before it is read again.
+    - QUOTA_RESET_SCHEDULER: Run the daily reset of the recognized sign counts at midnight in this process.
+    - QUOTA_RESET_CHUNK: Maximum number of users reset by one statement of the daily reset.
+    - USAGE_FLUSH_INTERVAL: Maximum seconds recognized sign counts stay in memory before they are written.
+    - USAGE_FLUSH_SIZE: Number of users with pending counts that triggers an early write.
+    - PAYMENT_PAGE_SIZE: Number of payments returned per page of the payment history.
+    - BCRYPT_ROUNDS: bcrypt cost factor of new password hashes, stored hashes are upgraded on login.
+    - HASH_WORKERS: Number of threads running bcrypt.
+    - HASH_QUEUE: Number of password hashing calls waiting for a thread before requests are answered busy.
+    - HASH_TIMEOUT: Seconds a request waits for a password hashing call.
+    - MAIL_TRANSPORT: Delivery of outgoing emails, 'smtp' or 'memory' to keep them in memory.
+    - MAIL_SENDER: From address of outgoing emails.
+    - SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD: SMTP server and login, no login if SMTP_USER is empty.
+    - SMTP_STARTTLS: Upgrade the SMTP connection with STARTTLS.
+    - MAIL_QUEUE_SIZE: Maximum number of emails waiting for delivery.
+    - MAIL_MAX_ATTEMPTS: Delivery attempts of an email before it is dropped.
+    - MAIL_RETRY_BACKOFF: Seconds before the first retry of a failed delivery, doubled for every further retry.
+    - MODEL_PATH: Path to the trained Keras model.
+    - QUANTIZED_MODEL_PATH: Path to the int8 .tflite artifact written by models/quantize_model.py.
+    - INFERENCE_BACKEND: Backend running the model, 'keras', 'numpy' or 'int8'.
+    - MODEL_WARMUP: Load and warm up the model when the application starts, or on the first readiness
+      check without the server entry point; /ready answers 503 until it is done. Otherwise the model is
+      loaded by the first frame.
+    - INFERENCE_BATCH_SIZE: Maximum number of landmark vectors run in one forward pass.
+    - INFERENCE_BATCH_WAIT_MS: Maximum time a vector waits for a batch to fill up.
+    - HANDS_POOL_SIZE: Maximum number of MediaPipe Hands trackers.
+    - HANDS_CHECKOUT_TIMEOUT: Seconds a frame waits for a free tracker.
+    - FRAME_DECODE_MODE: Decode stage ahead of MediaPipe, 'full', 'reduced' or 'resize'.
+    - FRAME_TARGET_LONG_EDGE: Long edge in pixels frames are scaled down to before hand detection.
+    - ROI_TRACKING: Crop each frame to the previous hand box of the session before detection.
+    - ROI_MARGIN: Fraction of the hand box size added on every side of the crop.
+    - ROI_MIN_SIZE: Smallest crop edge in pixels.
+    - MOTION_THRESHOLD: Mean gray level difference below which a frame reuses the last prediction, 0 disables.
+    - MOTION_MAX_SKIPS: Consecutive unchanged frames after which a frame is processed anyway.
+    - FRAME_WORKERS: Number of frame worker processes, 0 processes frames in the web process.
+    - FRAME_SLOTS_PER_WORKER: Number of frames in flight per worker.
+    - FRAME_SLOT_SIZE: Maximum size in bytes of one encoded frame sent to a worker.
+    - FRAME_TIMEOUT: Seconds the web process waits for a worker to process a frame.
+    - INFERENCE_SERVICE: Address of the standalone inference service, 'host:port' or a Unix socket
+      path; empty recognizes frames in the web tier.
+    - INFERENCE_SERVICE_AUTHKEY: Secret key shared by the web processes and the inference service, required
+      with INFERENCE_SERVICE; there is no default.
+    - INFERENCE_SERVICE_CONNECTIONS: Connections of a web process to the inference service.
+
+Dependencies:
+    - os
+"""
+
+import os
+
+
+def env_int(name, default):
+    """
+    Read an integer setting from the environment.
+
+    Args:
+        name (str): The setting name without the ``SLI_`` prefix.
+        default (int): The value used when the variable is not set.
+
+    Returns:
+        int: The configured value.
+    """
+    return int(os.environ.get(f'SLI_{name}', default))
+
+
+def env_float(name, default):
+    """
+    Read a floating point setting from the environment.
+
+    Args:
+        name (str): The setting name without the ``SLI_`` prefix.
+        default (float): The value used when the variable is not set.
+
+    Returns:
+        float: The configured value.
+    """
+    return float(os.environ.get(f'SLI_{name}', default))
+
+
+def env_str(name, default):
+    """
+    Read a string setting from the environment.
+
+    Args:
+        name (str): The setting name without the ``SLI_`` prefix.
+        default (str): The value used when the variable is not set.
+
+    Returns:
+        str: The configured value.
+    """
+    return os.environ.get(f'SLI_{name}', default)
+
+
+def env_bool(name, default):
+    """
+    Read a boolean setting from the environment. ``1``, ``true``, ``yes`` and ``on`` are true.
+
+    Args:
+        name (str): The setting name without the ``SLI_`` prefix.
+        default (bool): The value used when the variable is not set.
+
+    Returns:
+        bool: The configured value.
+    """
+    value = os.environ.get(f'SLI_{name}')
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Storage backend, MySQL database and connection pool
+DB_BACKEND = env_str('DB_BACKEND', 'mysql')
+SQLITE_PATH = env_str('SQLITE_PATH', 'instance/sli.db')
+DB_HOST = env_str('DB_HOST', 'localhost')
+DB_USER = env_str('DB_USER', 'root')
+DB_PASSWORD = env_str('DB_PASSWORD', 'AEHprojekt')
+DB_NAME = env_str('DB_NAME', 'user_auth')
+DB_POOL_SIZE = env_int('DB_POOL_SIZE', 8)
+DB_CHECKOUT_TIMEOUT = env_float('DB_CHECKOUT_TIMEOUT', 5.0)
+DB_HEALTH_CHECK_INTERVAL = env_float('DB_HEALTH_CHECK_INTERVAL', 30.0)
+
+# In-memory subscription plan catalog
+PLAN_CACHE_TTL = env_float('PLAN_CACHE_TTL', 300.0)
+
+# Rendered pages
+PAGE_CACHE_TTL = env_float('PAGE_CACHE_TTL', 300.0)
+
+# Per-connection quota state
+QUOTA_CONTEXT_TTL = env_float('QUOTA_CONTEXT_TTL', 300.0)
+QUOTA_RESET_SCHEDULER = env_bool('QUOTA_RESET_SCHEDULER', True)
+QUOTA_RESET_CHUNK = env_int('QUOTA_RESET_CHUNK', 1000)
+
+# Write-behind metering of recognized signs
+USAGE_FLUSH_INTERVAL = env_float('USAGE_FLUSH_INTERVAL', 1.0)
+USAGE_FLUSH_SIZE = env_int('USAGE_FLUSH_SIZE', 100)
+
+# Payment history of the user profile
+PAYMENT_PAGE_SIZE = env_int('PAYMENT_PAGE_SIZE', 20)
+
+# Password hashing service
+BCRYPT_ROUNDS = env_int('BCRYPT_ROUNDS', 12)
+HASH_WORKERS = env_int('HASH_WORKERS', 2)
+HASH_QUEUE = env_int('HASH_QUEUE', 16)
+HASH_TIMEOUT = env_float('HASH_TIMEOUT', 5.0)
+
+# Outbox of outgoing emails
+MAIL_TRANSPORT = env_str('MAIL_TRANSPORT', 'smtp')
+MAIL_SENDER = env_str('MAIL_SENDER', 'your_email@example.com')
+SMTP_HOST = env_str('SMTP_HOST', 'smtp.gmail.com')
+SMTP_PORT = env_int('SMTP_PORT', 587)
+SMTP_USER = env_str('SMTP_USER', 'your_email@example.com')
+SMTP_PASSWORD = env_str('SMTP_PASSWORD', 'your_email_password')
+SMTP_STARTTLS = env_bool('SMTP_STARTTLS', True)
+MAIL_QUEUE_SIZE = env_int('MAIL_QUEUE_SIZE', 1000)
+MAIL_MAX_ATTEMPTS = env_int('MAIL_MAX_ATTEMPTS', 5)
+MAIL_RETRY_BACKOFF = env_float('MAIL_RETRY_BACKOFF', 2.0)
+
+# Gesture recognition model
+MODEL_PATH = env_str('MODEL_PATH', 'models/final_model/final_model.h5')
+QUANTIZED_MODEL_PATH = env_str('QUANTIZED_MODEL_PATH', 'models/quantized_model/quantized_model.tflite')
+INFERENCE_BACKEND = env_str('INFERENCE_BACKEND', 'keras')
+MODEL_WARMUP = env_bool('MODEL_WARMUP', True)
+
+# Micro-batching of model inference across Socket.IO sessions
+INFERENCE_BATCH_SIZE = env_int('INFERENCE_BATCH_SIZE', 32)
+INFERENCE_BATCH_WAIT_MS = env_float('INFERENCE_BATCH_WAIT_MS', 5.0)
+
+# Per-session MediaPipe Hands trackers
+HANDS_POOL_SIZE = env_int('HANDS_POOL_SIZE', 8)
+HANDS_CHECKOUT_TIMEOUT = env_float('HANDS_CHECKOUT_TIMEOUT', 5.0)
+
+# Decode stage ahead of MediaPipe
+FRAME_DECODE_MODE = env_str('FRAME_DECODE_MODE', 'reduced')
+FRAME_TARGET_LONG_EDGE = env_int('FRAME_TARGET_LONG_EDGE', 320)
+
+# Hand-ROI tracking mode
+ROI_TRACKING = env_bool('ROI_TRACKING', True)
+ROI_MARGIN = env_float('ROI_MARGIN', 0.5)
+ROI_MIN_SIZE = env_int('ROI_MIN_SIZE', 96)
+
+# Motion-gated frame skipping
+MOTION_THRESHOLD = env_float('MOTION_THRESHOLD', 4.0)
+MOTION_MAX_SKIPS = env_int('MOTION_MAX_SKIPS', 30)
+
+# Frame-processing worker processes
+FRAME_WORKERS = env_int('FRAME_WORKERS', 0)
+FRAME_SLOTS_PER_WORKER = env_int('FRAME_SLOTS_PER_WORKER', 4)
+FRAME_SLOT_SIZE = env_int('FRAME_SLOT_SIZE', 1 << 20)
+FRAME_TIMEOUT = env_float('FRAME_TIMEOUT', 10.0)
+
+# Standalone inference service
+INFERENCE_SERVICE = env_str('INFERENCE_SERVICE', '')
+INFERENCE_SERVICE_AUTHKEY = env_str('INFERENCE_SERVICE_AUTHKEY', '')
+INFERENCE_SERVICE_CONNECTIONS = env_int('INFERENCE_SERVICE_CONNECTIONS', 4)
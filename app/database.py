@@ -4,14 +4,24 @@ Module: database_initialization
 This module contains functions for initializing the MySQL database, creating necessary tables,
 and managing user privileges and reset mechanisms.
 
+The database is MySQL, or an embedded SQLite file for single-node deployments (see
+app/sqlite_backend.py), selected by the DB_BACKEND setting. Both backends are used through the
+same connection interface and the same SQL. Connections come from a bounded pool shared by all
+routes and helpers. The database and its tables are created by the schema migrations, not on
+import or on every checkout.
+
 Functions:
-    - create_connection(): Create a database connection.
-    - init_db(): Initialize the MySQL database by creating necessary tables.
+    - connect(): Open a new connection to the application database.
+    - create_connection(): Check out a pooled database connection.
+    - create_database(): Create the application database if it does not exist.
+    - init_db(): Initialize the MySQL database by applying the pending schema migrations.
     - revoke_drop_privileges(): Revoke DROP privileges from specific users in the database.
-    - reset_recognized_count(): Reset recognized count and last reset for users with Basic and Standard plans.
+    - reset_recognized_count(midnight, chunk_size): Reset recognized count and last reset for users with a daily limit, in chunks.
+    - record_purchase(connection, username, plan_name): Change the plan of a user and record the payment in one transaction.
 
 Dependencies:
     - mysql.connector
+    - sqlite3 (SQLite backend)
     - datetime
 """
 
@@ -19,109 +29,91 @@ import mysql.connector
 from mysql.connector import Error
 from datetime import datetime
 
+from . import config, sqlite_backend
+from .db_pool import ConnectionPool
+
+
+def connect():
+    """
+    Open a new connection to the application database, on the backend selected by DB_BACKEND.
+
+    Returns:
+        connection: MySQL database connection object, or a SQLite connection with the same interface.
+    """
+    if config.DB_BACKEND == 'sqlite':
+        return sqlite_backend.connect(config.SQLITE_PATH, busy_timeout=config.DB_CHECKOUT_TIMEOUT)
+    return mysql.connector.connect(
+        host=config.DB_HOST,
+        database=config.DB_NAME,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD
+    )
+
+
+# Connections shared by all routes and helpers
+db_pool = ConnectionPool(
+    connect,
+    max_size=config.DB_POOL_SIZE,
+    checkout_timeout=config.DB_CHECKOUT_TIMEOUT,
+    health_check_interval=config.DB_HEALTH_CHECK_INTERVAL)
+
+
 def create_connection():
     """
-    Function to create a database connection.
+    Function to check out a database connection from the pool.
+
+    Calling close() on the returned connection gives it back to the pool.
 
     Returns:
-        connection: MySQL database connection object.
+        connection: Pooled MySQL database connection object, or None if no connection is available.
     """
+    try:
+        return db_pool.checkout()
+    except Error as e:
+        print(f"Error: {e}")
+        return None
+
+
+def create_database():
+    """
+    Create the application database if it does not exist.
+
+    Returns:
+        bool: True if the database exists, False if the server could not be reached.
+    """
+    if config.DB_BACKEND == 'sqlite':
+        return True  # The database file is created by the first connection
     try:
         connection = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='AEHprojekt'
-        )
-        if connection.is_connected():
-            cursor = connection.cursor()
-            cursor.execute("CREATE DATABASE IF NOT EXISTS user_auth")
-            cursor.close()
-            connection.close()
-        connection = mysql.connector.connect(
-            host='localhost',
-            database='user_auth',
-            user='root',
-            password='AEHprojekt'
+            host=config.DB_HOST,
+            user=config.DB_USER,
+            password=config.DB_PASSWORD
         )
-        if connection.is_connected():
-            return connection
+        cursor = connection.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{config.DB_NAME}`")
+        cursor.close()
+        connection.close()
+        return True
     except Error as e:
         print(f"Error: {e}")
-        return None
+        return False
 
 def init_db():
     """
-    Initialize the MySQL database by creating necessary tables.
+    Initialize the MySQL database by applying the pending schema migrations.
+
+    The tables are defined by the migrations in app/migrations.py, which are normally applied
+    with ``python -m app.migrations`` before the application starts.
     """
-    connection = create_connection()
-    if connection is None:
-        print("Failed to connect to the database.")
-        return
-    cursor = connection.cursor()
-    
-    # Create subscription_plan table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS subscription_plan (
-            plan_id INT AUTO_INCREMENT PRIMARY KEY,
-            plan_name VARCHAR(255) NOT NULL,
-            daily_limit INT,
-            price DOUBLE,
-            UNIQUE (plan_name)   
-        )
-    ''')
-    
-    # Insert three plans into subscription_plan table using INSERT IGNORE
-    cursor.execute('''
-        INSERT IGNORE INTO subscription_plan (plan_name, daily_limit, price) VALUES
-        ('Basic', 25, 0),
-        ('Standard', 250, 19.99),
-        ('Unlimited', NULL, 49.99)
-    ''')
-    
-    # Create users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            username VARCHAR(255) NOT NULL,
-            email VARCHAR(255) NOT NULL,
-            password VARCHAR(255) NOT NULL,
-            name VARCHAR(255),
-            surname VARCHAR(255),
-            plan_name VARCHAR(255),
-            recognized_count INT,       
-            last_reset datetime,
-            UNIQUE (username),
-            UNIQUE (email),
-            reset_token VARCHAR(255),
-            FOREIGN KEY (plan_name) REFERENCES subscription_plan(plan_name)
-        )
-    ''')
-    
-    # Insert aehuser user into users table using INSERT IGNORE
-    cursor.execute('''
-        INSERT IGNORE INTO users (username, email, password, name, surname, plan_name) VALUES
-        ('aehuser', 'aehuser@aeh.pl', 'Aehuser1', 'Aeh', 'User', 'Unlimited')
-    ''')
-    
-    # Create payments table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS payments (
-            payment_id INT AUTO_INCREMENT PRIMARY KEY,
-            user_id INT NOT NULL,
-            payment_date date,
-            amount double,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    ''')
-    
-    connection.commit()
-    cursor.close()
-    connection.close()
+    from .migrations import migrate  # Imported here, the migrations use the connections of this module
+    migrate()
 
 def revoke_drop_privileges():
     """
-    Revoke DROP privileges from specific users in the database.
+    Revoke DROP privileges from specific users in the database. MySQL only, SQLite has no users.
     """
+    if config.DB_BACKEND == 'sqlite':
+        return
     connection = create_connection()
     if connection is None:
         print("Failed to connect to the database.")
@@ -146,31 +138,79 @@ def revoke_drop_privileges():
         cursor.close()
         connection.close()
 
-def reset_recognized_count():
+def reset_recognized_count(midnight=None, chunk_size=1000):
     """
-    Reset recognized count and last reset for users with Basic and Standard plans in the database.
+    Reset recognized count and last reset for users whose plan has a daily limit in the database.
+
+    The users are updated in chunks of at most ``chunk_size`` rows, each committed on its own, so
+    no chunk holds row locks on the users table for long. A reset user is not matched again, so
+    an interrupted reset can simply be run again.
+
+    Args:
+        midnight (datetime): Start of the day the counts are reset for, the current day if None.
+        chunk_size (int): Maximum number of users updated per statement.
+
+    Returns:
+        int: Number of users reset, or None if the reset failed.
     """
     connection = create_connection()
     if connection is None:
         print("Failed to connect to the database.")
-        return
+        return None
     cursor = connection.cursor()
     try:
-        now = datetime.now()
-        midnight = datetime.combine(now.date(), datetime.min.time())
-        cursor.execute('''
-            UPDATE users
-            SET recognized_count = 0, last_reset = %s
-            WHERE plan_name IN ('Basic', 'Standard') AND (last_reset IS NULL OR last_reset < %s)
-        ''', (midnight, midnight))
-        connection.commit()
-        print("recognized_count reset and last_reset updated successfully for Basic and Standard plans.")
+        if midnight is None:
+            midnight = datetime.combine(datetime.now().date(), datetime.min.time())
+        reset = 0
+        while True:
+            cursor.execute('''
+                UPDATE users
+                SET recognized_count = 0, last_reset = %s
+                WHERE plan_name IN (SELECT plan_name FROM subscription_plan WHERE daily_limit IS NOT NULL)
+                  AND (last_reset IS NULL OR last_reset < %s)
+                LIMIT %s
+            ''', (midnight, midnight, chunk_size))
+            connection.commit()
+            reset += cursor.rowcount
+            if cursor.rowcount < chunk_size:
+                break
+        print(f"recognized_count reset and last_reset updated successfully for {reset} users.")
+        return reset
     except Error as e:
         print(f"Error: {e}")
+        return None
     finally:
         cursor.close()
         connection.close()
 
+def record_purchase(connection, username, plan_name):
+    """
+    Change the plan of a user and record the payment in one transaction.
+
+    Calls the purchase_plan stored procedure installed by the schema migrations, which takes
+    two round trips: one setting the arguments and one running the procedure.
+
+    Args:
+        connection: Database connection.
+        username (str): The buying user.
+        plan_name (str): The plan bought.
+
+    Returns:
+        tuple: (status, amount). status is 'purchased', 'user_not_found', 'current_plan_not_found',
+        'plan_not_found' or 'same_plan'; amount is the price paid, None unless purchased.
+
+    Raises:
+        Error: If the procedure failed, in which case nothing was written.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.callproc('purchase_plan', (username, plan_name))
+        for result in cursor.stored_results():
+            return result.fetchone()
+        raise Error("The purchase_plan procedure returned no result.")
+    finally:
+        cursor.close()
+
 if __name__ == "__main__":
     init_db()
     revoke_drop_privileges()
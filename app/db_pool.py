@@ -0,0 +1,277 @@
+"""
+Module: db_pool
+
+This module contains a bounded pool of database connections.
+
+Opening a MySQL connection costs a TCP handshake, authentication and session setup. The pool
+keeps up to a fixed number of open connections and hands them out to requests, so a request
+only pays for its queries. Connections that sat idle for longer than the health check interval
+are pinged before they are handed out and replaced when the server dropped them.
+
+Classes:
+    - ConnectionPool: Bounded pool of database connections with a checkout timeout and health checks.
+    - PooledConnection: Connection checked out of the pool, returned to it by ``close()``.
+
+Dependencies:
+    - mysql.connector
+    - threading
+    - contextlib
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from mysql.connector import Error
+from mysql.connector.errors import InterfaceError, OperationalError, PoolError
+
+
+class PooledConnection:
+    """
+    Connection checked out of a ConnectionPool.
+
+    Behaves like the underlying connection, except that ``close()`` gives it back to the pool
+    instead of closing it. It can also be used as a context manager.
+
+    Args:
+        pool (ConnectionPool): The pool the connection belongs to.
+        connection: The underlying database connection.
+    """
+
+    __slots__ = ('_pool', '_connection')
+
+    def __init__(self, pool, connection):
+        self._pool = pool
+        self._connection = connection
+
+    def __getattr__(self, name):
+        connection = self._connection
+        if connection is None:
+            raise InterfaceError("Connection was returned to the pool.")
+        return getattr(connection, name)
+
+    def close(self):
+        """
+        Give the connection back to the pool. Closing it twice has no effect.
+        """
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            self._pool.checkin(connection)
+
+    def discard(self):
+        """
+        Close the underlying connection and free its place in the pool, for example after the
+        server dropped it.
+        """
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            self._pool.checkin(connection, discard=True)
+
+    def __del__(self):
+        # A connection that was never closed, for example after an exception, must not leak its place
+        if self._connection is not None:
+            self.discard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if isinstance(exc_value, (InterfaceError, OperationalError)):
+            self.discard()
+        else:
+            self.close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of database connections.
+
+    Connections are opened on demand up to ``max_size``. When all of them are checked out, a
+    checkout waits for one to be returned.
+
+    Args:
+        connect (callable): Function opening a new database connection.
+        max_size (int): Maximum number of open connections.
+        checkout_timeout (float): Seconds a checkout waits for a connection before giving up.
+        health_check_interval (float): Idle seconds after which a connection is pinged before
+            it is handed out.
+    """
+
+    def __init__(self, connect, max_size=8, checkout_timeout=5.0, health_check_interval=30.0):
+        self.connect = connect
+        self.max_size = max(1, int(max_size))
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self._cond = threading.Condition()
+        self._idle = []  # (connection, returned_at), most recently returned last
+        self._size = 0
+        self._in_use = 0
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'discarded': 0,
+            'health_checks': 0,
+            'waits': 0,
+            'wait_total_ms': 0.0,
+            'timeouts': 0,
+            'peak_in_use': 0,
+        }
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager checking out a connection for the duration of the block.
+
+        Yields:
+            PooledConnection: The checked out connection.
+
+        Raises:
+            PoolError: If no connection became available within the checkout timeout.
+            Error: If a new connection could not be opened.
+        """
+        connection = self.checkout()
+        with connection:
+            yield connection
+
+    def checkout(self):
+        """
+        Check out a connection, opening a new one if the pool may still grow.
+
+        Returns:
+            PooledConnection: The checked out connection. ``close()`` returns it to the pool.
+
+        Raises:
+            PoolError: If no connection became available within the checkout timeout.
+            Error: If a new connection could not be opened.
+        """
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+        waited = False
+        attempt = 0
+        while True:
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolError("No database connection available.")
+                    waited = True
+                    self._cond.wait(remaining)
+                self._checked_out(started, waited, count=attempt == 0)
+                attempt += 1
+                if self._idle:
+                    connection, returned_at = self._idle.pop()
+                else:
+                    self._size += 1
+                    connection = returned_at = None
+
+            if connection is None:
+                # Open a new connection outside the lock, the place is already reserved
+                try:
+                    connection = self.connect()
+                except Exception:
+                    self._release_place()
+                    raise
+                with self._cond:
+                    self._stats['created'] += 1
+                return PooledConnection(self, connection)
+
+            if time.monotonic() - returned_at < self.health_check_interval or self._healthy(connection):
+                return PooledConnection(self, connection)
+            # The server dropped the connection, free its place and try again
+            self._close_quietly(connection)
+            self._release_place(discarded=True)
+
+    def checkin(self, connection, discard=False):
+        """
+        Return a connection to the pool.
+
+        An open transaction is rolled back, so the next request does not see its snapshot.
+
+        Args:
+            connection: The underlying database connection.
+            discard (bool): Close the connection instead of keeping it.
+        """
+        if not discard:
+            try:
+                if getattr(connection, 'in_transaction', True):
+                    connection.rollback()
+            except Error:
+                discard = True
+        if discard:
+            self._close_quietly(connection)
+            self._release_place(discarded=True)
+            return
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((connection, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        """
+        Close the idle connections, for example when the process shuts down.
+        """
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def stats(self):
+        """
+        Return a snapshot of the pool counters.
+
+        Returns:
+            dict: Size, utilization, checkouts, waits, timeouts and replaced connections.
+        """
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot['size'] = self._size
+            snapshot['max_size'] = self.max_size
+            snapshot['in_use'] = self._in_use
+            snapshot['idle'] = len(self._idle)
+        snapshot['utilization'] = snapshot['in_use'] / snapshot['max_size']
+        return snapshot
+
+    def _checked_out(self, started, waited, count=True):
+        """
+        Mark a connection as in use and count the checkout. Caller holds the lock.
+        """
+        self._in_use += 1
+        self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._in_use)
+        if not count:
+            return
+        self._stats['checkouts'] += 1
+        if waited:
+            self._stats['waits'] += 1
+            self._stats['wait_total_ms'] += (time.monotonic() - started) * 1000.0
+
+    def _release_place(self, discarded=False):
+        """
+        Free the place of a connection that was not opened or was closed.
+        """
+        with self._cond:
+            self._in_use -= 1
+            self._size -= 1
+            if discarded:
+                self._stats['discarded'] += 1
+            self._cond.notify()
+
+    def _healthy(self, connection):
+        """
+        Ping a connection that sat idle for longer than the health check interval.
+        """
+        with self._cond:
+            self._stats['health_checks'] += 1
+        try:
+            return connection.is_connected()
+        except Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
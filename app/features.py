@@ -0,0 +1,152 @@
+"""
+Module: features
+
+This module contains the landmark feature extraction shared by serving and the training,
+evaluation and export scripts, so the classifier always sees the same input.
+
+A feature vector holds the x, y and z coordinates of the 21 MediaPipe hand landmarks of the
+first detected hand, flattened to 63 float32 values and min-max normalized to [0, 1] over the
+whole vector.
+
+Functions:
+    - landmark_array(hand_landmarks, out): Copy the landmarks of one hand into a (21, 3) array.
+    - normalize(features): Min-max normalize one feature vector or a batch of them in place.
+    - extract_features(results, out): Return the normalized features of one MediaPipe result.
+    - extract_batch(results): Return the normalized features of a batch of MediaPipe results.
+    - process_dataset(dataset_path, labels, hands, limit): Extract features from a labelled image dataset.
+
+Dependencies:
+    - NumPy
+    - OpenCV (cv2) (process_dataset only)
+"""
+
+import os
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+FEATURE_SIZE = NUM_LANDMARKS * 3
+
+
+def landmark_array(hand_landmarks, out=None):
+    """
+    Copy the landmarks of one hand into a (21, 3) float32 array.
+
+    The coordinates are written straight into ``out``, so serving fills one preallocated array
+    per frame without building a temporary one.
+
+    Args:
+        hand_landmarks: One entry of ``multi_hand_landmarks`` of a MediaPipe Hands result.
+        out (np.ndarray, optional): Preallocated contiguous array with 63 float32 values to fill.
+
+    Returns:
+        np.ndarray: The (21, 3) landmark coordinates, a view of ``out`` when given.
+    """
+    if out is None:
+        out = np.empty(FEATURE_SIZE, dtype=np.float32)
+    flat = out.reshape(-1)
+    for i, lm in enumerate(hand_landmarks.landmark):
+        flat[3 * i] = lm.x
+        flat[3 * i + 1] = lm.y
+        flat[3 * i + 2] = lm.z
+    return flat.reshape(NUM_LANDMARKS, 3)
+
+
+def normalize(features):
+    """
+    Min-max normalize feature vectors to [0, 1] in place.
+
+    A vector with all values equal becomes zeros instead of being divided by zero.
+
+    Args:
+        features (np.ndarray): One (63,) feature vector or a (n, 63) batch, as float32.
+
+    Returns:
+        np.ndarray: ``features``, normalized.
+    """
+    if features.ndim == 1:
+        low = features.min()
+        span = features.max() - low
+        features -= low
+        if span > 0:
+            features /= span
+        return features
+    low = features.min(axis=-1, keepdims=True)
+    span = features.max(axis=-1, keepdims=True) - low
+    features -= low
+    np.divide(features, span, out=features, where=span > 0)
+    return features
+
+
+def extract_features(results, out=None):
+    """
+    Return the normalized feature vector of the first hand of a MediaPipe Hands result.
+
+    Args:
+        results: The result of ``Hands.process``.
+        out (np.ndarray, optional): Preallocated (63,) float32 array to fill.
+
+    Returns:
+        np.ndarray: The (63,) feature vector, or None if no hand was detected.
+    """
+    if not results.multi_hand_landmarks:
+        return None
+    if out is None:
+        out = np.empty(FEATURE_SIZE, dtype=np.float32)
+    landmark_array(results.multi_hand_landmarks[0], out)
+    return normalize(out)
+
+
+def extract_batch(results):
+    """
+    Return the normalized feature vectors of a batch of MediaPipe Hands results.
+
+    Args:
+        results (list): Results of ``Hands.process``, one per image.
+
+    Returns:
+        tuple: Feature vectors of shape (n, 63) for the n results with a hand, and the boolean
+        mask of shape (len(results),) of those results.
+    """
+    found = np.array([bool(r.multi_hand_landmarks) for r in results], dtype=bool)
+    X = np.empty((int(found.sum()), FEATURE_SIZE), dtype=np.float32)
+    row = 0
+    for r in results:
+        if r.multi_hand_landmarks:
+            landmark_array(r.multi_hand_landmarks[0], X[row])
+            row += 1
+    return normalize(X), found
+
+
+def process_dataset(dataset_path, labels, hands, limit=None):
+    """
+    Extract normalized feature vectors from a labelled dataset.
+
+    Args:
+        dataset_path (str): Directory with one sub-directory of images per label.
+        labels (list): Label names, in the order of the model outputs.
+        hands: A MediaPipe Hands instance in static image mode.
+        limit (int, optional): Maximum number of images read per label.
+
+    Returns:
+        tuple: Feature vectors of shape (n, 63) and label indices of shape (n,), for the
+        images in which a hand was detected.
+    """
+    import cv2
+
+    paths = [(index, os.path.join(dataset_path, label, img_name))
+             for index, label in enumerate(labels)
+             for img_name in sorted(os.listdir(os.path.join(dataset_path, label)))[:limit]]
+    X = np.empty((len(paths), FEATURE_SIZE), dtype=np.float32)
+    y = np.empty(len(paths), dtype=np.int64)
+    row = 0
+    for index, path in paths:
+        img = cv2.imread(path)
+        if img is None:
+            continue
+        results = hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        if results.multi_hand_landmarks:
+            landmark_array(results.multi_hand_landmarks[0], X[row])
+            y[row] = index
+            row += 1
+    return normalize(X[:row]), y[:row]
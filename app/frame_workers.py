@@ -0,0 +1,457 @@
+"""
+Module: frame_workers
+
+This module contains a pool of frame-processing worker processes. Each worker owns its own
+MediaPipe Hands trackers and inference backend and runs the recognition pipeline of
+``app.pipeline`` outside the web process, so decoding, hand detection and the model call never
+hold the GIL of the Socket.IO worker.
+
+Frames reach the workers through shared memory: every worker has a block of fixed-size slots,
+the web process copies the encoded frame into a free slot and only sends the slot index as a
+task. The worker decodes straight from the shared buffer. Results travel back and resolve the
+future returned by ``submit``. Tasks and results are pickled messages on Unix SOCK_SEQPACKET
+socket pairs: a message is sent and received whole by one system call, so a process killed
+halfway leaves no lock held and no partial message behind, as a ``multiprocessing.Queue``
+would.
+
+Frames of one Socket.IO session always go to the same worker, so its tracker keeps the
+temporal tracking state of that session. Every worker loads and warms up its model when it
+starts and then reports ready. New sessions go to ready workers, and the sessions of a worker
+that is not ready move to a ready one.
+
+The worker processes are forked by a supervisor process, which the pool forks when it is
+created, before the web process starts threads. The supervisor never starts a thread, so
+forking from it cannot copy a lock held by another thread the way forking the web process
+later would. A worker process that exits, for example after a MediaPipe crash, is replaced by
+the supervisor: its frames in flight fail, its slots are freed and a new process takes over
+its sessions. Frames are tagged with the generation of their worker, so the new process skips
+the frames left in the task socket for the one that exited.
+
+Classes:
+    - FrameWorkerPool: Dispatches frames to worker processes through shared memory.
+
+Dependencies:
+    - multiprocessing
+    - NumPy
+    - threading
+    - concurrent.futures
+    - socket
+    - pickle
+"""
+
+import atexit
+import itertools
+import multiprocessing
+import pickle
+import queue
+import socket
+import threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import numpy as np
+
+
+# Largest task or result message, error messages of results are cut to fit
+MESSAGE_SIZE = 64 * 1024
+
+
+class FrameTooLarge(ValueError):
+    """
+    Raised when an encoded frame does not fit into a shared memory slot.
+    """
+
+
+def _send(sock, message):
+    sock.send(pickle.dumps(message))
+
+
+def _receive(sock):
+    data = sock.recv(MESSAGE_SIZE)
+    return pickle.loads(data) if data else None  # Empty once every sender closed its end
+
+
+def _worker_main(index, generation, shm_name, slot_size, tasks, results, backend_name, model_path, hands_pool_size):
+    """
+    Entry point of a frame worker process.
+
+    Args:
+        index (int): Index of this worker in the pool.
+        generation (int): Number of processes of this worker that exited before this one.
+        shm_name (str): Name of the shared memory block holding the frame slots of this worker.
+        slot_size (int): Size of one slot in bytes.
+        tasks (socket.socket): Socket receiving the tasks of this worker.
+        results (socket.socket): Socket shared by all workers to send results.
+        backend_name (str): Inference backend to load.
+        model_path (str): Model artifact loaded by the backend.
+        hands_pool_size (int): Maximum number of trackers in this worker.
+    """
+    from .hands_pool import HandsPool
+    from .pipeline import create_tracker, recognize_frame
+    from .runtime import ModelRuntime
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    hands_pool = HandsPool(create_tracker, max_size=hands_pool_size)
+
+    def warm_up_hands():
+        with hands_pool.acquire('__warm_up__') as tracker:
+            tracker.process(np.zeros((240, 320, 3), dtype=np.uint8))
+        hands_pool.release('__warm_up__')
+
+    model = ModelRuntime(backend_name, model_path, warm_ups=[warm_up_hands])
+    if model.warm_up():
+        _send(results, (None, index, generation, None))  # Tells the pool this worker is ready
+    try:
+        while True:
+            task = _receive(tasks)
+            if task is None:
+                break
+            kind, session_id = task[0], task[1]
+            if kind == 'release':
+                hands_pool.release(session_id)
+                continue
+            _, _, request_id, slot, nbytes, task_generation = task
+            if task_generation != generation:
+                continue  # Queued for a process of this worker that exited, already failed
+            frame = np.frombuffer(shm.buf, np.uint8, nbytes, slot * slot_size)
+            try:
+                with hands_pool.acquire(session_id) as tracker:
+                    prediction = recognize_frame(frame, tracker, model.predict)
+                _send(results, (request_id, slot, prediction, None))
+            except Exception as e:
+                _send(results, (request_id, slot, None, repr(e)[:MESSAGE_SIZE // 2]))
+            finally:
+                del frame
+    finally:
+        shm.close()
+
+
+def _supervisor_main(connection, pool_connection, workers, worker_args, results):
+    """
+    Entry point of the supervisor process, which forks the worker processes and replaces the
+    ones that exit. It never starts a thread, so it only ever forks a single-threaded process.
+
+    Sends ('started', index, pid) for every worker process it starts and ('exited', index,
+    exitcode) for every one that exited, before it starts the replacement. Stops when it
+    receives None or the pool goes away.
+
+    Args:
+        connection (Connection): Pipe to the pool.
+        pool_connection (Connection): End of the pipe kept by the pool, closed here so that the
+            supervisor sees the pipe close when the web process exits.
+        workers (list): (shared memory name, task socket) of every worker.
+        worker_args (tuple): Slot size, backend name, model path and tracker pool size.
+        results (socket.socket): Socket shared by all workers to send results.
+    """
+    pool_connection.close()
+    context = multiprocessing.get_context('fork')
+    slot_size, backend_name, model_path, hands_pool_size = worker_args
+    generations = [0] * len(workers)
+
+    def start(index):
+        shm_name, tasks = workers[index]
+        process = context.Process(
+            target=_worker_main,
+            args=(index, generations[index], shm_name, slot_size, tasks, results,
+                  backend_name, model_path, hands_pool_size),
+            daemon=True)
+        process.start()
+        connection.send(('started', index, process.pid))
+        return process
+
+    processes = []
+    stopped = False  # The pool stops the workers, otherwise the web process is gone
+    try:
+        processes.extend(start(index) for index in range(len(workers)))
+        while True:
+            sentinels = {process.sentinel: index for index, process in enumerate(processes)}
+            ready = wait([connection, *sentinels])
+            if connection in ready:
+                try:
+                    stopped = connection.recv() is None
+                except EOFError:
+                    pass
+                break
+            for sentinel in ready:
+                index = sentinels.get(sentinel)
+                if index is None:
+                    continue
+                processes[index].join()
+                generations[index] += 1
+                connection.send(('exited', index, processes[index].exitcode))
+                processes[index] = start(index)
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # The web process is gone
+    finally:
+        for process in processes:
+            process.join(timeout=5 if stopped else 0)
+            if process.is_alive():
+                process.terminate()
+
+
+class FrameWorkerPool:
+    """
+    Pool of frame-processing worker processes fed through shared memory.
+
+    The supervisor of the workers is forked when the pool is created, so create it before the
+    web process loads a model or starts threads.
+
+    Args:
+        num_workers (int): Number of worker processes.
+        backend_name (str): Inference backend loaded by every worker.
+        model_path (str): Model artifact loaded by the backend.
+        slots_per_worker (int): Number of frames that can be in flight per worker.
+        slot_size (int): Maximum size of one encoded frame in bytes.
+        hands_pool_size (int): Maximum number of trackers per worker.
+    """
+
+    def __init__(self, num_workers, backend_name, model_path, slots_per_worker=4, slot_size=1 << 20,
+                 hands_pool_size=8):
+        context = multiprocessing.get_context('fork')
+        self.slot_size = slot_size
+        self._results, results = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._request_ids = itertools.count()
+        self._assignments = {}
+        self._next_worker = itertools.cycle(range(num_workers))
+        self._stats = {'dispatched': 0, 'completed': 0, 'errors': 0, 'slot_waits': 0, 'respawns': 0}
+        self._workers = []
+        worker_ends = []
+        for index in range(num_workers):
+            shm = shared_memory.SharedMemory(create=True, size=slots_per_worker * slot_size)
+            free_slots = queue.Queue()
+            for slot in range(slots_per_worker):
+                free_slots.put(slot)
+            tasks, worker_tasks = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+            worker_ends.append((shm.name, worker_tasks))
+            self._workers.append({'shm': shm, 'free_slots': free_slots, 'tasks': tasks,
+                                  'generation': 0, 'pid': None, 'ready': False})
+        self._supervisor, connection = context.Pipe()
+        self._supervisor_process = context.Process(
+            target=_supervisor_main,
+            args=(connection, self._supervisor, worker_ends,
+                  (slot_size, backend_name, model_path, hands_pool_size), results),
+            name='frame-supervisor')
+        self._supervisor_process.start()
+        # The ends of the workers stay open in the supervisor and the workers only
+        connection.close()
+        results.close()
+        for _, worker_tasks in worker_ends:
+            worker_tasks.close()
+        self._collector = threading.Thread(target=self._collect_results, name='frame-results', daemon=True)
+        self._collector.start()
+        atexit.register(self.close)
+
+    def submit(self, session_id, img_data, timeout=None):
+        """
+        Copy an encoded frame into shared memory and queue it for the worker of its session.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+            img_data (bytes-like): The encoded frame.
+            timeout (float, optional): Seconds to wait for a free slot.
+
+        Returns:
+            Future: Resolves to the predicted label, or None if no hand was detected.
+
+        Raises:
+            FrameTooLarge: If the frame does not fit into a slot.
+            TimeoutError: If no slot became free within the timeout.
+
+        The future fails with a RuntimeError if the worker could not process the frame or exited.
+        """
+        nbytes = len(img_data)
+        if nbytes > self.slot_size:
+            raise FrameTooLarge(f"Frame of {nbytes} bytes exceeds the slot size of {self.slot_size} bytes.")
+        index = self._worker_index(session_id)
+        worker = self._workers[index]
+        free_slots = worker['free_slots']
+        try:
+            slot = free_slots.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self._stats['slot_waits'] += 1
+            try:
+                slot = free_slots.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError("No free frame slot.") from None
+
+        offset = slot * self.slot_size
+        worker['shm'].buf[offset:offset + nbytes] = memoryview(img_data).cast('B')
+        future = Future()
+        with self._lock:
+            request_id = next(self._request_ids)
+            self._pending[request_id] = (future, free_slots, index, slot)
+            self._stats['dispatched'] += 1
+            generation = worker['generation']
+        _send(worker['tasks'], ('frame', session_id, request_id, slot, nbytes, generation))
+        return future
+
+    def release(self, session_id):
+        """
+        Free the tracker of a session in its worker, for example when its socket disconnects.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+        """
+        with self._lock:
+            index = self._assignments.pop(session_id, None)
+        if index is not None:
+            _send(self._workers[index]['tasks'], ('release', session_id))
+
+    def ready(self):
+        """
+        Tell whether frames can be processed by a worker that loaded and warmed up its model.
+
+        Returns:
+            bool: True once at least one running worker reported ready.
+        """
+        with self._lock:
+            return any(worker['ready'] for worker in self._workers)
+
+    def stats(self):
+        """
+        Return a snapshot of the pool counters.
+
+        Returns:
+            dict: Dispatched and completed frames, errors, slot waits, replaced workers, frames in
+            flight and ready workers.
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['in_flight'] = len(self._pending)
+            snapshot['sessions'] = len(self._assignments)
+            snapshot['ready_workers'] = sum(1 for worker in self._workers if worker['ready'])
+            snapshot['alive'] = sum(1 for worker in self._workers if worker['pid'] is not None)
+        snapshot['workers'] = len(self._workers)
+        return snapshot
+
+    def close(self):
+        """
+        Stop the supervisor and the worker processes and free the shared memory.
+        """
+        with self._lock:
+            workers, self._workers = self._workers, []
+        if not workers:
+            return
+        try:
+            self._supervisor.send(None)
+        except OSError:
+            pass  # The supervisor already exited
+        for worker in workers:
+            _send(worker['tasks'], None)
+        self._supervisor_process.join(timeout=10)
+        self._collector.join(timeout=5)
+        self._results.close()
+        for worker in workers:
+            worker['tasks'].close()
+            worker['shm'].close()
+            worker['shm'].unlink()
+
+    def _worker_index(self, session_id):
+        """
+        Return the worker serving a session, assigning one on its first frame. Sessions are
+        given to ready workers while there are any, a session of a worker that is not ready
+        moves to a ready one.
+        """
+        with self._lock:
+            index = self._assignments.get(session_id)
+            if index is not None and (self._workers[index]['ready'] or not self._any_ready()):
+                return index
+            previous = index
+            index = next(self._next_worker)
+            if self._any_ready():
+                while not self._workers[index]['ready']:
+                    index = next(self._next_worker)
+            self._assignments[session_id] = index
+            if previous is not None:
+                _send(self._workers[previous]['tasks'], ('release', session_id))
+            return index
+
+    def _any_ready(self):
+        """
+        Tell whether a worker is ready, called with the lock held.
+        """
+        return any(worker['ready'] for worker in self._workers)
+
+    def _collect_results(self):
+        """
+        Resolve the futures of processed frames and free their slots, and follow the worker
+        processes started and replaced by the supervisor.
+        """
+        while True:
+            ready = wait([self._results, self._supervisor])
+            if self._supervisor in ready and not self._read_supervisor():
+                return
+            if self._results not in ready:
+                continue
+            message = _receive(self._results)
+            if message is None:
+                continue
+            request_id, slot, prediction, error = message
+            if request_id is None:
+                # A worker reported ready, the second field is its index and the third its generation
+                with self._lock:
+                    if slot < len(self._workers) and self._workers[slot]['generation'] == prediction:
+                        self._workers[slot]['ready'] = True
+                continue
+            with self._lock:
+                pending = self._pending.pop(request_id, None)
+                if pending is None:
+                    continue  # Already failed when its worker exited
+                self._stats['completed'] += 1
+                if error is not None:
+                    self._stats['errors'] += 1
+            future, free_slots, _, _ = pending
+            free_slots.put(slot)
+            if error is not None:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(prediction)
+
+    def _read_supervisor(self):
+        """
+        Handle the messages of the supervisor received so far.
+
+        Returns:
+            bool: False once the supervisor exited.
+        """
+        try:
+            while self._supervisor.poll():
+                kind, index, value = self._supervisor.recv()
+                if kind == 'started':
+                    with self._lock:
+                        if index < len(self._workers):
+                            self._workers[index]['pid'] = value
+                else:
+                    self._worker_exited(index, value)
+        except (EOFError, OSError):
+            with self._lock:
+                if self._workers:
+                    print("Error: The frame worker supervisor exited.")
+            return False
+        return True
+
+    def _worker_exited(self, index, exitcode):
+        """
+        Fail the frames in flight of a worker process that exited and free their slots. The
+        supervisor is already starting its replacement.
+        """
+        print(f"Error: Frame worker {index} exited with code {exitcode}, starting a new one.")
+        failed = []
+        with self._lock:
+            if index >= len(self._workers):
+                return
+            worker = self._workers[index]
+            worker.update(generation=worker['generation'] + 1, pid=None, ready=False)
+            for request_id, pending in list(self._pending.items()):
+                if pending[2] == index:
+                    del self._pending[request_id]
+                    failed.append(pending)
+                    self._stats['errors'] += 1
+            self._stats['respawns'] += 1
+        for future, free_slots, _, slot in failed:
+            free_slots.put(slot)
+            future.set_exception(RuntimeError(f"Frame worker {index} exited with code {exitcode}."))
@@ -0,0 +1,235 @@
+"""
+Module: hands_pool
+
+This module contains a bounded pool of MediaPipe Hands trackers with session affinity.
+
+MediaPipe Hands in video mode (``static_image_mode=False``) keeps tracking state between
+frames and only re-runs palm detection when it loses the hand. Sharing one tracker between
+users mixes their frames and defeats that. The pool gives every Socket.IO session its own
+tracker while the session is active, creates trackers up to a fixed limit, and when the limit
+is reached reclaims the least recently used idle tracker from another session.
+
+Classes:
+    - HandsPool: Bounded, session-affine pool of tracker instances.
+
+Dependencies:
+    - threading
+    - collections
+    - contextlib
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class _Lease:
+    """
+    Assignment of a tracker instance to one session.
+    """
+
+    __slots__ = ('instance', 'busy', 'released')
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.busy = False
+        self.released = False
+
+
+class HandsPool:
+    """
+    Bounded pool of tracker instances with session affinity and LRU eviction.
+
+    Args:
+        factory (callable): Function creating a new tracker instance.
+        max_size (int): Maximum number of tracker instances.
+        checkout_timeout (float): Seconds a checkout waits for a tracker before giving up.
+    """
+
+    def __init__(self, factory, max_size=8, checkout_timeout=5.0):
+        self.factory = factory
+        self.max_size = max(1, int(max_size))
+        self.checkout_timeout = checkout_timeout
+        self._cond = threading.Condition()
+        self._leases = OrderedDict()  # session_id -> _Lease, least recently used first
+        self._free = []
+        self._size = 0
+        self._stats = {
+            'checkouts': 0,
+            'affinity_hits': 0,
+            'created': 0,
+            'evictions': 0,
+            'waits': 0,
+            'wait_total_ms': 0.0,
+            'timeouts': 0,
+        }
+
+    @contextmanager
+    def acquire(self, session_id):
+        """
+        Context manager checking out the tracker of a session for the duration of the block.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+
+        Yields:
+            object: The tracker instance owned by the session.
+
+        Raises:
+            TimeoutError: If no tracker became available within the checkout timeout.
+        """
+        instance = self.checkout(session_id)
+        try:
+            yield instance
+        finally:
+            self.checkin(session_id)
+
+    def checkout(self, session_id):
+        """
+        Check out the tracker of a session, assigning one if the session has none.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+
+        Returns:
+            object: The tracker instance owned by the session.
+
+        Raises:
+            TimeoutError: If no tracker became available within the checkout timeout.
+        """
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+        waited = False
+        with self._cond:
+            while True:
+                lease = self._leases.get(session_id)
+                if lease is not None and not lease.busy:
+                    lease.busy = True
+                    self._leases.move_to_end(session_id)
+                    self._stats['affinity_hits'] += 1
+                    break
+                if lease is None:
+                    instance = self._take_instance()
+                    if instance is not None:
+                        lease = _Lease(instance)
+                        lease.busy = True
+                        self._leases[session_id] = lease
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        lease = None
+                        break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise TimeoutError("No hand tracker available.")
+                waited = True
+                self._cond.wait(remaining)
+
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+                self._stats['wait_total_ms'] += (time.monotonic() - started) * 1000.0
+            if lease is not None:
+                return lease.instance
+
+        # Create a new tracker outside the lock, the slot is already reserved
+        try:
+            instance = self.factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._stats['created'] += 1
+            lease = _Lease(instance)
+            lease.busy = True
+            self._leases[session_id] = lease
+        return instance
+
+    def checkin(self, session_id):
+        """
+        Return the tracker of a session after a frame has been processed. The session keeps it.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+        """
+        with self._cond:
+            lease = self._leases.get(session_id)
+            if lease is None:
+                return
+            lease.busy = False
+            if lease.released:
+                self._unassign(session_id)
+            self._cond.notify_all()
+
+    def release(self, session_id):
+        """
+        Give the tracker of a session back to the pool, for example when its socket disconnects.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+        """
+        with self._cond:
+            lease = self._leases.get(session_id)
+            if lease is None:
+                return
+            if lease.busy:
+                lease.released = True
+            else:
+                self._unassign(session_id)
+                self._cond.notify_all()
+
+    def stats(self):
+        """
+        Return a snapshot of the pool counters.
+
+        Returns:
+            dict: Size, utilization, checkouts, waits and evictions.
+        """
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot['size'] = self._size
+            snapshot['max_size'] = self.max_size
+            snapshot['assigned'] = len(self._leases)
+            snapshot['in_use'] = sum(1 for lease in self._leases.values() if lease.busy)
+        return snapshot
+
+    def _take_instance(self):
+        """
+        Take a free tracker or evict the least recently used idle one. Caller holds the lock.
+
+        Returns:
+            object: A tracker without tracking state, or None if the pool may still grow or
+            every tracker is busy.
+        """
+        if self._free:
+            return self._free.pop()
+        if self._size < self.max_size:
+            return None
+        for session_id, lease in self._leases.items():
+            if not lease.busy:
+                del self._leases[session_id]
+                self._stats['evictions'] += 1
+                self._reset(lease.instance)
+                return lease.instance
+        return None
+
+    def _unassign(self, session_id):
+        """
+        Move the tracker of a session to the free list. Caller holds the lock.
+        """
+        lease = self._leases.pop(session_id)
+        self._reset(lease.instance)
+        self._free.append(lease.instance)
+
+    @staticmethod
+    def _reset(instance):
+        """
+        Drop the tracking state of a tracker before it serves another session.
+        """
+        reset = getattr(instance, 'reset', None)
+        if reset is not None:
+            reset()
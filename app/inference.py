@@ -0,0 +1,287 @@
+"""
+Module: inference
+
+This module contains the inference backends used to run the gesture recognition model.
+Every backend exposes the same ``predict(x)`` method taking a single 63-float landmark vector
+or a batch of them, so the serving code can pick one through configuration.
+
+Backends:
+    - KerasBackend: Runs the model through ``tensorflow.keras`` (imported lazily).
+    - NumpyBackend: Runs the dense layers of the model as vectorized NumPy matrix multiplies,
+      with weights read once from the Keras .h5 file. Does not import TensorFlow.
+    - Int8Backend: Runs the int8 TensorFlow Lite artifact written by ``models/quantize_model.py``
+      with the integer kernels of the TFLite interpreter. Uses ``tflite_runtime`` if it is
+      installed, so it does not need TensorFlow, and TensorFlow Lite otherwise.
+
+Functions:
+    - load_dense_layers(path): Read the dense layers of a Keras .h5 model.
+    - export_int8(model_path, calibration, path): Convert a Keras model to an int8 TFLite artifact.
+    - load_backend(name, model_path): Create the inference backend with the given name.
+
+Dependencies:
+    - NumPy
+    - h5py
+    - json
+    - threading
+    - TensorFlow (Keras backend and int8 export only)
+    - tflite_runtime (int8 backend, optional)
+"""
+
+import json
+import threading
+
+import numpy as np
+
+BACKENDS = ('keras', 'numpy', 'int8')
+
+
+def _relu(x):
+    return np.maximum(x, 0.0, out=x)
+
+
+def _softmax(x):
+    x = x - np.max(x, axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= np.sum(x, axis=-1, keepdims=True)
+    return x
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': _relu,
+    'softmax': _softmax,
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+}
+
+# Layers that are a no-op at inference time
+PASSTHROUGH_LAYERS = ('InputLayer', 'Dropout')
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def load_dense_layers(path):
+    """
+    Read the dense layers of a Sequential Keras model saved in the .h5 format.
+
+    Args:
+        path (str): Path to the .h5 file.
+
+    Returns:
+        list: One (kernel, bias, activation) tuple per Dense layer, in model order, with
+        float32 kernel and bias arrays and the activation name.
+
+    Raises:
+        ValueError: If the model contains a layer that cannot be run by the NumPy backend.
+    """
+    import h5py
+
+    layers = []
+    with h5py.File(path, 'r') as f:
+        model_config = json.loads(_decode(f.attrs['model_config']))
+        weights = f['model_weights'] if 'model_weights' in f else f
+        for layer in model_config['config']['layers']:
+            class_name = layer['class_name']
+            if class_name in PASSTHROUGH_LAYERS:
+                continue
+            if class_name != 'Dense':
+                raise ValueError(f"Unsupported layer for the NumPy backend: {class_name}")
+            layer_config = layer['config']
+            activation = layer_config.get('activation', 'linear')
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation for the NumPy backend: {activation}")
+            group = weights[layer_config['name']]
+            names = [_decode(name) for name in group.attrs['weight_names']]
+            kernel = np.asarray(group[names[0]], dtype=np.float32)
+            if layer_config.get('use_bias', True):
+                bias = np.asarray(group[names[1]], dtype=np.float32)
+            else:
+                bias = np.zeros(kernel.shape[1], dtype=np.float32)
+            layers.append((kernel, bias, activation))
+    return layers
+
+
+class KerasBackend:
+    """
+    Inference backend running the model through ``tensorflow.keras``.
+
+    Args:
+        model_path (str): Path to the Keras .h5 model.
+    """
+
+    name = 'keras'
+
+    def __init__(self, model_path):
+        from tensorflow.keras.models import load_model
+        self.model = load_model(model_path)
+
+    def predict(self, x):
+        """
+        Run the model on one landmark vector or a batch of them.
+
+        Args:
+            x (np.ndarray): Array of shape (features,) or (batch, features).
+
+        Returns:
+            np.ndarray: Class probabilities of shape (classes,) or (batch, classes).
+        """
+        x = np.asarray(x, dtype=np.float32)
+        outputs = np.asarray(self.model.predict_on_batch(np.atleast_2d(x)))
+        return outputs[0] if x.ndim == 1 else outputs
+
+
+class NumpyBackend:
+    """
+    Inference backend running the dense layers of the model with NumPy.
+
+    Args:
+        model_path (str, optional): Path to the Keras .h5 model the weights are read from.
+        layers (list, optional): Already loaded (kernel, bias, activation) tuples.
+    """
+
+    name = 'numpy'
+
+    def __init__(self, model_path=None, layers=None):
+        if layers is None:
+            layers = load_dense_layers(model_path)
+        self.layers = [(kernel, bias, ACTIVATIONS[activation]) for kernel, bias, activation in layers]
+
+    def predict(self, x):
+        """
+        Run the model on one landmark vector or a batch of them.
+
+        Args:
+            x (np.ndarray): Array of shape (features,) or (batch, features).
+
+        Returns:
+            np.ndarray: Class probabilities of shape (classes,) or (batch, classes).
+        """
+        x = np.asarray(x, dtype=np.float32)
+        outputs = np.atleast_2d(x)
+        for kernel, bias, activation in self.layers:
+            outputs = activation(outputs @ kernel + bias)
+        return outputs[0] if x.ndim == 1 else outputs
+
+
+def export_int8(model_path, calibration, path):
+    """
+    Convert a Keras model to a fully int8 quantized TensorFlow Lite artifact.
+
+    Weights are quantized per output unit and activations per tensor, with ranges calibrated on
+    the given model inputs. All operators run as int8 kernels accumulating in int32; the input
+    and output stay float32, quantized and dequantized inside the model.
+
+    Args:
+        model_path (str): Path to the Keras .h5 model.
+        calibration (np.ndarray): Batch of representative model inputs.
+        path (str): Destination path of the .tflite artifact.
+    """
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(model_path)
+    samples = np.atleast_2d(np.asarray(calibration, dtype=np.float32))
+
+    def representative_dataset():
+        for sample in samples:
+            yield [sample[np.newaxis]]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+
+
+def _tflite_interpreter():
+    """
+    Return the TFLite interpreter class, from ``tflite_runtime`` if it is installed.
+    """
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class Int8Backend:
+    """
+    Inference backend running the int8 TensorFlow Lite model.
+
+    The interpreter runs the model for a fixed input shape, so one interpreter is kept per
+    batch size seen, created on first use. They share the artifact bytes and are guarded by a
+    lock, since an interpreter must not be invoked from two threads at once.
+
+    Args:
+        model_path (str): Path to the .tflite artifact.
+    """
+
+    name = 'int8'
+
+    def __init__(self, model_path):
+        with open(model_path, 'rb') as f:
+            self.model_content = f.read()
+        self._interpreter_class = _tflite_interpreter()
+        self._interpreters = {}  # batch size -> (interpreter, input index, output index)
+        self._lock = threading.Lock()
+
+    def _interpreter(self, batch_size):
+        entry = self._interpreters.get(batch_size)
+        if entry is None:
+            interpreter = self._interpreter_class(model_content=self.model_content)
+            input_details = interpreter.get_input_details()[0]
+            input_index = input_details['index']
+            interpreter.resize_tensor_input(input_index, [batch_size, *input_details['shape'][1:]])
+            interpreter.allocate_tensors()
+            entry = (interpreter, input_index, interpreter.get_output_details()[0]['index'])
+            self._interpreters[batch_size] = entry
+        return entry
+
+    def predict(self, x):
+        """
+        Run the quantized model on one landmark vector or a batch of them.
+
+        Args:
+            x (np.ndarray): Array of shape (features,) or (batch, features).
+
+        Returns:
+            np.ndarray: Class probabilities of shape (classes,) or (batch, classes).
+        """
+        x = np.asarray(x, dtype=np.float32)
+        inputs = np.atleast_2d(x)
+        with self._lock:
+            interpreter, input_index, output_index = self._interpreter(len(inputs))
+            interpreter.set_tensor(input_index, inputs)
+            interpreter.invoke()
+            outputs = interpreter.get_tensor(output_index)
+        return outputs[0] if x.ndim == 1 else outputs
+
+
+def load_backend(name, model_path):
+    """
+    Create the inference backend with the given name.
+
+    Args:
+        name (str): One of ``BACKENDS``.
+        model_path (str): Path to the Keras .h5 model, or to the .tflite artifact for ``int8``.
+
+    Returns:
+        object: A backend exposing ``predict(x)``.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if name == 'keras':
+        return KerasBackend(model_path)
+    if name == 'numpy':
+        return NumpyBackend(model_path)
+    if name == 'int8':
+        return Int8Backend(model_path)
+    raise ValueError(f"Unknown inference backend: {name}. Expected one of {', '.join(BACKENDS)}.")
@@ -0,0 +1,249 @@
+"""
+Module: inference_client
+
+This module contains the client the web tier uses to talk to the standalone inference service
+of ``app.inference_service``.
+
+With the service, web processes neither import MediaPipe nor load the model: they forward the
+encoded frames over a local socket and receive the predicted label. The web tier and the
+inference service are scaled independently, and the memory of the model is paid once per
+service process instead of once per web worker.
+
+Messages are pickled tuples sent over ``multiprocessing.connection`` connections,
+authenticated with a shared key. Messages are unpickled on both ends, so whoever holds the key
+can run code in the other process: there is no default key, and the service and the web
+processes refuse to start without one. A connection carries one request at a time, so the client
+keeps a small pool of connections for the threads of the web process. Connections are opened
+on first use and reopened when the service was restarted.
+
+Classes:
+    - InferenceClient: Sends frames to the inference service over pooled connections.
+
+Functions:
+    - parse_address(value): Parse a service address, 'host:port' or the path of a Unix socket.
+    - service_authkey(value): Return the configured key shared with the service.
+
+Dependencies:
+    - multiprocessing
+    - threading
+    - concurrent.futures
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+
+def parse_address(value):
+    """
+    Parse a service address.
+
+    Args:
+        value (str): 'host:port' for TCP, anything else is the path of a Unix socket.
+
+    Returns:
+        tuple | str: The address as accepted by ``multiprocessing.connection``.
+    """
+    host, separator, port = value.rpartition(':')
+    if separator and port.isdigit():
+        return host or '127.0.0.1', int(port)
+    return value
+
+
+def service_authkey(value):
+    """
+    Return the key shared by the web processes and the inference service.
+
+    Args:
+        value (str): The configured key, SLI_INFERENCE_SERVICE_AUTHKEY.
+
+    Returns:
+        bytes: The key.
+
+    Raises:
+        ValueError: If no key is configured.
+    """
+    if not value:
+        raise ValueError("SLI_INFERENCE_SERVICE_AUTHKEY must be set to a secret shared with the inference service.")
+    return value.encode()
+
+
+class InferenceClient:
+    """
+    Sends frames to the inference service, with the interface of ``FrameWorkerPool``.
+
+    Args:
+        address (tuple | str): The service address, see ``parse_address``.
+        authkey (bytes): Key shared with the service.
+        max_connections (int): Maximum number of connections, and of requests in flight.
+        timeout (float): Seconds a request waits for a connection and for the answer.
+        ready_ttl (float): Seconds a ready answer of the service is reused without asking again.
+    """
+
+    def __init__(self, address, authkey, max_connections=4, timeout=10.0, ready_ttl=1.0):
+        self.address = address
+        self.authkey = authkey
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.ready_ttl = ready_ttl
+        self._ready_until = 0.0
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._stats = {'requests': 0, 'frames': 0, 'busy': 0, 'errors': 0, 'connects': 0, 'reconnects': 0,
+                       'total_ms': 0.0}
+
+    def submit(self, session_id, img_data, timeout=None):
+        """
+        Send an encoded frame to the service and wait for the prediction.
+
+        Args:
+            session_id (str): The Socket.IO session id, the service keeps a tracker per session.
+            img_data (bytes-like): The encoded frame.
+            timeout (float): Seconds to wait, the client timeout if None.
+
+        Returns:
+            Future: Resolved future with the predicted label, or None if no hand was detected.
+
+        Raises:
+            TimeoutError: If the service is busy or did not answer in time.
+            ConnectionError: If the service is not reachable.
+        """
+        prediction = self._request(('frame', session_id, bytes(img_data)), timeout)
+        with self._lock:
+            self._stats['frames'] += 1
+        future = Future()
+        future.set_result(prediction)
+        return future
+
+    def release(self, session_id):
+        """
+        Give the tracker of a session back to the pool of the service.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+        """
+        try:
+            self._request(('release', session_id))
+        except (TimeoutError, ConnectionError, RuntimeError) as e:
+            print(f"Error: {e}")
+
+    def ready(self):
+        """
+        Tell whether the service is reachable and warmed up.
+
+        Returns:
+            bool: True if the service answered ready, recently or now.
+        """
+        if time.monotonic() < self._ready_until:
+            return True
+        try:
+            ready = bool(self._request(('ready',)))
+        except (TimeoutError, ConnectionError, RuntimeError):
+            return False
+        if ready:
+            self._ready_until = time.monotonic() + self.ready_ttl
+        return ready
+
+    def stats(self):
+        """
+        Return the counters of this client and of the service.
+
+        Returns:
+            dict: Requests, frames, busy answers, errors, connections and mean request time of
+            this process, and the counters of the service or the error reaching it.
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['idle_connections'] = len(self._idle)
+        requests = snapshot['requests']
+        total_ms = snapshot.pop('total_ms')
+        snapshot['mean_request_ms'] = total_ms / requests if requests else 0.0
+        try:
+            snapshot['service'] = self._request(('stats',))
+        except (TimeoutError, ConnectionError, RuntimeError) as e:
+            snapshot['service'] = {'error': str(e)}
+        return snapshot
+
+    def close(self):
+        """
+        Close the idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def _request(self, message, timeout=None):
+        """
+        Send one request over a pooled connection and return the value of the answer.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self._stats['busy'] += 1
+            raise TimeoutError("No connection to the inference service available.")
+        started = time.perf_counter()
+        try:
+            status, value = self._exchange(message, timeout)
+        except (TimeoutError, ConnectionError):
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            self._slots.release()
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['total_ms'] += (time.perf_counter() - started) * 1000.0
+            if status != 'ok':
+                self._stats['busy' if status == 'busy' else 'errors'] += 1
+        if status == 'busy':
+            raise TimeoutError(value)
+        if status == 'error':
+            raise RuntimeError(value)
+        return value
+
+    def _exchange(self, message, timeout):
+        """
+        Send a message and receive the answer. A pooled connection the service closed meanwhile
+        is replaced by a new one once.
+        """
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        reused = connection is not None
+        while True:
+            if connection is None:
+                connection = self._connect()
+            try:
+                connection.send(message)
+                answered = connection.poll(timeout)
+                answer = connection.recv() if answered else None
+            except (EOFError, OSError) as e:
+                connection.close()
+                connection = None
+                if reused:
+                    reused = False
+                    with self._lock:
+                        self._stats['reconnects'] += 1
+                    continue
+                raise ConnectionError(f"Lost the connection to the inference service: {e}") from e
+            if not answered:
+                connection.close()  # Its late answer would be read by the next request
+                raise TimeoutError("The inference service did not answer in time.")
+            with self._lock:
+                self._idle.append(connection)
+            return answer
+
+    def _connect(self):
+        """
+        Open an authenticated connection to the service.
+        """
+        try:
+            connection = Client(self.address, authkey=self.authkey)
+        except (OSError, AuthenticationError) as e:
+            raise ConnectionError(f"Cannot reach the inference service at {self.address}: {e}") from e
+        with self._lock:
+            self._stats['connects'] += 1
+        return connection
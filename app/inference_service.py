@@ -0,0 +1,234 @@
+"""
+Module: inference_service
+
+This module contains the standalone inference service. It owns MediaPipe and the model and
+recognizes the frames that the web processes forward through ``app.inference_client``.
+
+The service keeps one MediaPipe tracker per Socket.IO session, as the web process does when it
+recognizes frames itself, and batches the landmark vectors of all connected web processes
+into shared forward passes. Every connection is served by its own thread. The model is warmed
+up before the service accepts connections, and the readiness of the service is what the web
+processes report on /ready.
+
+Run it next to the web tier with the environment of the web processes, which point at it with
+SLI_INFERENCE_SERVICE. The service only imports the recognition modules of the package, not the
+web application, its database or its client of the service:
+    SLI_INFERENCE_SERVICE=127.0.0.1:6000 SLI_INFERENCE_SERVICE_AUTHKEY=<secret> python -m app.inference_service
+    SLI_INFERENCE_SERVICE=127.0.0.1:6000 SLI_INFERENCE_SERVICE_AUTHKEY=<secret> python app.py
+
+Classes:
+    - InferenceService: Recognizes frames sent over ``multiprocessing.connection``.
+
+Functions:
+    - main(argv): Command line entry point.
+
+Dependencies:
+    - multiprocessing
+    - socket
+    - threading
+    - MediaPipe
+    - NumPy
+"""
+
+import argparse
+import os
+import socket
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+import numpy as np
+
+from . import config
+from .batching import InferenceBatcher
+from .hands_pool import HandsPool
+from .inference_client import parse_address, service_authkey
+from .pipeline import create_tracker, recognize_frame
+from .runtime import ModelRuntime
+
+
+class InferenceService:
+    """
+    Recognizes frames sent by the web processes over ``multiprocessing.connection``.
+
+    Args:
+        backend_name (str): Inference backend.
+        model_path (str): Model artifact loaded by the backend.
+        hands_pool_size (int): Maximum number of MediaPipe trackers.
+        checkout_timeout (float): Seconds a frame waits for a free tracker before it is answered busy.
+        batch_size (int): Maximum number of landmark vectors run in one forward pass.
+        batch_wait_ms (float): Maximum time a vector waits for a batch to fill up.
+    """
+
+    def __init__(self, backend_name, model_path, hands_pool_size=8, checkout_timeout=5.0, batch_size=32,
+                 batch_wait_ms=5.0):
+        self.hands_pool = HandsPool(create_tracker, max_size=hands_pool_size, checkout_timeout=checkout_timeout)
+        self.runtime = ModelRuntime(backend_name, model_path, batch_sizes=(1, batch_size),
+                                    warm_ups=[self._warm_up_hands])
+        self.batcher = InferenceBatcher(self.runtime.predict, max_batch_size=batch_size, max_wait_ms=batch_wait_ms)
+        self._listener = None
+        self._lock = threading.Lock()
+        self._connections = set()
+        self._stats = {'connections': 0, 'frames': 0, 'busy': 0, 'errors': 0}
+
+    def handle(self, message):
+        """
+        Answer one request.
+
+        Args:
+            message (tuple): ('frame', session_id, img_data), ('release', session_id), ('ready',)
+                or ('stats',).
+
+        Returns:
+            tuple: ('ok', value), ('busy', reason) or ('error', reason).
+        """
+        kind = message[0]
+        if kind == 'frame':
+            _, session_id, img_data = message
+            try:
+                with self.hands_pool.acquire(session_id) as tracker:
+                    prediction = recognize_frame(img_data, tracker, self.batcher.predict)
+            except TimeoutError as e:
+                self._count('busy')
+                return 'busy', str(e)
+            except Exception as e:
+                self._count('errors')
+                return 'error', repr(e)
+            self._count('frames')
+            return 'ok', prediction
+        if kind == 'release':
+            self.hands_pool.release(message[1])
+            return 'ok', None
+        if kind == 'ready':
+            return 'ok', self.runtime.ready()
+        if kind == 'stats':
+            return 'ok', self.stats()
+        return 'error', f"Unknown request: {kind!r}"
+
+    def serve(self, address, authkey):
+        """
+        Accept connections until ``close`` is called, serving each in its own thread.
+
+        Args:
+            address (tuple | str): The address to listen on, see ``parse_address``.
+            authkey (bytes): Key shared with the web processes.
+        """
+        if isinstance(address, str) and os.path.exists(address):
+            os.unlink(address)  # Socket file left behind by a previous run
+        listener = self._listener = Listener(address, authkey=authkey, backlog=64)
+        print(f"Inference service listening on {listener.address}")
+        while True:
+            try:
+                connection = listener.accept()
+            except (OSError, AuthenticationError):
+                if self._listener is not listener:
+                    return  # Closed
+                continue  # A client failed the authentication or hung up
+            threading.Thread(target=self._serve_connection, args=(connection,), name='inference-connection',
+                             daemon=True).start()
+
+    def close(self):
+        """
+        Stop accepting connections, close the open ones and stop the batcher.
+        """
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            # Wakes the serving thread up with EOF, the thread then closes the connection
+            try:
+                with socket.socket(fileno=os.dup(connection.fileno())) as sock:
+                    sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # Already closed
+        self.batcher.close()
+
+    def stats(self):
+        """
+        Return a snapshot of the service counters.
+
+        Returns:
+            dict: Connections, recognized frames, busy and failed requests, and the counters of
+            the model runtime, the batcher and the tracker pool.
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['open_connections'] = len(self._connections)
+        snapshot['runtime'] = self.runtime.stats()
+        snapshot['batching'] = self.batcher.stats()
+        snapshot['hands_pool'] = self.hands_pool.stats()
+        return snapshot
+
+    def _serve_connection(self, connection):
+        """
+        Answer the requests of one web process connection until it is closed.
+        """
+        with self._lock:
+            self._stats['connections'] += 1
+            self._connections.add(connection)
+        try:
+            while True:
+                message = connection.recv()
+                connection.send(self.handle(message))
+        except (EOFError, OSError):
+            pass  # Closed by the web process or by close
+        finally:
+            with self._lock:
+                self._connections.discard(connection)
+            connection.close()
+
+    def _warm_up_hands(self):
+        """
+        Run a blank frame through a tracker, which then stays in the pool for the first session.
+        """
+        with self.hands_pool.acquire('__warm_up__') as tracker:
+            tracker.process(np.zeros((240, 320, 3), dtype=np.uint8))
+        self.hands_pool.release('__warm_up__')
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+
+def main(argv=None):
+    """
+    Warm the model up and serve the web processes.
+
+    Args:
+        argv (list): Command line arguments, ``sys.argv`` if None.
+    """
+    model_path = config.QUANTIZED_MODEL_PATH if config.INFERENCE_BACKEND == 'int8' else config.MODEL_PATH
+    parser = argparse.ArgumentParser(description="Standalone inference service of the web tier.")
+    parser.add_argument('--address', default=config.INFERENCE_SERVICE or '127.0.0.1:6000',
+                        help="'host:port' or the path of a Unix socket")
+    parser.add_argument('--backend', default=config.INFERENCE_BACKEND, help='Inference backend')
+    parser.add_argument('--model', default=model_path, help='Model artifact')
+    args = parser.parse_args(argv)
+
+    # Messages are unpickled, the service does not listen without a secret key
+    try:
+        authkey = service_authkey(config.INFERENCE_SERVICE_AUTHKEY)
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+
+    service = InferenceService(
+        args.backend, args.model,
+        hands_pool_size=config.HANDS_POOL_SIZE,
+        checkout_timeout=config.HANDS_CHECKOUT_TIMEOUT,
+        batch_size=config.INFERENCE_BATCH_SIZE,
+        batch_wait_ms=config.INFERENCE_BATCH_WAIT_MS)
+    if not service.runtime.warm_up():
+        raise SystemExit(1)
+    try:
+        service.serve(parse_address(args.address), authkey)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
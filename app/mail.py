@@ -0,0 +1,315 @@
+"""
+Module: mail
+
+This module contains the outbox that delivers the emails of the application in the background.
+
+Requests only put a message into the outbox and return. A background thread delivers the
+messages through a transport. The SMTP transport keeps its connection open and reuses it for
+the following messages, so STARTTLS and the login are paid once per connection instead of once
+per message. A message that could not be delivered is retried with exponential backoff until
+the maximum number of attempts is reached. Messages still queued when the process exits are
+attempted once more.
+
+The transport is pluggable: ``SMTPTransport`` talks to a real server or to a local stand-in
+such as ``python -m aiosmtpd -n -l localhost:1025``, ``MemoryTransport`` keeps the messages
+in memory for tests and local runs.
+
+Classes:
+    - SMTPTransport: Delivers messages over a reused SMTP connection.
+    - MemoryTransport: Keeps delivered messages in memory.
+    - MailOutbox: Queues messages and delivers them in a background thread with retries.
+
+Functions:
+    - create_transport(name): Create the transport selected by configuration.
+
+Dependencies:
+    - smtplib
+    - threading
+    - heapq
+    - atexit
+"""
+
+import atexit
+import heapq
+import itertools
+import smtplib
+import threading
+import time
+
+from . import config
+
+
+class SMTPTransport:
+    """
+    Delivers messages over an SMTP connection that is kept open between messages.
+
+    Args:
+        host (str): The SMTP server.
+        port (int): The SMTP port.
+        username (str): The login, no login is done if empty.
+        password (str): The password of the login.
+        starttls (bool): Upgrade the connection with STARTTLS before the login.
+        timeout (float): Seconds a connection attempt or a command may take.
+        idle_timeout (float): Seconds after which an unused connection is opened again instead
+            of reused, since servers drop idle connections.
+    """
+
+    def __init__(self, host, port, username=None, password=None, starttls=True, timeout=10.0, idle_timeout=60.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._connection = None
+        self._last_used = 0.0
+        self.connects = 0
+
+    def send(self, message):
+        """
+        Deliver a message, opening a connection if there is none.
+
+        Args:
+            message (email.message.Message): The message with From and To headers.
+
+        Raises:
+            smtplib.SMTPException, OSError: If the message could not be delivered.
+        """
+        with self._lock:
+            if self._connection is not None and time.monotonic() - self._last_used > self.idle_timeout:
+                self._disconnect()
+            if self._connection is None:
+                self._connection = self._connect()
+            try:
+                self._connection.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                # The server closed the connection since the last message, open a new one once
+                self._connection = None
+                self._connection = self._connect()
+                self._connection.send_message(message)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+                raise  # Refused by the server, the connection itself is fine
+            except (smtplib.SMTPException, OSError):
+                self._disconnect()
+                raise
+            finally:
+                self._last_used = time.monotonic()
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        with self._lock:
+            self._disconnect()
+
+    def _connect(self):
+        """
+        Open and authenticate a connection.
+        """
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                connection.starttls()
+            if self.username:
+                connection.login(self.username, self.password)
+        except BaseException:
+            connection.close()
+            raise
+        self.connects += 1
+        return connection
+
+    def _disconnect(self):
+        """
+        Close the connection, ignoring a connection the server already dropped.
+        """
+        if self._connection is None:
+            return
+        try:
+            self._connection.quit()
+        except (smtplib.SMTPException, OSError):
+            self._connection.close()
+        self._connection = None
+
+
+class MemoryTransport:
+    """
+    Keeps delivered messages in memory instead of sending them, for tests and local runs.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def send(self, message):
+        self.messages.append(message)
+
+    def close(self):
+        pass
+
+
+def create_transport(name):
+    """
+    Create the transport selected by configuration.
+
+    Args:
+        name (str): 'smtp' or 'memory'.
+
+    Returns:
+        SMTPTransport | MemoryTransport: The transport.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if name == 'smtp':
+        return SMTPTransport(config.SMTP_HOST, config.SMTP_PORT, config.SMTP_USER, config.SMTP_PASSWORD,
+                             starttls=config.SMTP_STARTTLS)
+    if name == 'memory':
+        return MemoryTransport()
+    raise ValueError(f"Unknown mail transport: {name}")
+
+
+class MailOutbox:
+    """
+    Queues messages and delivers them in a background thread, retrying failed deliveries.
+
+    Args:
+        transport: Object with ``send(message)`` and ``close()``.
+        max_size (int): Maximum number of queued messages, further messages are refused.
+        max_attempts (int): Delivery attempts of a message before it is dropped.
+        backoff (float): Seconds before the first retry, doubled for every further retry.
+        max_backoff (float): Maximum seconds between two attempts.
+    """
+
+    def __init__(self, transport, max_size=1000, max_attempts=5, backoff=2.0, max_backoff=300.0):
+        self.transport = transport
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._condition = threading.Condition()
+        self._queue = []  # Heap of (due time, sequence, attempts so far, message)
+        self._sequence = itertools.count()
+        self._sending = 0
+        self._worker = None
+        self._closed = False
+        self._stats = {'queued': 0, 'sent': 0, 'retries': 0, 'failed': 0, 'refused': 0, 'send_total_ms': 0.0}
+        atexit.register(self.close)
+
+    def send(self, message):
+        """
+        Queue a message for delivery.
+
+        Args:
+            message (email.message.Message): The message with From and To headers.
+
+        Returns:
+            bool: True if the message was queued, False if the outbox is full or closed.
+        """
+        with self._condition:
+            if self._closed or len(self._queue) >= self.max_size:
+                self._stats['refused'] += 1
+                return False
+            heapq.heappush(self._queue, (time.monotonic(), next(self._sequence), 0, message))
+            self._stats['queued'] += 1
+            if self._worker is None:
+                # Started on first use, so processes forked at import time do not inherit it
+                self._worker = threading.Thread(target=self._run, name='mail-outbox', daemon=True)
+                self._worker.start()
+            self._condition.notify()
+        return True
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued message was delivered or dropped.
+
+        Args:
+            timeout (float): Maximum seconds to wait, None waits without limit.
+
+        Returns:
+            bool: True if the outbox is empty.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._sending, timeout)
+
+    def close(self, timeout=5.0):
+        """
+        Attempt the queued messages once more, without waiting for their backoff, then stop the
+        background thread and close the transport.
+
+        Args:
+            timeout (float): Maximum seconds to wait for the background thread.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=timeout)
+        self.transport.close()
+
+    def stats(self):
+        """
+        Return a snapshot of the outbox counters.
+
+        Returns:
+            dict: Queued, sent, retried, dropped and refused messages, the queue length and the
+            mean delivery time.
+        """
+        with self._condition:
+            snapshot = dict(self._stats)
+            snapshot['pending'] = len(self._queue) + self._sending
+        sent = snapshot['sent']
+        send_total_ms = snapshot.pop('send_total_ms')
+        snapshot['mean_send_ms'] = send_total_ms / sent if sent else 0.0
+        return snapshot
+
+    def _run(self):
+        """
+        Deliver messages as they become due.
+        """
+        while True:
+            with self._condition:
+                while not self._closed and (not self._queue or self._queue[0][0] > time.monotonic()):
+                    self._condition.wait(self._queue[0][0] - time.monotonic() if self._queue else None)
+                if not self._queue:
+                    return
+                _, _, attempts, message = heapq.heappop(self._queue)
+                self._sending += 1
+            try:
+                self._deliver(message, attempts + 1)
+            finally:
+                with self._condition:
+                    self._sending -= 1
+                    self._condition.notify_all()
+
+    def _deliver(self, message, attempts):
+        """
+        Send one message and schedule a retry if it failed.
+        """
+        started = time.perf_counter()
+        try:
+            self.transport.send(message)
+        except Exception as e:
+            print(f"Failed to send email (attempt {attempts} of {self.max_attempts}): {e}")
+            with self._condition:
+                if attempts >= self.max_attempts or self._closed:
+                    self._stats['failed'] += 1
+                    return
+                delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+                heapq.heappush(self._queue, (time.monotonic() + delay, next(self._sequence), attempts, message))
+                self._stats['retries'] += 1
+            return
+        with self._condition:
+            self._stats['sent'] += 1
+            self._stats['send_total_ms'] += (time.perf_counter() - started) * 1000.0
+
+
+# Outbox of the emails sent by the routes
+mail_outbox = MailOutbox(
+    create_transport(config.MAIL_TRANSPORT),
+    max_size=config.MAIL_QUEUE_SIZE,
+    max_attempts=config.MAIL_MAX_ATTEMPTS,
+    backoff=config.MAIL_RETRY_BACKOFF,
+)
@@ -0,0 +1,396 @@
+"""
+Module: migrations
+
+This module contains the versioned schema migrations of the application database.
+
+Every migration has a version number and is applied at most once. The versions applied so far
+are recorded in the schema_version table. Migrations are applied by running
+
+    python -m app.migrations
+
+which creates the database if needed and applies the pending migrations in order. Application
+startup only checks that the schema is up to date and does not run DDL.
+
+Migrations are written in the MySQL dialect and also run on the SQLite backend, which
+translates them. A migration that cannot be translated, such as a stored procedure, gives its
+own SQLite steps.
+
+Classes:
+    - Migration: One versioned schema change.
+
+Functions:
+    - add_index(table, name, columns): Migration step creating an index unless it exists.
+    - current_version(cursor): Return the highest applied schema version.
+    - migrate(target): Apply the pending migrations.
+    - check_schema(): Check that the database schema is up to date.
+    - main(argv): Command line entry point.
+
+Dependencies:
+    - mysql.connector
+    - argparse
+    - datetime
+"""
+
+import argparse
+from datetime import datetime
+
+from mysql.connector import Error
+
+from . import config
+from .database import create_connection, create_database
+
+# Serializes migrators started at the same time, for example by several deployments
+MIGRATION_LOCK = 'sli_schema_migrations'
+
+
+class Migration:
+    """
+    One versioned schema change.
+
+    Args:
+        version (int): Schema version after the migration, versions are applied in ascending order.
+        description (str): Short description recorded with the version.
+        steps (list): SQL statements, or callables taking a cursor, run in order.
+        sqlite_steps (list): Steps run instead on the SQLite backend, None to run ``steps``.
+    """
+
+    def __init__(self, version, description, steps, sqlite_steps=None):
+        self.version = version
+        self.description = description
+        self.steps = steps
+        self.sqlite_steps = sqlite_steps
+
+    def apply(self, cursor):
+        """
+        Run the steps of the migration.
+
+        Args:
+            cursor: Database cursor.
+        """
+        steps = self.steps
+        if config.DB_BACKEND == 'sqlite' and self.sqlite_steps is not None:
+            steps = self.sqlite_steps
+        for step in steps:
+            if callable(step):
+                step(cursor)
+            else:
+                cursor.execute(step)
+
+
+def add_index(table, name, columns):
+    """
+    Migration step creating an index unless it exists, MySQL has no CREATE INDEX IF NOT EXISTS.
+
+    Args:
+        table (str): The table.
+        name (str): The index name.
+        columns (str): The indexed columns, comma separated.
+
+    Returns:
+        callable: The step, taking a cursor.
+    """
+    def step(cursor):
+        if config.DB_BACKEND == 'sqlite':
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+            return
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s", (table, name))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+    return step
+
+
+CREATE_PLANS = '''
+    CREATE TABLE IF NOT EXISTS subscription_plan (
+        plan_id INT AUTO_INCREMENT PRIMARY KEY,
+        plan_name VARCHAR(255) NOT NULL,
+        daily_limit INT,
+        price DOUBLE,
+        UNIQUE (plan_name)
+    )
+    '''
+
+SEED_PLANS = '''
+    INSERT IGNORE INTO subscription_plan (plan_name, daily_limit, price) VALUES
+    ('Basic', 25, 0),
+    ('Standard', 250, 19.99),
+    ('Unlimited', NULL, 49.99)
+    '''
+
+# The users table of the initial schema declares reset_token after its constraints, which
+# SQLite does not accept
+CREATE_USERS = '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        name VARCHAR(255),
+        surname VARCHAR(255),
+        plan_name VARCHAR(255),
+        recognized_count INT,
+        last_reset datetime,
+        UNIQUE (username),
+        UNIQUE (email),
+        reset_token VARCHAR(255),
+        FOREIGN KEY (plan_name) REFERENCES subscription_plan(plan_name)
+    )
+    '''
+
+CREATE_USERS_SQLITE = '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        name VARCHAR(255),
+        surname VARCHAR(255),
+        plan_name VARCHAR(255),
+        recognized_count INT,
+        last_reset datetime,
+        reset_token VARCHAR(255),
+        UNIQUE (username),
+        UNIQUE (email),
+        FOREIGN KEY (plan_name) REFERENCES subscription_plan(plan_name)
+    )
+    '''
+
+SEED_USERS = '''
+    INSERT IGNORE INTO users (username, email, password, name, surname, plan_name) VALUES
+    ('aehuser', 'aehuser@aeh.pl', 'Aehuser1', 'Aeh', 'User', 'Unlimited')
+    '''
+
+CREATE_PAYMENTS = '''
+    CREATE TABLE IF NOT EXISTS payments (
+        payment_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        payment_date date,
+        amount double,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    '''
+
+MIGRATIONS = [
+    Migration(1, 'Initial schema',
+              [CREATE_PLANS, SEED_PLANS, CREATE_USERS, SEED_USERS, CREATE_PAYMENTS],
+              sqlite_steps=[CREATE_PLANS, SEED_PLANS, CREATE_USERS_SQLITE, SEED_USERS, CREATE_PAYMENTS]),
+    Migration(2, 'Index password reset tokens and plan lookups', [
+        # reset_with_token looks users up by their token
+        add_index('users', 'idx_users_reset_token', 'reset_token'),
+        # The daily reset filters on the plan and the last reset, the plan column alone serves the foreign key
+        add_index('users', 'idx_users_plan_reset', 'plan_name, last_reset'),
+    ]),
+    Migration(3, 'Plan purchase procedure', [
+        'DROP PROCEDURE IF EXISTS purchase_plan',
+        # Looks up the user and both plans, changes the plan and records the payment in one
+        # transaction. Only the user row is locked, purchases of different users do not wait
+        # for each other. Reports the outcome as a (status, amount) row.
+        '''
+        CREATE PROCEDURE purchase_plan(IN p_username VARCHAR(255), IN p_plan_name VARCHAR(255))
+        BEGIN
+            DECLARE v_user_id INT DEFAULT NULL;
+            DECLARE v_current_plan_id INT DEFAULT NULL;
+            DECLARE v_new_plan_id INT DEFAULT NULL;
+            DECLARE v_price DOUBLE DEFAULT NULL;
+            DECLARE CONTINUE HANDLER FOR NOT FOUND SET v_user_id = NULL;
+            DECLARE EXIT HANDLER FOR SQLEXCEPTION
+            BEGIN
+                ROLLBACK;
+                RESIGNAL;
+            END;
+
+            START TRANSACTION;
+            SELECT u.id, current_plan.plan_id, new_plan.plan_id, new_plan.price
+              INTO v_user_id, v_current_plan_id, v_new_plan_id, v_price
+              FROM users u
+              LEFT JOIN subscription_plan current_plan ON current_plan.plan_name = u.plan_name
+              LEFT JOIN subscription_plan new_plan ON new_plan.plan_name = p_plan_name
+             WHERE u.username = p_username
+               FOR UPDATE OF u;
+
+            IF v_user_id IS NULL THEN
+                ROLLBACK;
+                SELECT 'user_not_found' AS status, NULL AS amount;
+            ELSEIF v_current_plan_id IS NULL THEN
+                ROLLBACK;
+                SELECT 'current_plan_not_found' AS status, NULL AS amount;
+            ELSEIF v_new_plan_id IS NULL THEN
+                ROLLBACK;
+                SELECT 'plan_not_found' AS status, NULL AS amount;
+            ELSEIF v_new_plan_id = v_current_plan_id THEN
+                ROLLBACK;
+                SELECT 'same_plan' AS status, NULL AS amount;
+            ELSE
+                UPDATE users SET plan_name = p_plan_name WHERE id = v_user_id;
+                INSERT INTO payments (user_id, payment_date, amount) VALUES (v_user_id, CURDATE(), v_price);
+                COMMIT;
+                SELECT 'purchased' AS status, v_price AS amount;
+            END IF;
+        END
+        ''',
+    ], sqlite_steps=[]),  # Implemented in Python by app/sqlite_backend.py
+    Migration(4, 'Index the payment history of a user', [
+        # Serves the keyset pagination of the payment history, newest first
+        add_index('payments', 'idx_payments_user_date', 'user_id, payment_date, payment_id'),
+    ]),
+    Migration(5, 'Scheduled job run markers', [
+        # One row per job and day, claimed by the first worker that runs the job
+        '''
+        CREATE TABLE IF NOT EXISTS job_runs (
+            job_name VARCHAR(64) NOT NULL,
+            run_date date NOT NULL,
+            started_at datetime NOT NULL,
+            finished_at datetime,
+            rows_affected INT,
+            PRIMARY KEY (job_name, run_date)
+        )
+        ''',
+    ]),
+]
+
+# Schema version the code expects
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def _ensure_version_table(cursor):
+    """
+    Create the schema_version table if it does not exist.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            description VARCHAR(255),
+            applied_at datetime
+        )
+    ''')
+
+
+def current_version(cursor):
+    """
+    Return the highest applied schema version.
+
+    Args:
+        cursor: Database cursor.
+
+    Returns:
+        int: The schema version, 0 if no migration was applied.
+    """
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def migrate(target=None):
+    """
+    Apply the pending migrations in order, up to a target version.
+
+    MySQL commits DDL implicitly, so every migration is recorded right after it ran. A failed
+    migration stops the run and is attempted again by the next one; its statements are written
+    to be safe to repeat.
+
+    Args:
+        target (int): Last version to apply, the latest one if None.
+
+    Returns:
+        int: The schema version after the run, or None if the database could not be reached.
+    """
+    if not create_database():
+        print("Failed to connect to the database.")
+        return None
+    connection = create_connection()
+    if connection is None:
+        print("Failed to connect to the database.")
+        return None
+    target = MIGRATIONS[-1].version if target is None else target
+    cursor = connection.cursor()
+    locking = config.DB_BACKEND != 'sqlite'  # The SQLite backend serves a single node
+    try:
+        if locking:
+            cursor.execute("SELECT GET_LOCK(%s, 60)", (MIGRATION_LOCK,))
+            if cursor.fetchone()[0] != 1:
+                print("Another migration is running.")
+                return None
+        try:
+            _ensure_version_table(cursor)
+            version = current_version(cursor)
+            for migration in MIGRATIONS:
+                if version < migration.version <= target:
+                    print(f"Applying migration {migration.version}: {migration.description}")
+                    migration.apply(cursor)
+                    cursor.execute(
+                        "INSERT INTO schema_version (version, description, applied_at) VALUES (%s, %s, %s)",
+                        (migration.version, migration.description, datetime.now()))
+                    connection.commit()
+                    version = migration.version
+            return version
+        finally:
+            if locking:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+                cursor.fetchone()
+    except Error as e:
+        print(f"Error: {e}")
+        return None
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def check_schema():
+    """
+    Check that the database schema is up to date, without changing it.
+
+    Returns:
+        bool: True if all migrations are applied.
+    """
+    connection = create_connection()
+    if connection is None:
+        print("Failed to connect to the database.")
+        return False
+    cursor = connection.cursor()
+    try:
+        if config.DB_BACKEND == 'sqlite':
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'")
+        else:
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = 'schema_version'")
+        version = current_version(cursor) if cursor.fetchone()[0] else 0
+    except Error as e:
+        print(f"Error: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+    if version < LATEST_VERSION:
+        print(f"Database schema is at version {version}, version {LATEST_VERSION} is required. "
+              f"Run 'python -m app.migrations' to apply the pending migrations.")
+        return False
+    return True
+
+
+def main(argv=None):
+    """
+    Command line entry point, applies the pending migrations or shows the schema version.
+
+    Args:
+        argv (list): Command line arguments, sys.argv if None.
+
+    Returns:
+        int: Exit status.
+    """
+    parser = argparse.ArgumentParser(description="Apply the schema migrations of the application database.")
+    parser.add_argument('--target', type=int, default=None, help="last version to apply (default: latest)")
+    parser.add_argument('--check', action='store_true', help="only check that the schema is up to date")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        return 0 if check_schema() else 1
+    version = migrate(args.target)
+    if version is None:
+        return 1
+    print(f"Database schema is at version {version}.")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
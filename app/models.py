@@ -7,50 +7,106 @@ the MediaPipe Hands library and a trained deep learning model.
 
 Functions:
     - websocket_index(): Render the index.html template for the WebSocket application.
-    - get_user_sign_limit(): Get the sign limit for the current user.
-    - reset_recognition_count(username): Reset the recognition count for the specified user.
-    - update_last_reset(username, last_reset): Update the last reset time for the specified user.
-    - update_recognized_count(username, count): Update the recognized count for the specified user.
+    - warm_up_hands(): Run a blank frame through a MediaPipe tracker.
+    - inference_metrics(): Return the counters of the database pool, frame skipping, batching and trackers as JSON.
+    - is_ready(): Tell whether the model is loaded and warmed up.
+    - readiness(): Readiness probe reporting whether the warm-up is done.
+    - current_username(): Get the username of the current user, or a guest ID.
 
 WebSocket Event Handlers:
     - handle_image(data): Handle image data received from the client and perform gesture recognition.
+    - handle_connect(): Resolve the quota of a newly connected client.
+    - handle_disconnect(): Give the hand tracker and quota of a disconnected client back.
 
 Dependencies:
     - Flask
     - Flask-SocketIO
-    - TensorFlow
-    - OpenCV (cv2)
-    - Base64
-    - MediaPipe
-    - datetime
+    - TensorFlow (Keras inference backend only, loaded on first use)
+    - NumPy
+    - logging
     - uuid
 """
 
-from flask import Flask, render_template, session
+from flask import Flask, render_template, session, jsonify, request
 from flask_socketio import SocketIO, emit
-from tensorflow.keras.models import load_model
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from .database import db_pool
+from .batching import InferenceBatcher
+from .frame_workers import FrameWorkerPool, FrameTooLarge
+from .hands_pool import HandsPool
+from .inference_client import InferenceClient, parse_address, service_authkey
+from .mail import mail_outbox
+from .motion import MotionGate
+from .page_cache import page_cache
+from .passwords import password_hasher
+from .plans import plan_catalog
+from .quota import consume_sign, quota_contexts
+from .scheduler import quota_reset
+from .usage import usage_meter
+from .runtime import ModelRuntime
+from .pipeline import create_tracker, frame_data, get_tracking_stats, labels, recognize_frame
+from . import config
+import logging
 import numpy as np
-import cv2
-import base64
-import mediapipe as mp
-from .database import create_connection, init_db, reset_recognized_count, revoke_drop_privileges
-from datetime import datetime, timedelta
 import uuid  # Import to generate unique guest IDs
 
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'AEH'
 socketio = SocketIO(app)
-model = load_model('models/final_model/final_model.h5')
 
-# Initialize MediaPipe Hands
-mp_hands = mp.solutions.hands.Hands(
-    static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+# Inference backend selected through configuration ('keras', 'numpy' or 'int8')
+model_path = config.QUANTIZED_MODEL_PATH if config.INFERENCE_BACKEND == 'int8' else config.MODEL_PATH
+
+# Reuse the last prediction of a session while its frames do not change
+motion_gate = MotionGate(threshold=config.MOTION_THRESHOLD, max_skips=config.MOTION_MAX_SKIPS)
+
+# Session id under which the warm-up runs a blank frame through a tracker
+WARM_UP_SESSION = '__warm_up__'
 
-# Labels for the gesture recognition model
-labels = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O',
-          'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'del', 'nothing', 'space']
 
-model = load_model('models/final_model/final_model.h5')
+def warm_up_hands():
+    """
+    Run a blank frame through a MediaPipe tracker, which then stays in the pool for the first session.
+    """
+    with hands_pool.acquire(WARM_UP_SESSION) as tracker:
+        tracker.process(np.zeros((240, 320, 3), dtype=np.uint8))
+    hands_pool.release(WARM_UP_SESSION)
+
+
+# Out of process recognition: frame_pool is a FrameWorkerPool or an InferenceClient
+frame_pool = hands_pool = model_runtime = batcher = None
+if config.INFERENCE_SERVICE:
+    # The standalone inference service owns MediaPipe and the model, this process only forwards frames
+    frame_pool = InferenceClient(
+        parse_address(config.INFERENCE_SERVICE), service_authkey(config.INFERENCE_SERVICE_AUTHKEY),
+        max_connections=config.INFERENCE_SERVICE_CONNECTIONS,
+        timeout=config.FRAME_TIMEOUT)
+elif config.FRAME_WORKERS > 0:
+    # Worker processes own MediaPipe and the model, this process only dispatches frames.
+    # They are forked here, before this process loads anything heavy or starts a thread.
+    frame_pool = FrameWorkerPool(
+        config.FRAME_WORKERS, config.INFERENCE_BACKEND, model_path,
+        slots_per_worker=config.FRAME_SLOTS_PER_WORKER,
+        slot_size=config.FRAME_SLOT_SIZE,
+        hands_pool_size=config.HANDS_POOL_SIZE)
+else:
+    # Initialize MediaPipe Hands, one tracker per active session
+    hands_pool = HandsPool(
+        create_tracker, max_size=config.HANDS_POOL_SIZE, checkout_timeout=config.HANDS_CHECKOUT_TIMEOUT)
+
+    # The model is loaded on first use or by the warm-up started with the application
+    model_runtime = ModelRuntime(
+        config.INFERENCE_BACKEND, model_path,
+        batch_sizes=(1, config.INFERENCE_BATCH_SIZE),
+        warm_ups=[warm_up_hands])
+
+    # Batch landmark vectors from all sessions into a single forward pass
+    batcher = InferenceBatcher(
+        model_runtime.predict,
+        max_batch_size=config.INFERENCE_BATCH_SIZE,
+        max_wait_ms=config.INFERENCE_BATCH_WAIT_MS)
 
 
 def websocket_index():
@@ -63,95 +119,86 @@ def websocket_index():
     return render_template('index.html')
 
 
-def get_user_sign_limit():
+def inference_metrics():
     """
-    Get the sign limit for the current user.
+    Return the counters of the database pool, the plan catalog, quota contexts and resets, usage
+    metering, password hashing, the mail outbox, the page cache, frame skipping and of the model
+    runtime, the inference batcher, the hand tracker pool and ROI tracking, or of the frame worker
+    pool or the inference service when frames are processed out of process, used to tune them.
 
     Returns:
-        int: The sign limit for the user. If the user is not logged in or the limit cannot be retrieved,
-        a default limit of 10 is returned.
+        Response: JSON with database pool, plan catalog, quota context, quota reset, usage meter, password hasher,
+        mail outbox, page cache, motion gate, model runtime, batching, tracker pool, ROI tracking and frame worker or
+        inference service statistics.
     """
-    if 'username' in session:
-        username = session['username']
+    metrics = {
+        'db_pool': db_pool.stats(),
+        'plan_catalog': plan_catalog.stats(),
+        'quota_contexts': quota_contexts.stats(),
+        'quota_reset': quota_reset.stats(),
+        'usage_meter': usage_meter.stats(),
+        'password_hasher': password_hasher.stats(),
+        'mail_outbox': mail_outbox.stats(),
+        'page_cache': page_cache.stats(),
+        'motion_gate': motion_gate.stats(),
+    }
+    if frame_pool is not None:
+        metrics['inference_service' if config.INFERENCE_SERVICE else 'frame_workers'] = frame_pool.stats()
     else:
-        if 'guest_id' not in session:
-            session['guest_id'] = str(uuid.uuid4())  # Generate a unique guest ID
-        username = session['guest_id']
-
-    connection = create_connection()
-    if connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute('''
-            SELECT users.plan_name, users.last_reset, users.recognized_count, subscription_plan.daily_limit
-            FROM users
-            JOIN subscription_plan ON users.plan_name = subscription_plan.plan_name
-            WHERE users.username = %s
-        ''', (username,))
-        user_data = cursor.fetchone()
-        cursor.close()
-        connection.close()
-        if user_data:
-            last_reset = user_data['last_reset']
-            daily_limit = user_data['daily_limit']
-            if last_reset is None or (datetime.now() - last_reset).days >= 1:
-                reset_recognition_count(username)
-                last_reset = datetime.now()
-                update_last_reset(username, last_reset)
-            return daily_limit if daily_limit is not None else float('inf')  # Handle unlimited plan
-    return 10  # Default limit for guests
-
-
-def reset_recognition_count(username):
-    """
-    Reset the recognition count for the specified user.
+        metrics.update({
+            'runtime': model_runtime.stats(),
+            'batching': batcher.stats(),
+            'hands_pool': hands_pool.stats(),
+            'roi_tracking': get_tracking_stats(),
+        })
+    return jsonify(metrics)
 
-    Args:
-        username (str): The username for which the recognition count should be reset.
+
+def is_ready():
     """
-    connection = create_connection()
-    if connection:
-        cursor = connection.cursor()
-        cursor.execute(
-            "UPDATE users SET recognized_count = 0 WHERE username = %s", (username,))
-        connection.commit()
-        cursor.close()
-        connection.close()
+    Tell whether this process is ready for recognition traffic: the model is loaded and warmed
+    up, by the frame workers or the inference service when frames are processed out of process.
+    Without warm-up the model is loaded by the first frame and the process is always ready.
 
+    The warm-up is started here if the server entry point did not start it, for example when the
+    application runs under a WSGI server or 'flask run' without calling startup().
 
-def update_last_reset(username, last_reset):
+    Returns:
+        bool: True if frames can be processed without a cold start.
     """
-    Update the last reset time for the specified user.
+    if not config.MODEL_WARMUP:
+        return True
+    if frame_pool is not None:
+        return frame_pool.ready()
+    if not model_runtime.ready():
+        model_runtime.start_warm_up()
+        return False
+    return True
 
-    Args:
-        username (str): The username for which the last reset time should be updated.
-        last_reset (datetime): The new last reset time.
+
+def readiness():
     """
-    connection = create_connection()
-    if connection:
-        cursor = connection.cursor()
-        cursor.execute(
-            "UPDATE users SET last_reset = %s WHERE username = %s", (last_reset, username))
-        connection.commit()
-        cursor.close()
-        connection.close()
+    Readiness probe for the load balancer.
 
+    Returns:
+        Response: JSON with the readiness flag, with status 503 until the warm-up is done.
+    """
+    ready = is_ready()
+    return jsonify({'ready': ready}), 200 if ready else 503
 
-def update_recognized_count(username, count):
+
+def current_username():
     """
-    Update the recognized count for the specified user.
+    Get the username of the current user, or a guest ID for visitors who are not logged in.
 
-    Args:
-        username (str): The username for which the recognized count should be updated.
-        count (int): The new recognized count.
+    Returns:
+        str: The username or guest ID.
     """
-    connection = create_connection()
-    if connection:
-        cursor = connection.cursor()
-        cursor.execute(
-            "UPDATE users SET recognized_count = %s WHERE username = %s", (count, username))
-        connection.commit()
-        cursor.close()
-        connection.close()
+    if 'username' in session:
+        return session['username']
+    if 'guest_id' not in session:
+        session['guest_id'] = str(uuid.uuid4())  # Generate a unique guest ID
+    return session['guest_id']
 
 
 @socketio.on('image')
@@ -160,78 +207,79 @@ def handle_image(data):
     Handle image data received from the client and perform gesture recognition.
 
     Args:
-        data (dict): A dictionary containing the image data.
+        data (dict): A dictionary containing the image data, as a binary attachment or a base64 string.
     """
-    if 'recognized_count' not in session:
-        session['recognized_count'] = 0
+    # Frames arriving before the warm-up finished would wait for the model to load
+    if not is_ready():
+        emit('busy')
+        return
+
+    # Plan and daily limit resolved on connect, refreshed at the daily reset or on a plan change
+    quota = quota_contexts.get(request.sid, current_username())
+    if quota.exhausted:
+        emit('limit_reached')
+        return
+
+    img_data = frame_data(data['image'])
+
+    # A frame that did not change since the last processed one keeps its prediction and is not
+    # counted against the quota
+    skip, predicted_class, signature = motion_gate.lookup(request.sid, img_data)
+    if skip:
+        emit('prediction', {'prediction': predicted_class or 'No hand detected', 'unchanged': True})
+        return
+
+    try:
+        if frame_pool is not None:
+            future = frame_pool.submit(request.sid, img_data, timeout=config.FRAME_TIMEOUT)
+            predicted_class = future.result(timeout=config.FRAME_TIMEOUT)
+        else:
+            # Process the image using the MediaPipe Hands tracker of this session
+            with hands_pool.acquire(request.sid) as tracker:
+                predicted_class = recognize_frame(img_data, tracker, batcher.predict)
+    except (TimeoutError, FutureTimeoutError):
+        emit('busy')
+        return
+    except (ConnectionError, RuntimeError) as e:
+        # The inference service is unreachable, or the worker or service failed on this frame
+        logger.error("Frame of session %s failed: %s", request.sid, e)
+        emit('busy')
+        return
+    except FrameTooLarge as e:
+        # Answered like the other rejections, so the client does not wait for this frame
+        logger.warning("Frame of session %s rejected: %s", request.sid, e)
+        emit('frame_too_large', {'max_size': frame_pool.slot_size})
+        return
+
+    motion_gate.store(request.sid, signature, predicted_class)
+
+    if predicted_class is None:
+        emit('prediction', {'prediction': 'No hand detected'})
+        return
 
-    limit = get_user_sign_limit()
-    if session['recognized_count'] >= limit:
+    # Check the limit and count the sign in one step, shared by all connections of the user
+    if not consume_sign(quota):
         emit('limit_reached')
         return
 
-    img_data = base64.b64decode(data['image'])
-    np_img = np.frombuffer(img_data, np.uint8)
-    img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
-    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-    # Process the image using MediaPipe Hands
-    results = mp_hands.process(img)
-
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-        
-            h, w, _ = img.shape
-            x_min = int(min(lm.x for lm in hand_landmarks.landmark) * w)
-            x_max = int(max(lm.x for lm in hand_landmarks.landmark) * w)
-            y_min = int(min(lm.y for lm in hand_landmarks.landmark) * h)
-            y_max = int(max(lm.y for lm in hand_landmarks.landmark) * h)
-
-            # Ensure coordinates are within image bounds
-            x_min = max(0, x_min)
-            y_min = max(0, y_min)
-            x_max = min(w, x_max)
-            y_max = min(h, y_max)
-
-            # Region of Interest (ROI)
-            roi = img[y_min:y_max, x_min:x_max]
-            if roi.size == 0:
-                continue
-            zoomed_roi = cv2.resize(roi, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_LINEAR)
-
-            # Adjusting new ROI coordinates to stay within bounds
-            new_y_max = min(y_min + zoomed_roi.shape[0], h)
-            new_y_min = max(0, new_y_max - zoomed_roi.shape[0])
-            new_x_max = min(x_min + zoomed_roi.shape[1], w)
-            new_x_min = max(0, new_x_max - zoomed_roi.shape[1])
-
-            zoomed_roi = zoomed_roi[:new_y_max-new_y_min, :new_x_max-new_x_min]
-
-            img[new_y_min:new_y_max, new_x_min:new_x_max] = zoomed_roi
-
-            # Prepare landmarks for prediction
-            landmarks = []
-            for lm in hand_landmarks.landmark:
-                landmarks.append([lm.x, lm.y, lm.z])
-
-            landmarks = np.array(landmarks).flatten()
-            landmarks = (landmarks - np.min(landmarks)) / (np.max(landmarks) - np.min(landmarks))
-            landmarks = np.expand_dims(landmarks, axis=0)
-
-            # Make prediction
-            prediction = model.predict(landmarks)
-            predicted_class = labels[np.argmax(prediction)]
-
-            session['recognized_count'] += 1
-
-            # Update the recognized count in the database
-            if 'username' in session:
-                username = session['username']
-            else:
-                username = session['guest_id']
-            update_recognized_count(username, session['recognized_count'])
-
-            emit('prediction', {'prediction': predicted_class})
-            return
-
-    emit('prediction', {'prediction': 'No hand detected'})
+    emit('prediction', {'prediction': predicted_class})
+
+
+def handle_connect():
+    """
+    Resolve the plan, daily limit and reset boundary of a newly connected client.
+    """
+    quota_contexts.open(request.sid, current_username())
+
+
+def handle_disconnect():
+    """
+    Give the hand tracker of a disconnected client back to the pool and drop its cached
+    prediction and quota.
+    """
+    motion_gate.release(request.sid)
+    quota_contexts.release(request.sid)
+    if frame_pool is not None:
+        frame_pool.release(request.sid)
+    else:
+        hands_pool.release(request.sid)
@@ -0,0 +1,158 @@
+"""
+Module: motion
+
+This module contains a per-session change detector that lets the server skip frames that are
+essentially identical to the last processed frame of the same session.
+
+Users often hold one sign still for several seconds. Every frame gets a tiny grayscale
+signature, decoded by libjpeg at 1/8 scale and downsampled further, which costs a small
+fraction of the full pipeline. When the mean absolute difference to the signature of the last
+processed frame stays below a threshold, the prediction of that frame is reused.
+
+Classes:
+    - MotionGate: Caches the last prediction of each session and decides whether a frame must be processed.
+
+Functions:
+    - frame_signature(img_data, size): Compute the grayscale signature of an encoded frame.
+
+Dependencies:
+    - NumPy
+    - OpenCV (cv2)
+    - threading
+    - collections
+"""
+
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+SIGNATURE_SIZE = (32, 24)
+
+
+def frame_signature(img_data, size=SIGNATURE_SIZE):
+    """
+    Compute the grayscale signature of an encoded frame.
+
+    Args:
+        img_data (bytes-like): The encoded frame.
+        size (tuple): (width, height) of the signature.
+
+    Returns:
+        np.ndarray: The signature as float32 gray levels, or None if the frame could not be decoded.
+    """
+    img = cv2.imdecode(np.frombuffer(img_data, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if img is None:
+        return None
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+class _Entry:
+    """
+    Signature and prediction of the last processed frame of one session.
+    """
+
+    __slots__ = ('signature', 'prediction', 'skips')
+
+    def __init__(self, signature, prediction):
+        self.signature = signature
+        self.prediction = prediction
+        self.skips = 0
+
+
+class MotionGate:
+    """
+    Per-session change detector with the cached prediction of the last processed frame.
+
+    Frames are compared with the last processed frame rather than the previous one, so slow
+    drift still triggers processing once it adds up to the threshold.
+
+    Args:
+        threshold (float): Mean absolute gray level difference (0-255) below which a frame counts
+            as unchanged. 0 disables skipping.
+        max_skips (int): Consecutive skipped frames after which a frame is processed anyway.
+        max_sessions (int): Maximum number of sessions kept, least recently used ones are dropped.
+    """
+
+    def __init__(self, threshold=4.0, max_skips=30, max_sessions=1024):
+        self.threshold = threshold
+        self.max_skips = max_skips
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # session_id -> _Entry, least recently used first
+        self._stats = {'frames': 0, 'skipped': 0, 'refreshes': 0}
+
+    def lookup(self, session_id, img_data):
+        """
+        Decide whether a frame has to go through the pipeline.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+            img_data (bytes-like): The encoded frame.
+
+        Returns:
+            tuple: (skip, prediction, signature). When skip is true, prediction is the cached
+            prediction of the session (None if no hand was detected). Otherwise the signature
+            is passed to ``store`` together with the new prediction.
+        """
+        if self.threshold <= 0:
+            with self._lock:
+                self._stats['frames'] += 1
+            return False, None, None
+        signature = frame_signature(img_data)
+        with self._lock:
+            self._stats['frames'] += 1
+            entry = self._entries.get(session_id)
+            if entry is None or signature is None or entry.signature.shape != signature.shape:
+                return False, None, signature
+            self._entries.move_to_end(session_id)
+            if np.mean(np.abs(signature - entry.signature)) >= self.threshold:
+                return False, None, signature
+            if entry.skips >= self.max_skips:
+                self._stats['refreshes'] += 1
+                return False, None, signature
+            entry.skips += 1
+            self._stats['skipped'] += 1
+            return True, entry.prediction, signature
+
+    def store(self, session_id, signature, prediction):
+        """
+        Remember the prediction of a processed frame.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+            signature (np.ndarray): The signature returned by ``lookup``.
+            prediction (str): The predicted label, or None if no hand was detected.
+        """
+        if signature is None:
+            return
+        with self._lock:
+            self._entries[session_id] = _Entry(signature, prediction)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def release(self, session_id):
+        """
+        Forget a session, for example when its socket disconnects.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+        """
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def stats(self):
+        """
+        Return a snapshot of the gate counters.
+
+        Returns:
+            dict: Frames seen, frames skipped, forced refreshes, skip ratio and tracked sessions.
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['sessions'] = len(self._entries)
+        snapshot['skip_ratio'] = snapshot['skipped'] / snapshot['frames'] if snapshot['frames'] else 0.0
+        snapshot['threshold'] = self.threshold
+        return snapshot
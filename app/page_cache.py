@@ -0,0 +1,170 @@
+"""
+Module: page_cache
+
+This module contains a cache of rendered HTML pages.
+
+The home, interpreter and pricing pages only depend on whether the visitor is logged in and,
+for the pricing page, on the subscription plans, yet every request rendered their Jinja
+templates again. The cache keeps the rendered body per path and logged-in state and serves it
+with an ETag and a Last-Modified header, so browsers revalidate with a conditional request
+and get a 304 response without a body while the page is unchanged.
+
+A cached page can depend on a version, such as the ETag of the plan catalog. The page is
+rendered again as soon as the version changes, so a plan change reaches the pricing page with
+the next catalog load. Pages are never cached while their version is unknown, for example when
+the plans could not be loaded.
+
+Classes:
+    - PageCache: Rendered pages keyed on the path and a variant of the request.
+
+Dependencies:
+    - Flask
+    - threading
+    - hashlib
+"""
+
+import functools
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import Response, make_response, request
+
+from . import config
+
+
+class PageCache:
+    """
+    Cache of rendered pages with ETag and Last-Modified revalidation.
+
+    Args:
+        ttl (float): Seconds a rendered page is served before it is rendered again, 0 disables the cache.
+        max_entries (int): Maximum number of cached pages, the oldest page is dropped first.
+    """
+
+    def __init__(self, ttl=300.0, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}  # (path, variant) -> entry dictionary
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'bypassed': 0, 'invalidations': 0}
+
+    def cached(self, view, vary=None, version=None):
+        """
+        Wrap a view so that its rendered page is cached.
+
+        Only successful responses are cached. Responses carry ``Cache-Control: private, no-cache``
+        and ``Vary: Cookie``, so browsers keep their own copy but revalidate it on every visit.
+
+        Args:
+            view (callable): The view function rendering the page.
+            vary (callable): Returns the variant of the current request, for example the
+                logged-in state, pages are cached per path and variant.
+            version (callable): Returns the version of the data the page is rendered from, or
+                None if it is unknown and the page must not be cached.
+
+        Returns:
+            callable: The wrapped view, with the name of the view.
+        """
+        @functools.wraps(view)
+        def cached_view(*args, **kwargs):
+            tag = version() if version is not None else ''
+            if self.ttl <= 0 or tag is None:
+                self._count('bypassed')
+                return view(*args, **kwargs)
+
+            key = (request.path, vary() if vary is not None else None)
+            entry = self._get(key, tag)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = self._store(key, tag, response)
+            return self._respond(entry)
+
+        return cached_view
+
+    def invalidate(self):
+        """
+        Drop all cached pages, for example after a template was changed at runtime.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        """
+        Return a snapshot of the cache counters.
+
+        Returns:
+            dict: Hits, misses, 304 responses, uncached requests, invalidations and the number
+            of cached pages.
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['entries'] = len(self._entries)
+        return snapshot
+
+    def _get(self, key, tag):
+        """
+        Return the cached entry of a key if it is current, counting the hit or miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['version'] == tag and time.monotonic() < entry['expires']:
+                self._stats['hits'] += 1
+                return entry
+            self._stats['misses'] += 1
+            return None
+
+    def _store(self, key, tag, response):
+        """
+        Cache a rendered response. A page rendered again with the same body keeps its validators,
+        a changed page gets a Last-Modified later than the previous one.
+        """
+        body = response.get_data()
+        etag = hashlib.sha1(body).hexdigest()
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None and previous['etag'] == etag:
+                last_modified = previous['last_modified']
+            elif previous is not None:
+                last_modified = max(now, previous['last_modified'] + timedelta(seconds=1))
+            else:
+                last_modified = now
+            entry = {
+                'body': body,
+                'mimetype': response.mimetype,
+                'etag': etag,
+                'last_modified': last_modified,
+                'version': tag,
+                'expires': time.monotonic() + self.ttl,
+            }
+            while len(self._entries) >= self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = entry
+        return entry
+
+    def _respond(self, entry):
+        """
+        Build the response of a cached entry, a 304 if the request already has it.
+        """
+        response = Response(entry['body'], mimetype=entry['mimetype'])
+        response.set_etag(entry['etag'])
+        response.last_modified = entry['last_modified']
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Cookie')
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            self._count('not_modified')
+        return response
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+
+# Rendered pages shared by the page routes
+page_cache = PageCache(ttl=config.PAGE_CACHE_TTL)
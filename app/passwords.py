@@ -0,0 +1,190 @@
+"""
+Module: passwords
+
+This module contains the password hashing service of the application.
+
+bcrypt is slow on purpose: one hash or check takes tens to hundreds of milliseconds of CPU.
+Running it inline blocks the request worker, and with it the Socket.IO traffic served by the
+same worker. The service runs bcrypt on a small dedicated thread pool instead; bcrypt releases
+the GIL while it hashes. Pending calls are bounded: once the workers and the queue are full,
+further calls are refused with ``HasherBusy`` instead of piling up, and the routes answer
+"busy" so the client can retry.
+
+The cost factor is configurable. Hashes stored with another cost are still verified, and
+``needs_rehash`` tells the login to store a new hash with the configured cost.
+
+Classes:
+    - HasherBusy: Raised when the hashing service is saturated.
+    - PasswordHasher: Runs bcrypt on a bounded thread pool.
+
+Dependencies:
+    - bcrypt
+    - threading
+    - concurrent.futures
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import bcrypt
+
+from . import config
+
+
+class HasherBusy(RuntimeError):
+    """
+    Raised when all hashing workers are busy and the queue is full, or a call timed out.
+    """
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and checking on a bounded thread pool.
+
+    Args:
+        rounds (int): The bcrypt cost factor of new hashes, 4 to 31.
+        workers (int): Number of hashing threads.
+        max_queue (int): Number of calls waiting for a free thread before calls are refused.
+        timeout (float): Seconds a caller waits for its result.
+    """
+
+    def __init__(self, rounds=12, workers=2, max_queue=16, timeout=5.0):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        # Threads are started on the first call, not when the module is imported
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._stats = {'hashes': 0, 'checks': 0, 'rehashes': 0, 'busy': 0, 'timeouts': 0,
+                       'in_flight': 0, 'total_ms': 0.0}
+
+    def hash(self, password):
+        """
+        Hash a password with the configured cost factor.
+
+        Args:
+            password (str): The plain text password.
+
+        Returns:
+            str: The bcrypt hash.
+
+        Raises:
+            HasherBusy: If the service is saturated or the call timed out.
+        """
+        hashed = self._call('hashes', bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed.decode('utf-8')
+
+    def verify(self, password, hashed):
+        """
+        Check a password against a stored hash.
+
+        Args:
+            password (str): The plain text password.
+            hashed (str): The stored bcrypt hash.
+
+        Returns:
+            bool: True if the password matches, False if it does not or the hash is malformed.
+
+        Raises:
+            HasherBusy: If the service is saturated or the call timed out.
+        """
+        return self._call('checks', _checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed):
+        """
+        Tell whether a stored hash was made with another cost factor than the configured one.
+
+        Args:
+            hashed (str): The stored bcrypt hash, ``$2b$<cost>$<salt and hash>``.
+
+        Returns:
+            bool: True if the hash should be replaced.
+        """
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def record_rehash(self):
+        """
+        Count a stored hash replaced after a successful login.
+        """
+        with self._lock:
+            self._stats['rehashes'] += 1
+
+    def stats(self):
+        """
+        Return a snapshot of the hashing counters.
+
+        Returns:
+            dict: Configuration, completed hashes and checks, rehashes, refused and timed out
+            calls, calls in flight and the mean duration of a call.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        calls = stats['hashes'] + stats['checks']
+        total_ms = stats.pop('total_ms')
+        stats['mean_ms'] = total_ms / calls if calls else 0.0
+        stats.update(rounds=self.rounds, workers=self.workers, max_queue=self.max_queue)
+        return stats
+
+    def close(self):
+        """
+        Shut the hashing threads down.
+        """
+        self._executor.shutdown(wait=False)
+
+    def _call(self, counter, function, *args):
+        """
+        Run a bcrypt function on the pool and wait for its result.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['busy'] += 1
+            raise HasherBusy("Password hashing is busy.")
+        with self._lock:
+            self._stats['in_flight'] += 1
+        start = time.perf_counter()
+        future = self._executor.submit(function, *args)
+        future.add_done_callback(self._done)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise HasherBusy("Password hashing timed out.") from None
+        with self._lock:
+            self._stats[counter] += 1
+            self._stats['total_ms'] += (time.perf_counter() - start) * 1000.0
+        return result
+
+    def _done(self, future):
+        """
+        Free the slot of a finished call, also when its caller gave up waiting.
+        """
+        with self._lock:
+            self._stats['in_flight'] -= 1
+        self._slots.release()
+
+
+def _checkpw(password, hashed):
+    """
+    bcrypt.checkpw returning False for a malformed stored hash.
+    """
+    try:
+        return bcrypt.checkpw(password, hashed)
+    except ValueError:
+        return False
+
+
+# Password hashing service shared by the routes
+password_hasher = PasswordHasher(
+    rounds=config.BCRYPT_ROUNDS,
+    workers=config.HASH_WORKERS,
+    max_queue=config.HASH_QUEUE,
+    timeout=config.HASH_TIMEOUT,
+)
@@ -0,0 +1,336 @@
+"""
+Module: pipeline
+
+This module contains the frame-processing pipeline of the gesture recognition: decoding a
+webcam frame, finding the hand with MediaPipe Hands and classifying its landmarks. It is shared
+by the Socket.IO handler, which runs it inline, and by the frame worker processes.
+
+Functions:
+    - create_hands(): Create a MediaPipe Hands tracker in video mode.
+    - create_tracker(): Create the per-session HandTracker used by the tracker pools.
+    - get_tracking_stats(): Return the counters of the ROI tracking mode.
+    - frame_data(image): Return the encoded frame carried by an 'image' event.
+    - jpeg_size(img_data): Read the width and height of a JPEG frame from its header.
+    - reduced_flag(long_edge, target_long_edge): Pick the reduced-scale JPEG decode flag.
+    - decode_frame(img_data, mode, target_long_edge): Decode an encoded webcam frame into an RGB image.
+    - recognize_frame(img_data, tracker, predict): Run the full pipeline on one encoded frame.
+
+Classes:
+    - HandTracker: MediaPipe Hands tracker of one session with ROI tracking of the last hand box.
+
+Dependencies:
+    - Base64
+    - NumPy
+    - OpenCV (cv2)
+    - MediaPipe
+"""
+
+import base64
+import threading
+
+import cv2
+import numpy as np
+
+from . import config
+from .features import landmark_array, normalize
+
+# Labels for the gesture recognition model
+labels = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O',
+          'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'del', 'nothing', 'space']
+
+# Decode stage: 'full' decodes at the sent resolution, 'reduced' lets libjpeg decode at 1/2, 1/4
+# or 1/8 scale, 'resize' decodes fully and then downsizes to the target long edge
+DECODE_MODES = ('full', 'reduced', 'resize')
+REDUCED_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+# JPEG start-of-frame markers carrying the image size
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def create_hands():
+    """
+    Create a MediaPipe Hands tracker in video mode.
+
+    Returns:
+        mp.solutions.hands.Hands: A new tracker instance.
+    """
+    import mediapipe as mp  # Imported on first use, processes that never track hands skip it
+    return mp.solutions.hands.Hands(
+        static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+
+def frame_data(image):
+    """
+    Return the encoded frame carried by an 'image' event.
+
+    Current clients send the JPEG as a binary Socket.IO attachment, which arrives as bytes and
+    is returned as is, without a copy. Older clients send a base64 string, which is decoded.
+
+    Args:
+        image (bytes-like or str): The 'image' field of the event.
+
+    Returns:
+        bytes-like: The encoded frame.
+    """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return image
+    return base64.b64decode(image)
+
+
+def jpeg_size(img_data):
+    """
+    Read the width and height of a JPEG frame from its header, without decoding it.
+
+    Args:
+        img_data (bytes-like): The encoded frame.
+
+    Returns:
+        tuple: (width, height), or None if the data is not a JPEG with a readable header.
+    """
+    data = memoryview(img_data).cast('B')
+    n = len(data)
+    if n < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    i = 2
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 2
+            continue
+        if marker in SOF_MARKERS:
+            return (data[i + 7] << 8) | data[i + 8], (data[i + 5] << 8) | data[i + 6]
+        i += 2 + ((data[i + 2] << 8) | data[i + 3])
+    return None
+
+
+def reduced_flag(long_edge, target_long_edge):
+    """
+    Pick the strongest reduced-scale decode flag that keeps the long edge at or above the target.
+
+    Args:
+        long_edge (int): Long edge of the encoded frame in pixels.
+        target_long_edge (int): Smallest acceptable long edge after decoding.
+
+    Returns:
+        int: An OpenCV imread flag.
+    """
+    for factor, flag in REDUCED_FLAGS:
+        if long_edge // factor >= target_long_edge:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def decode_frame(img_data, mode='full', target_long_edge=None):
+    """
+    Decode an encoded webcam frame into an RGB image.
+
+    Args:
+        img_data (bytes-like): The JPEG (or other OpenCV-readable) encoded frame.
+        mode (str): One of ``DECODE_MODES``.
+        target_long_edge (int, optional): Long edge in pixels the decoded frame is scaled down to.
+            Frames that are already smaller are decoded as they are.
+
+    Returns:
+        np.ndarray: The RGB image, or None if the data could not be decoded.
+    """
+    np_img = np.frombuffer(img_data, np.uint8)
+    flag = cv2.IMREAD_COLOR
+    if mode == 'reduced' and target_long_edge:
+        size = jpeg_size(np_img)
+        if size is not None:
+            flag = reduced_flag(max(size), target_long_edge)
+        else:
+            mode = 'resize'  # Not a JPEG, scale after a full decode
+    img = cv2.imdecode(np_img, flag)
+    if img is None:
+        return None
+    if mode == 'resize' and target_long_edge:
+        scale = target_long_edge / max(img.shape[:2])
+        if scale < 1.0:
+            img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+class HandTracker:
+    """
+    MediaPipe Hands tracker of one session, remembering the hand box of its last frame.
+
+    In ROI tracking mode the next frame is cropped to an expanded version of that box before
+    detection, so a user sitting still costs a fraction of the pixels of a full frame. When the
+    hand is not found in the crop, the frame is processed in full.
+
+    The tracking prior of MediaPipe is kept in the normalized coordinates of the image it saw
+    last, so the MediaPipe tracker is reset whenever it switches between crops and full frames.
+
+    Args:
+        hands (mp.solutions.hands.Hands): The MediaPipe tracker.
+        roi_tracking (bool): Whether to crop frames to the previous hand box.
+        margin (float): Fraction of the hand box size added on every side of the crop.
+        min_size (int): Smallest crop edge in pixels.
+    """
+
+    def __init__(self, hands, roi_tracking=True, margin=0.5, min_size=96):
+        self.hands = hands
+        self.roi_tracking = roi_tracking
+        self.margin = margin
+        self.min_size = min_size
+        self.box = None
+        self.view = None  # 'roi' or 'full', the kind of image MediaPipe saw last
+
+    def reset(self):
+        """
+        Drop the tracking state before the tracker serves another session.
+        """
+        self.box = None
+        self.view = None
+        self._reset_hands()
+
+    def process(self, img):
+        """
+        Find a hand in a frame.
+
+        Args:
+            img (np.ndarray): The RGB frame.
+
+        Returns:
+            np.ndarray: The (21, 3) landmarks of the first hand in coordinates normalized to the
+            full frame, or None if no hand was detected.
+        """
+        h, w = img.shape[:2]
+        processed = 0
+        missed = False
+        if self.roi_tracking and self.box is not None:
+            x0, y0, x1, y1 = self.box
+            crop_w, crop_h = x1 - x0, y1 - y0
+            processed += crop_w * crop_h
+            points = self._detect(np.ascontiguousarray(img[y0:y1, x0:x1]), 'roi')
+            if points is not None:
+                # Map crop-normalized coordinates back to the full frame
+                points[:, 0] = (points[:, 0] * crop_w + x0) / w
+                points[:, 1] = (points[:, 1] * crop_h + y0) / h
+                points[:, 2] *= crop_w / w
+                _record('roi_frames', processed, w * h, missed)
+                self.box = self._expanded_box(points, w, h)
+                return points
+            missed = True  # Hand lost in the crop, fall back to a full-frame pass
+
+        points = self._detect(img, 'full')
+        processed += w * h
+        _record('full_frames', processed, w * h, missed)
+        self.box = self._expanded_box(points, w, h) if points is not None else None
+        return points
+
+    def _detect(self, img, view):
+        """
+        Run MediaPipe Hands and return the landmarks of the first hand as an array. The tracker
+        is reset first when the previous image was of the other view.
+        """
+        if self.view is not None and view != self.view:
+            self._reset_hands()
+        self.view = view
+        results = self.hands.process(img)
+        if not results.multi_hand_landmarks:
+            return None
+        return landmark_array(results.multi_hand_landmarks[0])
+
+    def _reset_hands(self):
+        """
+        Drop the tracking prior of the MediaPipe tracker.
+        """
+        reset = getattr(self.hands, 'reset', None)
+        if reset is not None:
+            reset()
+
+    def _expanded_box(self, points, w, h):
+        """
+        Pixel box around the landmarks grown by the margin, or None if it covers most of the frame.
+        """
+        x_min, y_min = points[:, 0].min() * w, points[:, 1].min() * h
+        x_max, y_max = points[:, 0].max() * w, points[:, 1].max() * h
+        half_w = max((x_max - x_min) * (0.5 + self.margin), self.min_size / 2)
+        half_h = max((y_max - y_min) * (0.5 + self.margin), self.min_size / 2)
+        cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+        x0, x1 = max(0, int(cx - half_w)), min(w, int(cx + half_w) + 1)
+        y0, y1 = max(0, int(cy - half_h)), min(h, int(cy + half_h) + 1)
+        if x1 <= x0 or y1 <= y0 or (x1 - x0) * (y1 - y0) > 0.8 * w * h:
+            return None
+        return x0, y0, x1, y1
+
+
+# Counters of the ROI tracking mode, per process
+tracking_stats = {
+    'roi_frames': 0,
+    'full_frames': 0,
+    'roi_misses': 0,
+    'processed_pixels': 0,
+    'frame_pixels': 0,
+}
+_tracking_stats_lock = threading.Lock()
+
+
+def _record(kind, processed_pixels, frame_pixels, missed):
+    with _tracking_stats_lock:
+        tracking_stats[kind] += 1
+        tracking_stats['roi_misses'] += missed
+        tracking_stats['processed_pixels'] += processed_pixels
+        tracking_stats['frame_pixels'] += frame_pixels
+
+
+def get_tracking_stats():
+    """
+    Return a snapshot of the ROI tracking counters.
+
+    Returns:
+        dict: Frames served from the ROI crop or a full-frame pass, crops that lost the hand,
+        and the share of the frame pixels that went through MediaPipe.
+    """
+    with _tracking_stats_lock:
+        snapshot = dict(tracking_stats)
+    frame_pixels = snapshot['frame_pixels']
+    snapshot['pixel_ratio'] = snapshot['processed_pixels'] / frame_pixels if frame_pixels else 1.0
+    return snapshot
+
+
+def create_tracker():
+    """
+    Create the per-session tracker used by the hand tracker pools.
+
+    Returns:
+        HandTracker: A MediaPipe Hands tracker with the configured ROI tracking mode.
+    """
+    return HandTracker(create_hands(), roi_tracking=config.ROI_TRACKING, margin=config.ROI_MARGIN,
+                       min_size=config.ROI_MIN_SIZE)
+
+
+def recognize_frame(img_data, tracker, predict):
+    """
+    Run the full recognition pipeline on one encoded frame.
+
+    Args:
+        img_data (bytes-like): The encoded frame.
+        tracker (HandTracker): The tracker of the session the frame belongs to.
+        predict (callable): Function returning class probabilities for one landmark vector.
+
+    Returns:
+        str: The predicted label, or None if no hand was detected.
+    """
+    img = decode_frame(img_data, config.FRAME_DECODE_MODE, config.FRAME_TARGET_LONG_EDGE)
+    if img is None:
+        return None
+
+    # Find the hand using MediaPipe Hands, cropped to the previous hand box when possible
+    points = tracker.process(img)
+    if points is None:
+        return None
+
+    # Prepare landmarks for prediction, as in training
+    landmarks = normalize(points.reshape(-1))
+
+    # Make prediction
+    prediction = predict(landmarks)
+    return labels[np.argmax(prediction)]
@@ -0,0 +1,178 @@
+"""
+Module: plans
+
+This module contains an in-memory catalog of the subscription plans.
+
+The subscription_plan table has a handful of rows that almost never change, yet the pricing
+pages, the plan API and the quota check of every frame read it. The catalog loads the table
+once, serves reads from memory and reloads it when its time to live expires or when it is
+invalidated after a change. Every loaded version carries an ETag derived from its content, so
+HTTP clients can revalidate cached plan responses cheaply.
+
+Classes:
+    - PlanCatalog: Cached copy of the subscription_plan table.
+
+Dependencies:
+    - mysql.connector
+    - threading
+    - hashlib
+    - json
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from mysql.connector import Error
+
+from . import config
+from .database import create_connection
+
+
+class PlanCatalog:
+    """
+    Cached copy of the subscription_plan table with a time to live and explicit invalidation.
+
+    When a reload after the time to live fails, the previous copy is served until the next
+    attempt. After ``invalidate()`` the previous copy is dropped, since it is known to be outdated.
+
+    Args:
+        connect (callable): Function returning a database connection, or None if none is available.
+        ttl (float): Seconds a loaded copy is served before it is reloaded.
+    """
+
+    def __init__(self, connect, ttl=300.0):
+        self.connect = connect
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._plans = None  # Rows ordered by plan_id
+        self._by_name = {}
+        self._etag = None
+        self._version = 0
+        self._expires = 0.0
+        self._stats = {'reads': 0, 'loads': 0, 'load_errors': 0, 'invalidations': 0}
+
+    def plans(self):
+        """
+        Return all plans ordered by plan_id.
+
+        Returns:
+            list: Copies of the plan rows as dictionaries, or None if the plans could not be loaded.
+        """
+        plans = self._current()
+        return None if plans is None else [dict(plan) for plan in plans]
+
+    def get(self, plan_name):
+        """
+        Return one plan.
+
+        Args:
+            plan_name (str): The plan name.
+
+        Returns:
+            dict: A copy of the plan row, or None if the plan does not exist or the plans could
+            not be loaded.
+        """
+        if self._current() is None:
+            return None
+        plan = self._by_name.get(plan_name)
+        return None if plan is None else dict(plan)
+
+    @property
+    def etag(self):
+        """
+        str: Entity tag of the current copy of the plans, or None if they could not be loaded.
+        """
+        self._current()
+        return self._etag
+
+    def load(self):
+        """
+        Read the plans from the database.
+
+        Returns:
+            bool: True if the plans were loaded.
+        """
+        connection = self.connect()
+        if connection is None:
+            self._load_failed()
+            return False
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute('SELECT * FROM subscription_plan ORDER BY plan_id')
+            rows = cursor.fetchall()
+        except Error as e:
+            print(f"Error: {e}")
+            self._load_failed()
+            return False
+        finally:
+            cursor.close()
+            connection.close()
+
+        plans = tuple(rows)
+        digest = hashlib.sha1(json.dumps(plans, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        with self._lock:
+            if digest != self._etag:
+                self._version += 1
+            self._plans = plans
+            self._by_name = {plan['plan_name']: plan for plan in plans}
+            self._etag = digest
+            self._expires = time.monotonic() + self.ttl
+            self._stats['loads'] += 1
+        return True
+
+    def invalidate(self):
+        """
+        Drop the cached plans, for example after a plan was added or its price changed. The next
+        read loads them again.
+        """
+        with self._lock:
+            self._plans = None
+            self._by_name = {}
+            self._etag = None
+            self._expires = 0.0
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        """
+        Return a snapshot of the catalog counters.
+
+        Returns:
+            dict: Reads, loads, failed loads, invalidations and the version.
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['version'] = self._version
+            snapshot['plans'] = len(self._plans) if self._plans is not None else 0
+        return snapshot
+
+    def _current(self):
+        """
+        Return the cached rows, loading them first when they are missing or expired.
+        """
+        if time.monotonic() >= self._expires:
+            # One request reloads, the others keep reading the previous copy if there is one
+            if self._load_lock.acquire(blocking=self._plans is None):
+                try:
+                    if time.monotonic() >= self._expires:
+                        self.load()
+                finally:
+                    self._load_lock.release()
+        with self._lock:
+            self._stats['reads'] += 1
+            return self._plans
+
+    def _load_failed(self):
+        """
+        Keep serving the previous copy after a failed load, and retry after a short delay.
+        """
+        with self._lock:
+            self._stats['load_errors'] += 1
+            if self._plans is not None:
+                self._expires = time.monotonic() + min(self.ttl, 5.0)
+
+
+# Plans shared by the routes and the quota check
+plan_catalog = PlanCatalog(create_connection, ttl=config.PLAN_CACHE_TTL)
@@ -0,0 +1,300 @@
+"""
+Module: quota
+
+This module contains the per-connection quota state of the sign recognition.
+
+The plan and daily limit of a user are resolved once when their socket connects and kept for
+the life of the connection. A context is resolved again after midnight, when the plan of the
+user changes (for example after a purchase), or after a maximum age, which bounds the
+staleness of changes made by other processes.
+
+Recognized signs are enforced by ``consume_sign``. For users with a limited plan it checks and
+increments ``users.recognized_count`` in one conditional UPDATE, so several connections of the
+same user cannot together go over the limit. Guests have no users row and are counted on their
+connection. The counts are reset at midnight by the scheduler (see app/scheduler.py); the UPDATE
+also starts a new count itself when ``last_reset`` is before today, so a day the scheduler did
+not run, or a deployment without it, does not leave users at their limit.
+
+Classes:
+    - QuotaContext: Plan, daily limit and reset boundary of one user.
+    - QuotaContexts: Quota contexts of the open Socket.IO connections.
+
+Functions:
+    - next_reset(now): Return the next daily reset boundary.
+    - resolve_quota(username): Read the plan and daily limit of a user.
+    - consume_sign(context): Count one recognized sign if the user is still below their daily limit.
+
+Dependencies:
+    - mysql.connector
+    - threading
+    - datetime
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from mysql.connector import Error
+
+from . import config
+from .database import create_connection
+from .plans import plan_catalog
+from .usage import usage_meter
+
+# Daily limit of guests and of users whose plan cannot be resolved
+DEFAULT_LIMIT = 10
+
+# Guards the counters of guest contexts, a connection may send frames from several threads
+_guest_lock = threading.Lock()
+
+# Count not reset since before today, it starts again from zero
+_STALE_COUNT = "last_reset IS NULL OR last_reset < CURDATE()"
+
+# Increment the count while it is below the limit, a user at the limit matches no row. The
+# assignments read the old last_reset in MySQL as well, which updates columns left to right.
+CONSUME_SIGN_QUERY = (
+    f"UPDATE users SET "
+    f"recognized_count = CASE WHEN {_STALE_COUNT} THEN 1 ELSE COALESCE(recognized_count, 0) + 1 END, "
+    f"last_reset = CASE WHEN {_STALE_COUNT} THEN NOW() ELSE last_reset END "
+    f"WHERE username = %s AND CASE WHEN {_STALE_COUNT} THEN 0 ELSE COALESCE(recognized_count, 0) END < %s"
+)
+
+
+class QuotaContext:
+    """
+    Plan, daily limit and reset boundary of one user.
+
+    Args:
+        username (str): The username, or the guest id of a guest.
+        plan_name (str): The plan of the user, None for guests.
+        daily_limit (float): Signs the user may recognize per day, ``inf`` for unlimited plans.
+        reset_at (datetime): When the recognized count is reset next, None if the context is not kept.
+        cacheable (bool): False if the quota could not be read and must be resolved again.
+
+    Attributes:
+        used (int): Signs counted on the connection, only for guests.
+        exhausted (bool): True once a sign was refused, until the context is resolved again.
+    """
+
+    __slots__ = ('username', 'plan_name', 'daily_limit', 'reset_at', 'resolved_at', 'stale', 'used', 'exhausted')
+
+    def __init__(self, username, plan_name, daily_limit, reset_at=None, cacheable=True):
+        self.username = username
+        self.plan_name = plan_name
+        self.daily_limit = daily_limit
+        self.reset_at = reset_at
+        self.resolved_at = time.monotonic()
+        self.stale = not cacheable
+        self.used = 0
+        self.exhausted = False
+
+
+def next_reset(now=None):
+    """
+    Return the next daily reset boundary, the coming midnight.
+
+    Args:
+        now (datetime): The current time, datetime.now() if None.
+
+    Returns:
+        datetime: The next midnight.
+    """
+    now = datetime.now() if now is None else now
+    return datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+
+
+def resolve_quota(username):
+    """
+    Read the plan and daily limit of a user.
+
+    Args:
+        username (str): The username, or the guest id of a guest.
+
+    Returns:
+        QuotaContext: The quota of the user. Guests and users without a known plan get the
+        default limit.
+    """
+    connection = create_connection()
+    if connection is None:
+        return QuotaContext(username, None, DEFAULT_LIMIT, cacheable=False)
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT plan_name FROM users WHERE username = %s", (username,))
+        user_data = cursor.fetchone()
+        plan = plan_catalog.get(user_data['plan_name']) if user_data else None
+        if plan is None:
+            return QuotaContext(username, None, DEFAULT_LIMIT, next_reset(), cacheable=user_data is None)
+
+        daily_limit = plan['daily_limit'] if plan['daily_limit'] is not None else float('inf')  # Handle unlimited plan
+        return QuotaContext(username, plan['plan_name'], daily_limit, next_reset())
+    except Error as e:
+        print(f"Error: {e}")
+        return QuotaContext(username, None, DEFAULT_LIMIT, cacheable=False)
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def consume_sign(context):
+    """
+    Count one recognized sign if the user is still below their daily limit.
+
+    For a limited plan, the check and the increment are one conditional UPDATE and the
+    affected row count tells whether the sign was allowed. Unlimited plans are never
+    refused and their signs are written behind by the usage meter. Guests are counted on the
+    context. A refused sign marks the context as exhausted, so later frames are refused
+    without running the pipeline.
+
+    Args:
+        context (QuotaContext): The quota of the connection.
+
+    Returns:
+        bool: True if the sign was allowed and counted.
+    """
+    if context.plan_name is None:
+        # Guests and users whose plan could not be read have no row to count on
+        with _guest_lock:
+            allowed = context.used < context.daily_limit
+            if allowed:
+                context.used += 1
+    elif context.daily_limit == float('inf'):
+        usage_meter.record(context.username)
+        allowed = True
+    else:
+        allowed = _consume_in_database(context)
+    if not allowed:
+        context.exhausted = True
+    return allowed
+
+
+def _consume_in_database(context):
+    """
+    Run the conditional UPDATE of ``consume_sign``. When the database is not available the
+    sign is allowed and left to the usage meter, so an outage does not stop recognition.
+    """
+    connection = create_connection()
+    if connection is None:
+        usage_meter.record(context.username)
+        return True
+    cursor = connection.cursor()
+    try:
+        cursor.execute(CONSUME_SIGN_QUERY, (context.username, context.daily_limit))
+        connection.commit()
+        return cursor.rowcount == 1
+    except Error as e:
+        print(f"Error: {e}")
+        usage_meter.record(context.username)
+        return True
+    finally:
+        cursor.close()
+        connection.close()
+
+
+class QuotaContexts:
+    """
+    Quota contexts of the open Socket.IO connections.
+
+    Args:
+        resolve (callable): Function returning the QuotaContext of a username.
+        max_age (float): Seconds after which a context is resolved again.
+    """
+
+    def __init__(self, resolve, max_age=300.0):
+        self.resolve = resolve
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._contexts = {}  # session_id -> QuotaContext
+        self._stats = {'hits': 0, 'resolves': 0, 'invalidations': 0}
+
+    def open(self, session_id, username):
+        """
+        Resolve the quota of a newly connected socket.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+            username (str): The username, or the guest id of a guest.
+
+        Returns:
+            QuotaContext: The quota of the connection.
+        """
+        return self._resolve(session_id, username)
+
+    def get(self, session_id, username):
+        """
+        Return the quota of a connection, resolving it again when it is missing or outdated.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+            username (str): The username, or the guest id of a guest.
+
+        Returns:
+            QuotaContext: The quota of the connection.
+        """
+        with self._lock:
+            context = self._contexts.get(session_id)
+            if context is not None and not self._outdated(context, username):
+                self._stats['hits'] += 1
+                return context
+        return self._resolve(session_id, username)
+
+    def invalidate_user(self, username):
+        """
+        Mark the contexts of a user as outdated, for example after their plan changed.
+
+        Args:
+            username (str): The username.
+        """
+        with self._lock:
+            for context in self._contexts.values():
+                if context.username == username:
+                    context.stale = True
+            self._stats['invalidations'] += 1
+
+    def release(self, session_id):
+        """
+        Drop the context of a disconnected socket.
+
+        Args:
+            session_id (str): The Socket.IO session id.
+        """
+        with self._lock:
+            self._contexts.pop(session_id, None)
+
+    def stats(self):
+        """
+        Return a snapshot of the context counters.
+
+        Returns:
+            dict: Open contexts, reads served from memory, resolutions and invalidations.
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['contexts'] = len(self._contexts)
+        return snapshot
+
+    def _outdated(self, context, username):
+        """
+        Whether a context must be resolved again. Caller holds the lock.
+        """
+        return (context.stale
+                or context.username != username
+                or (context.reset_at is not None and datetime.now() >= context.reset_at)
+                or time.monotonic() - context.resolved_at >= self.max_age)
+
+    def _resolve(self, session_id, username):
+        """
+        Resolve and store the context of a connection.
+        """
+        context = self.resolve(username)
+        with self._lock:
+            previous = self._contexts.get(session_id)
+            if (context.plan_name is None and previous is not None and previous.username == username
+                    and (previous.reset_at is None or datetime.now() < previous.reset_at)):
+                context.used = previous.used  # Guest counts only live on the connection, until midnight
+            self._contexts[session_id] = context
+            self._stats['resolves'] += 1
+        return context
+
+
+# Quota state of the sockets connected to this process
+quota_contexts = QuotaContexts(resolve_quota, max_age=config.QUOTA_CONTEXT_TTL)
@@ -8,40 +8,46 @@ Functions:
     - is_logged_in(): Checks if a user is logged in.
     - logout(): Logs out the user.
     - test_connection(): Tests the database connection.
-    - login(): Handles user login.
+    - login(): Handles user login and upgrades the stored password hash to the configured cost.
+    - rehash_password(username, password, old_hash): Upgrades a stored password hash.
     - register(): Handles user registration.
     - userprofile(): Serves the user profile page.
-    - get_user_data(): Retrieves user data from the database.
+    - parse_payment_cursor(value): Parses a payment history cursor.
+    - payment_page(cursor, user_id, after, limit): Retrieves one page of the payment history of a user.
+    - get_user_data(): Retrieves user data and the first page of the payment history from the database.
+    - get_payment_history(): Retrieves a further page of the payment history.
     - purchase_form(): Serves the purchase form page.
-    - get_plans(): Retrieves subscription plans.
-    - get_plan_price(plan_name): Retrieves the price of a specific plan.
-    - purchase_plan(): Processes plan purchases.
+    - get_plans(): Retrieves subscription plans from the plan catalog, with ETag revalidation.
+    - get_plan_price(plan_name): Retrieves the price of a specific plan, with ETag revalidation.
+    - purchase_plan(): Processes plan purchases in one database transaction.
     - interpreter(): Renders the SLI (Sign Language Interpreter) page.
     - format_price(price): Splits price into dollars and cents.
-    - pricing(): Retrieves subscription plans from the database and formats prices.
+    - pricing(): Retrieves subscription plans from the plan catalog and formats prices.
     - delete_account(): Deletes the user account.
     - reset_password(): Handles password reset request.
     - reset_with_token(token): Handles password reset form submission.
-    - send_reset_email(to_email, token): Sends a password reset email.
+    - send_reset_email(to_email, token): Queues a password reset email in the mail outbox.
     - reset_password_link(): Generates a password reset link.
     - generate_reset_token(): Generates a password reset token.
 
 Dependencies:
     - Flask
-    - flask_mail
-    - bcrypt
     - re
     - uuid
-    - smtplib
+    - datetime
     - email.mime
 """
 from flask import render_template, request, jsonify, redirect, url_for, session, flash
-from .database import create_connection
+from .database import create_connection, record_purchase
+from . import config
+from .mail import mail_outbox
+from .passwords import HasherBusy, password_hasher
+from .plans import plan_catalog
+from .quota import quota_contexts
 from mysql.connector import Error, errorcode
-import bcrypt
 import re
 import uuid
-import smtplib
+from datetime import date
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
@@ -123,19 +129,55 @@ def login():
                 cursor.execute(
                     "SELECT password FROM users WHERE username = %s", (username,))
                 result = cursor.fetchone()
-                if result and bcrypt.checkpw(password.encode('utf-8'), result[0].encode('utf-8')):
-                    session['username'] = username
-                    return jsonify({'message': f'Welcome, {username}!'})
-                else:
-                    return jsonify({'message': 'Invalid username or password!'}), 401
             except Error as e:
                 return jsonify({'message': str(e)}), 500
             finally:
                 cursor.close()
                 connection.close()
+            # bcrypt runs after the connection went back to the pool
+            try:
+                if not result or not password_hasher.verify(password, result[0]):
+                    return jsonify({'message': 'Invalid username or password!'}), 401
+                if password_hasher.needs_rehash(result[0]):
+                    rehash_password(username, password, result[0])
+            except HasherBusy:
+                return jsonify({'message': 'The server is busy, please try again.'}), 503
+            session['username'] = username
+            return jsonify({'message': f'Welcome, {username}!'})
         except Exception as e:
             return jsonify({'message': str(e)}), 400
 
+def rehash_password(username, password, old_hash):
+    """
+    Replaces a stored password hash made with another cost factor after a successful login.
+    The new hash is computed before a database connection is checked out. The login goes on
+    if the hashing service is busy or the update fails; the hash is then upgraded on a later
+    login.
+
+    Args:
+        username (str): The user who logged in.
+        password (str): The verified plain text password.
+        old_hash (str): The stored hash, only replaced if it was not changed meanwhile.
+    """
+    try:
+        new_hash = password_hasher.hash(password)
+    except HasherBusy:
+        return
+    connection = create_connection()
+    if connection is None:
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "UPDATE users SET password = %s WHERE username = %s AND password = %s", (new_hash, username, old_hash))
+        connection.commit()
+        password_hasher.record_rehash()
+    except Error as e:
+        print(f"Error: {e}")
+    finally:
+        cursor.close()
+        connection.close()
+
 def register():
     """
     Handles user registration. Renders the registration form for GET requests
@@ -169,19 +211,22 @@ def register():
             email_pattern = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
             if not email_pattern.match(email):
                 return jsonify({"message": "Invalid email format."}), 400
+            # bcrypt runs before a database connection is checked out
+            try:
+                hashed_password = password_hasher.hash(password)
+            except HasherBusy:
+                return jsonify({"message": "The server is busy, please try again."}), 503
             connection = create_connection()
             if connection is None:
                 return jsonify({"message": "Failed to connect to the database."}), 500
             cursor = connection.cursor()
-            hashed_password = bcrypt.hashpw(
-                password.encode('utf-8'), bcrypt.gensalt())
             try:
                 # Fetch subscription plan name
                 cursor.execute("SELECT plan_name FROM subscription_plan WHERE plan_id = 1")
                 plan_name = cursor.fetchone()[0]
                 cursor.execute(
                     "INSERT INTO users (username, email, password, name, surname, plan_name) VALUES (%s, %s, %s, %s, %s, %s)",
-                    (username, email, hashed_password.decode('utf-8'), name, surname, plan_name)
+                    (username, email, hashed_password, name, surname, plan_name)
                 )
                 connection.commit()
                  # Log the user in by setting session variables
@@ -219,13 +264,66 @@ def userprofile():
 
 
 
+def parse_payment_cursor(value):
+    """
+    Parses a payment history cursor.
+
+    Args:
+        value (str): The cursor, 'YYYY-MM-DD:payment_id' of the last payment of the previous page.
+
+    Returns:
+        tuple: (payment_date, payment_id) of the last payment of the previous page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    payment_date, payment_id = value.split(':')
+    return date.fromisoformat(payment_date), int(payment_id)
+
+
+def payment_page(cursor, user_id, after=None, limit=None):
+    """
+    Retrieves one page of the payment history of a user, newest payment first.
+
+    Pages are keyed on (payment_date, payment_id), so a page is one range scan of the
+    payments index of the user no matter how far into the history it lies.
+
+    Args:
+        cursor: Dictionary cursor of the database connection.
+        user_id (int): The ID of the user.
+        after (tuple): (payment_date, payment_id) of the last payment of the previous page, None for the first page.
+        limit (int): Maximum number of payments, PAYMENT_PAGE_SIZE if None.
+
+    Returns:
+        tuple: (payments, next_cursor). next_cursor is None on the last page.
+    """
+    limit = config.PAYMENT_PAGE_SIZE if limit is None else limit
+    query = "SELECT payment_id, payment_date, amount FROM payments WHERE user_id = %s"
+    params = [user_id]
+    if after is not None:
+        query += " AND (payment_date < %s OR (payment_date = %s AND payment_id < %s))"
+        params += [after[0], after[0], after[1]]
+    # One row more than the page tells whether another page follows
+    query += " ORDER BY payment_date DESC, payment_id DESC LIMIT %s"
+    params.append(limit + 1)
+    cursor.execute(query, params)
+    payments = cursor.fetchall()
+    next_cursor = None
+    if len(payments) > limit:
+        payments = payments[:limit]
+        last = payments[-1]
+        next_cursor = f"{last['payment_date'].isoformat()}:{last['payment_id']}"
+    return payments, next_cursor
+
+
 def get_user_data():
     """
     Retrieves user data from the database.
 
     Returns:
-        JSON response: User data including payment history if the user is logged in and found in the database,
-        otherwise returns an error message with appropriate status code.
+        JSON response: User data with the first page of the payment history if the user is logged in and found
+        in the database, otherwise returns an error message with appropriate status code. Further pages are
+        retrieved with get_payment_history().
     """
     if 'username' not in session:
         return jsonify({"message": "User not logged in."}), 401
@@ -236,15 +334,13 @@ def get_user_data():
 
     cursor = connection.cursor(dictionary=True)
     try:
-        cursor.execute("SELECT * FROM users WHERE username = %s", (session['username'],))
+        cursor.execute(
+            "SELECT id, username, email, name, surname, plan_name FROM users WHERE username = %s",
+            (session['username'],))
         user_data = cursor.fetchone()
         if user_data:
-            cursor.execute("SELECT payment_date, amount FROM payments WHERE user_id = %s", (user_data['id'],))
-            payment_history = cursor.fetchall()
-            if payment_history:
-                user_data['payment_history'] = payment_history
-            else:
-                user_data['payment_history'] = []
+            user_id = user_data.pop('id')
+            user_data['payment_history'], user_data['payment_history_next'] = payment_page(cursor, user_id)
             return jsonify(user_data)
         else:
             return jsonify({"message": "User not found."}), 404
@@ -255,6 +351,44 @@ def get_user_data():
         connection.close()
 
 
+def get_payment_history():
+    """
+    Retrieves a further page of the payment history of the logged-in user.
+
+    Query parameters:
+        after (str): The cursor returned with the previous page.
+
+    Returns:
+        JSON response: The payments of the page and the cursor of the next one, otherwise returns an error
+        message with appropriate status code.
+    """
+    if 'username' not in session:
+        return jsonify({"message": "User not logged in."}), 401
+
+    try:
+        after = parse_payment_cursor(request.args['after'])
+    except (KeyError, ValueError):
+        return jsonify({"message": "Invalid cursor."}), 400
+
+    connection = create_connection()
+    if connection is None:
+        return jsonify({"message": "Failed to connect to the database."}), 500
+
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT id FROM users WHERE username = %s", (session['username'],))
+        user = cursor.fetchone()
+        if user is None:
+            return jsonify({"message": "User not found."}), 404
+        payments, next_cursor = payment_page(cursor, user['id'], after)
+        return jsonify({"payment_history": payments, "payment_history_next": next_cursor})
+    except Error as e:
+        return jsonify({"message": str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+
 
 def purchase_form():
     """
@@ -271,30 +405,29 @@ def purchase_form():
 
 def get_plans():
     """
-    Retrieves subscription plans.
+    Retrieves subscription plans from the plan catalog.
+
+    The response carries the catalog ETag, a request with a matching If-None-Match header gets
+    a 304 response without a body.
 
     Returns:
         JSON response: A list of dictionaries containing plan names and prices if successful,
         otherwise returns an error message with appropriate status code.
     """
-    connection = create_connection()
-    if connection is None:
+    plans = plan_catalog.plans()
+    if plans is None:
         return jsonify({"message": "Failed to connect to the database."}), 500
 
-    cursor = connection.cursor(dictionary=True)
-    try:
-        cursor.execute('SELECT plan_name, price FROM subscription_plan')
-        plans = cursor.fetchall()
-        return jsonify(plans)
-    except Error as e:
-        return jsonify({"message": str(e)}), 500
-    finally:
-        cursor.close()
-        connection.close()
+    response = jsonify([{'plan_name': plan['plan_name'], 'price': plan['price']} for plan in plans])
+    response.set_etag(plan_catalog.etag)
+    return response.make_conditional(request)
 
 def get_plan_price(plan_name):
     """
-    Retrieves the price of a specific plan.
+    Retrieves the price of a specific plan from the plan catalog.
+
+    The response carries the catalog ETag, a request with a matching If-None-Match header gets
+    a 304 response without a body.
 
     Args:
         plan_name (str): The name of the plan for which the price is to be retrieved.
@@ -302,23 +435,26 @@ def get_plan_price(plan_name):
     Returns:
         JSON response: The price of the plan if found, otherwise returns an error message with appropriate status code.
     """
-    connection = create_connection()
-    if connection is None:
+    plans = plan_catalog.plans()
+    if plans is None:
         return jsonify({"message": "Failed to connect to the database."}), 500
 
-    cursor = connection.cursor()
-    try:
-        cursor.execute('SELECT price FROM subscription_plan WHERE plan_name = %s', (plan_name,))
-        price = cursor.fetchone()
-        if price:
-            return jsonify(price[0])
-        else:
-            return jsonify({"message": "Price not found for the plan."}), 404
-    except Error as e:
-        return jsonify({"message": str(e)}), 500
-    finally:
-        cursor.close()
-        connection.close()
+    plan = plan_catalog.get(plan_name)
+    if plan is None:
+        return jsonify({"message": "Price not found for the plan."}), 404
+
+    response = jsonify(plan['price'])
+    response.set_etag(plan_catalog.etag)
+    return response.make_conditional(request)
+
+# Responses to purchases refused by the database
+PURCHASE_ERRORS = {
+    'user_not_found': ("User not found.", 404),
+    'current_plan_not_found': ("Current plan not found.", 400),
+    'plan_not_found': ("Selected plan does not exist.", 400),
+    'same_plan': ("You cannot purchase a plan that is equal to your current plan.", 400),
+}
+
 
 def purchase_plan():
     """
@@ -368,61 +504,20 @@ def purchase_plan():
     if connection is None:
         return jsonify({"message": "Failed to connect to the database."}), 500
 
-    cursor = connection.cursor()
     try:
-        # Get the user ID
-        cursor.execute("SELECT id, plan_name FROM users WHERE username = %s", (session['username'],))
-        user = cursor.fetchone()
-        if user is None:
-            return jsonify({"message": "User not found."}), 404
-        
-        user_id, current_plan_name = user
-
-        # Get the ID of the current plan
-        cursor.execute("SELECT plan_id FROM subscription_plan WHERE plan_name = %s", (current_plan_name,))
-        current_plan_id = cursor.fetchone()
-        if current_plan_id is None:
-            return jsonify({"message": "Current plan not found."}), 400
-        
-        current_plan_id = current_plan_id[0]
-
-        # Get the ID of the new plan
-        cursor.execute("SELECT plan_id FROM subscription_plan WHERE plan_name = %s", (plan_name,))
-        new_plan_id = cursor.fetchone()
-        if new_plan_id is None:
-            return jsonify({"message": "Selected plan does not exist."}), 400
-        
-        new_plan_id = new_plan_id[0]
-
-        # Check if the new plan is equal to or lower than the current plan
-        if new_plan_id == current_plan_id:
-            return jsonify({"message": "You cannot purchase a plan that is equal to your current plan."}), 400
-
-        # Get the price of the new plan
-        cursor.execute("SELECT price FROM subscription_plan WHERE plan_name = %s", (plan_name,))
-        price = cursor.fetchone()
-        if price is None:
-            return jsonify({"message": "Selected plan does not exist."}), 400
-
-        amount = price[0]
+        # Lookups, plan change and payment run as one transaction in the database
+        status, _ = record_purchase(connection, session['username'], plan_name)
+        if status != 'purchased':
+            message, code = PURCHASE_ERRORS[status]
+            return jsonify({"message": message}), code
 
-        # Update the user's plan
-        cursor.execute(
-            "UPDATE users SET plan_name = %s WHERE username = %s", (plan_name, session['username']))
-        connection.commit()
-
-        # Record the payment
-        cursor.execute(
-            "INSERT INTO payments (user_id, payment_date, amount) VALUES (%s, CURDATE(), %s)",
-            (user_id, amount)
-        )
-        connection.commit()
+        # Open sockets of the user pick up the limit of the new plan on their next frame
+        quota_contexts.invalidate_user(session['username'])
 
         return jsonify({"message": "Plan purchased and payment recorded successfully!"})
     except Error as e:
         return jsonify({"message": str(e)}), 500
     finally:
-        cursor.close()
         connection.close()
 
 
@@ -453,28 +548,21 @@ def format_price(price):
 
 def pricing():
     """
-    Retrieves subscription plans from the database and formats prices.
+    Retrieves subscription plans from the plan catalog and formats prices.
     Renders the pricing page template with the plans and logged-in status.
 
     Returns:
         Response: The pricing page template with plans and logged-in status.
     """
-    connection = create_connection()
-    if connection is None:
+    plans = plan_catalog.plans()
+    if plans is None:
         return "Failed to connect to the database.", 500
 
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute('SELECT * FROM subscription_plan')
-    plans = cursor.fetchall()
-
     for plan in plans:
         dollars, cents = format_price(plan['price'])
         plan['dollars'] = dollars
         plan['cents'] = f'{cents:02d}'
 
-    cursor.close()
-    connection.close()
-
     return render_template('pricing.html', plans=plans, logged_in=is_logged_in())
 
 
@@ -553,9 +641,12 @@ def reset_password():
         token = str(uuid.uuid4())
         cursor.execute(
             "UPDATE users SET reset_token = %s WHERE email = %s", (token, email))
-        connection.commit()
 
-        send_reset_email(email, token)
+        # The token is only stored once its email is queued, a full outbox keeps the previous one
+        if not send_reset_email(email, token):
+            connection.rollback()
+            return jsonify({"message": "The server is busy, please try again."}), 503
+        connection.commit()
         return jsonify({"message": "Password reset email sent.", "reset_link": f"http://127.0.0.1:5000/reset/{token}"})
     except Exception as e:
         return jsonify({"message": str(e)}), 500
@@ -598,7 +689,11 @@ def reset_with_token(token):
             flash("Password exceeds maximum length of 254 characters.", "error")
             return redirect(url_for('reset_with_token', token=token))
 
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        try:
+            hashed_password = password_hasher.hash(password)
+        except HasherBusy:
+            flash("The server is busy, please try again.", "error")
+            return redirect(url_for('reset_with_token', token=token))
 
         connection = create_connection()
         if connection is None:
@@ -623,34 +718,31 @@ def reset_with_token(token):
 
 def send_reset_email(to_email, token):
     """
-    Sends a password reset email to the specified email address with a reset link.
+    Queues a password reset email with a reset link for the specified email address. The
+    email is delivered in the background by the mail outbox.
 
     Args:
         to_email (str): The recipient's email address.
         token (str): The reset token used to generate the reset link.
+
+    Returns:
+        bool: True if the email was queued, False if the outbox is full.
     """
-    from_email = "your_email@example.com"
-    from_password = "your_email_password"
     subject = "Password Reset Request"
     reset_url = f"http://127.0.0.1:5000/reset/{token}"
 
     msg = MIMEMultipart()
-    msg['From'] = from_email
+    msg['From'] = config.MAIL_SENDER
     msg['To'] = to_email
     msg['Subject'] = subject
 
     body = f"Please click the link to reset your password: {reset_url}"
     msg.attach(MIMEText(body, 'plain'))
 
-    try:
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(from_email, from_password)
-        text = msg.as_string()
-        server.sendmail(from_email, to_email, text)
-        server.quit()
-    except Exception as e:
-        print(f"Failed to send email: {e}")
+    if not mail_outbox.send(msg):
+        print("Failed to send email: the mail outbox is full")
+        return False
+    return True
 
 
 def reset_password_link():
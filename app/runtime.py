@@ -0,0 +1,150 @@
+"""
+Module: runtime
+
+This module contains the runtime manager of the gesture recognition model.
+
+Importing the application does not load the model: the artifact is loaded once, on the first
+prediction or at an explicit warm-up step, whichever comes first. The Keras backend therefore
+only imports TensorFlow in processes that actually recognize signs. The warm-up loads the
+model and runs dummy inferences for the batch sizes used in serving, plus any further steps
+such as a blank frame through MediaPipe, so the first real frame does not pay for graph
+construction. A readiness flag is set once the warm-up is done; the /ready route reports it,
+so a load balancer only sends traffic to warmed-up processes.
+
+Classes:
+    - ModelRuntime: Loads an inference backend once and warms it up.
+
+Dependencies:
+    - NumPy
+    - threading
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from .features import FEATURE_SIZE
+from .inference import load_backend
+
+
+class ModelRuntime:
+    """
+    Loads an inference backend once, on first use or at warm-up, and tracks its readiness.
+
+    Args:
+        backend_name (str): Inference backend, see ``app.inference.BACKENDS``.
+        model_path (str): Model artifact loaded by the backend.
+        batch_sizes (tuple): Batch sizes run with dummy input during the warm-up.
+        warm_ups (list): Further callables run during the warm-up, after the model is loaded.
+    """
+
+    def __init__(self, backend_name, model_path, batch_sizes=(1,), warm_ups=()):
+        self.backend_name = backend_name
+        self.model_path = model_path
+        self.batch_sizes = tuple(batch_sizes)
+        self.warm_ups = list(warm_ups)
+        self._model = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._warming = None
+        self._stats = {'loads': 0, 'load_ms': 0.0, 'warmup_ms': 0.0, 'error': None}
+
+    def load(self):
+        """
+        Return the backend, loading it on the first call. A model loaded outside the warm-up
+        marks the runtime ready, since the cold start has then been paid.
+
+        Returns:
+            object: The backend exposing ``predict(x)``.
+        """
+        model = self._load()
+        self._ready.set()
+        return model
+
+    def _load(self):
+        """
+        Return the backend, loading it on the first call, without changing the readiness.
+        """
+        model = self._model
+        if model is not None:
+            return model
+        with self._lock:
+            if self._model is None:
+                started = time.perf_counter()
+                self._model = load_backend(self.backend_name, self.model_path)
+                self._stats['loads'] += 1
+                self._stats['load_ms'] = (time.perf_counter() - started) * 1000.0
+            return self._model
+
+    def predict(self, x):
+        """
+        Run the model on one landmark vector or a batch of them, loading it if needed.
+
+        Args:
+            x (np.ndarray): Array of shape (features,) or (batch, features).
+
+        Returns:
+            np.ndarray: Class probabilities.
+        """
+        return self.load().predict(x)
+
+    def warm_up(self):
+        """
+        Load the model, run dummy inferences and the further warm-up steps, then mark the
+        runtime ready.
+
+        Returns:
+            bool: True if the runtime is ready, False if a step failed.
+        """
+        started = time.perf_counter()
+        try:
+            model = self._load()
+            model.predict(np.zeros(FEATURE_SIZE, dtype=np.float32))
+            for batch_size in self.batch_sizes:
+                model.predict(np.zeros((batch_size, FEATURE_SIZE), dtype=np.float32))
+            for step in self.warm_ups:
+                step()
+        except Exception as e:
+            print(f"Error: {e}")
+            with self._lock:
+                self._stats['error'] = str(e)
+            return False
+        with self._lock:
+            self._stats['warmup_ms'] = (time.perf_counter() - started) * 1000.0
+            self._stats['error'] = None
+        self._ready.set()
+        return True
+
+    def start_warm_up(self):
+        """
+        Run the warm-up in a background thread, so the process can answer readiness probes
+        meanwhile. Starting it twice has no effect.
+        """
+        with self._lock:
+            if self._warming is not None:
+                return
+            self._warming = threading.Thread(target=self.warm_up, name='model-warm-up', daemon=True)
+            self._warming.start()
+
+    def ready(self):
+        """
+        Tell whether the warm-up finished or the model was loaded by a prediction.
+
+        Returns:
+            bool: True once the model is loaded and warmed up.
+        """
+        return self._ready.is_set()
+
+    def stats(self):
+        """
+        Return a snapshot of the runtime state.
+
+        Returns:
+            dict: Backend, whether the model is loaded and ready, load and warm-up duration and
+            the error of a failed warm-up.
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot.update(backend=self.backend_name, loaded=self._model is not None, ready=self.ready())
+        return snapshot
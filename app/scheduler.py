@@ -0,0 +1,216 @@
+"""
+Module: scheduler
+
+This module contains an in-process scheduler for jobs that run once a day, such as the reset
+of the daily sign recognition quotas.
+
+Every process of the application runs the scheduler. Before a job runs, the process claims
+the day in the job_runs table, so the job runs once per day no matter how many processes are
+started. A claim whose process died without finishing is taken over after a while. A process
+that starts after midnight runs the job of the current day if no other process did.
+
+Classes:
+    - DailyJob: Runs a job once a day after midnight in a background thread.
+
+Dependencies:
+    - mysql.connector
+    - threading
+    - datetime
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+
+from mysql.connector import Error
+
+from . import config
+from .database import create_connection, reset_recognized_count
+
+
+class DailyJob:
+    """
+    Runs a job once a day after midnight in a background thread, claimed through job_runs.
+
+    Args:
+        name (str): The job name recorded in job_runs.
+        job (callable): Function taking the run date, returning the number of affected rows or
+            None if it failed.
+        connect (callable): Function returning a database connection, or None if none is available.
+        retry_interval (float): Seconds before a failed or busy run is attempted again.
+        stale_after (float): Seconds after which an unfinished claim of another process is taken over.
+    """
+
+    def __init__(self, name, job, connect, retry_interval=60.0, stale_after=3600.0):
+        self.name = name
+        self.job = job
+        self.connect = connect
+        self.retry_interval = retry_interval
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self._stats = {'runs': 0, 'skipped': 0, 'failures': 0, 'rows_affected': 0, 'last_run': None}
+
+    def start(self):
+        """
+        Start the background thread. Starting it twice has no effect.
+        """
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run, name=f'daily-{self.name}', daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        """
+        Stop the background thread.
+        """
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+
+    def run_once(self, day=None):
+        """
+        Run the job of a day unless another process ran it or is running it.
+
+        Args:
+            day (date): The run date, today if None.
+
+        Returns:
+            str: 'ran' if this process ran the job, 'done' if another process did, 'busy' if
+            another process is running it, 'failed' if the claim or the job failed.
+        """
+        day = date.today() if day is None else day
+        status = self._claim(day)
+        if status != 'claimed':
+            if status == 'done':
+                with self._lock:
+                    self._stats['skipped'] += 1
+            return status
+        rows = self.job(day)
+        if rows is None:
+            self._release(day)
+            with self._lock:
+                self._stats['failures'] += 1
+            return 'failed'
+        self._finish(day, rows)
+        with self._lock:
+            self._stats['runs'] += 1
+            self._stats['rows_affected'] += rows
+            self._stats['last_run'] = day.isoformat()
+        return 'ran'
+
+    def stats(self):
+        """
+        Return a snapshot of the job counters.
+
+        Returns:
+            dict: Runs of this process, runs left to other processes, failures, affected rows and
+            the date of the last run.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _run(self):
+        """
+        Run the job of the current day, then sleep until the next midnight.
+        """
+        done = None
+        while not self._stop.is_set():
+            today = date.today()
+            if done != today:
+                status = self.run_once(today)
+                if status in ('ran', 'done'):
+                    done = today
+                else:
+                    self._stop.wait(self.retry_interval)
+                    continue
+            next_midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+            self._stop.wait(max(1.0, (next_midnight - datetime.now()).total_seconds()))
+
+    def _claim(self, day):
+        """
+        Claim the run of a day in job_runs.
+
+        Returns:
+            str: 'claimed', 'done', 'busy' or 'failed'.
+        """
+        connection = self.connect()
+        if connection is None:
+            return 'failed'
+        cursor = connection.cursor()
+        try:
+            now = datetime.now()
+            cursor.execute(
+                "INSERT IGNORE INTO job_runs (job_name, run_date, started_at) VALUES (%s, %s, %s)",
+                (self.name, day, now))
+            connection.commit()
+            if cursor.rowcount == 1:
+                return 'claimed'
+            cursor.execute(
+                "SELECT finished_at FROM job_runs WHERE job_name = %s AND run_date = %s", (self.name, day))
+            row = cursor.fetchone()
+            if row is not None and row[0] is not None:
+                return 'done'
+            # Take over a claim whose process died before finishing
+            cursor.execute(
+                "UPDATE job_runs SET started_at = %s WHERE job_name = %s AND run_date = %s "
+                "AND finished_at IS NULL AND started_at < %s",
+                (now, self.name, day, now - timedelta(seconds=self.stale_after)))
+            connection.commit()
+            return 'claimed' if cursor.rowcount == 1 else 'busy'
+        except Error as e:
+            print(f"Error: {e}")
+            return 'failed'
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _finish(self, day, rows):
+        """
+        Mark the run of a day as finished.
+        """
+        self._update(
+            "UPDATE job_runs SET finished_at = %s, rows_affected = %s WHERE job_name = %s AND run_date = %s",
+            (datetime.now(), rows, self.name, day))
+
+    def _release(self, day):
+        """
+        Drop the claim of a failed run, so it is attempted again.
+        """
+        self._update(
+            "DELETE FROM job_runs WHERE job_name = %s AND run_date = %s AND finished_at IS NULL", (self.name, day))
+
+    def _update(self, query, params):
+        """
+        Run one statement on the job_runs table.
+        """
+        connection = self.connect()
+        if connection is None:
+            return
+        cursor = connection.cursor()
+        try:
+            cursor.execute(query, params)
+            connection.commit()
+        except Error as e:
+            print(f"Error: {e}")
+        finally:
+            cursor.close()
+            connection.close()
+
+
+def reset_daily_quotas(day):
+    """
+    Reset the recognized counts of all users with a daily limit for a day.
+
+    Args:
+        day (date): The run date.
+
+    Returns:
+        int: Number of users reset, or None if the reset failed.
+    """
+    return reset_recognized_count(datetime.combine(day, datetime.min.time()), config.QUOTA_RESET_CHUNK)
+
+
+# Daily reset of the recognized sign counts, started by the application
+quota_reset = DailyJob('quota_reset', reset_daily_quotas, create_connection)
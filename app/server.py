@@ -0,0 +1,80 @@
+"""
+Module: server
+
+This module builds the web application: the Flask application with its routes, the Socket.IO
+server and its event handlers. It is imported on first access of ``app.app`` or
+``app.socketio``, so the modules of the package can be used without the web tier.
+
+The work a serving process does before it takes traffic is in ``startup()``, called by the
+server entry point, so importing the application does not touch the database.
+
+Functions:
+    - startup(): Check the schema, load the plans, start the daily reset and warm the model up.
+
+Dependencies:
+    - Flask
+    - Flask-SocketIO
+"""
+
+from flask import Flask
+from .routes import home, is_logged_in, login, register, userprofile, get_user_data, get_payment_history, purchase_plan, purchase_form, logout, interpreter, delete_account, reset_password, reset_with_token, reset_password_link, pricing, get_plan_price, get_plans, generate_reset_token
+from .migrations import check_schema
+from .page_cache import page_cache
+from .plans import plan_catalog
+from .scheduler import quota_reset
+from . import config
+from flask_socketio import SocketIO
+from .models import websocket_index, handle_image, handle_connect, handle_disconnect, inference_metrics, readiness, model_runtime
+
+app = Flask(__name__)
+app.config['SECRET_KEY'] = 'AEH'
+socketio = SocketIO(app)
+
+# Adding URL rules for the initial routes
+# Rendered pages are cached per logged-in state, the pricing page until the plans change
+app.add_url_rule('/', view_func=page_cache.cached(home, vary=is_logged_in))
+app.add_url_rule('/login', view_func=login, methods=['GET', 'POST'])
+app.add_url_rule('/register', view_func=register, methods=['GET', 'POST'])
+app.add_url_rule('/userprofile', view_func=userprofile, methods=['GET'])
+app.add_url_rule('/get-user-data', view_func=get_user_data, methods=['GET'])
+app.add_url_rule('/get-payment-history', view_func=get_payment_history, methods=['GET'])
+app.add_url_rule('/purchase_form', view_func=purchase_form, methods=['GET'])
+app.add_url_rule('/purchase_plan', view_func=purchase_plan, methods=['POST'])
+app.add_url_rule('/logout', view_func=logout, methods=['GET'])
+app.add_url_rule('/sli', view_func=page_cache.cached(interpreter, vary=is_logged_in))
+app.add_url_rule('/pricing', view_func=page_cache.cached(pricing, vary=is_logged_in, version=lambda: plan_catalog.etag))
+app.add_url_rule('/websocket', view_func=websocket_index)
+app.add_url_rule('/metrics', view_func=inference_metrics, methods=['GET'])
+app.add_url_rule('/ready', view_func=readiness, methods=['GET'])
+app.add_url_rule('/delete_account', view_func=delete_account, methods=['POST'])
+app.add_url_rule('/reset_password', view_func=reset_password, methods=['POST'])
+app.add_url_rule('/reset_password_link', view_func=reset_password_link, methods=['POST'])
+app.add_url_rule('/reset/<token>', view_func=reset_with_token, methods=['GET', 'POST'])
+app.add_url_rule('/get-plans', view_func=get_plans, methods=['GET'])
+app.add_url_rule('/get-plan-price/<plan_name>', view_func=get_plan_price, methods=['GET'])
+app.add_url_rule('/generate_reset_token', view_func=generate_reset_token, methods=['GET', 'POST'])
+# Adding SocketIO event handler
+socketio.on_event('image', handle_image)
+socketio.on_event('connect', handle_connect)
+socketio.on_event('disconnect', handle_disconnect)
+
+
+def startup():
+    """
+    Prepare this process to serve requests: check the database schema, load the subscription
+    plans, start the daily quota reset and the model warm-up. Called by the server entry point
+    before it runs the application, never on import.
+    """
+    # Check the database schema, migrations are applied with 'python -m app.migrations'
+    check_schema()
+
+    # Load the subscription plans once, reads are served from memory afterwards
+    plan_catalog.load()
+
+    # Reset the daily sign counts at midnight, once across all processes
+    if config.QUOTA_RESET_SCHEDULER:
+        quota_reset.start()
+
+    # Load and warm up the model in the background, /ready answers 503 until it is done
+    if config.MODEL_WARMUP and model_runtime is not None:
+        model_runtime.start_warm_up()
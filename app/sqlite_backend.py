@@ -0,0 +1,323 @@
+"""
+Module: sqlite_backend
+
+This module contains the embedded SQLite storage backend for single-node deployments.
+
+The application code talks to the database through DB-API connections written for MySQL
+Connector/Python: ``%s`` placeholders, ``cursor(dictionary=True)``, ``callproc`` and
+``mysql.connector.Error``. This module wraps ``sqlite3`` connections so the same code runs
+against a database file in the application process, without a server and without network
+round trips. Statements are translated from the MySQL dialect on first use and the
+translations are cached. SQLite errors are raised as the matching MySQL Connector errors, so
+the existing error handling keeps working. Stored procedures are implemented as Python
+functions running in one transaction.
+
+The database runs in WAL mode, so readers do not block the writer and the other way round.
+
+Classes:
+    - SQLiteConnection: sqlite3 connection with the interface of a MySQL Connector connection.
+    - SQLiteCursor: sqlite3 cursor with the interface of a MySQL Connector cursor.
+
+Functions:
+    - connect(path, busy_timeout): Open a connection to a SQLite database file in WAL mode.
+    - translate(query): Translate a statement from the MySQL dialect to SQLite.
+    - procedure(name): Register a Python function as a stored procedure.
+
+Dependencies:
+    - sqlite3
+    - mysql.connector
+    - re
+"""
+
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from functools import lru_cache
+
+from mysql.connector import errorcode
+from mysql.connector.errors import DatabaseError, IntegrityError, InterfaceError, OperationalError, ProgrammingError
+
+# Stored procedures, name -> function(connection, *args) returning the rows of its result set
+PROCEDURES = {}
+
+# MySQL dialect -> SQLite dialect, applied in order
+_REWRITES = [
+    (re.compile(r'\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b', re.I), 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+    (re.compile(r'\bINSERT\s+IGNORE\b', re.I), 'INSERT OR IGNORE'),
+    (re.compile(r'\bCURDATE\(\)', re.I), "date('now', 'localtime')"),
+    (re.compile(r'\bNOW\(\)', re.I), "datetime('now', 'localtime')"),
+]
+
+# UPDATE ... LIMIT is an optional SQLite feature, a rowid subquery works on every build
+_UPDATE_LIMIT = re.compile(r'^\s*UPDATE\s+(\w+)\s+(SET\s.*?)\s+WHERE\s+(.*?)\s+LIMIT\s+%s\s*$', re.I | re.S)
+
+
+def _adapt_datetime(value):
+    return value.isoformat(' ')
+
+
+def _convert_datetime(value):
+    return datetime.fromisoformat(value.decode())
+
+
+def _convert_date(value):
+    return date.fromisoformat(value.decode()[:10])
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter('datetime', _convert_datetime)
+sqlite3.register_converter('timestamp', _convert_datetime)
+sqlite3.register_converter('date', _convert_date)
+
+
+@lru_cache(maxsize=512)
+def translate(query):
+    """
+    Translate a statement from the MySQL dialect to SQLite.
+
+    Args:
+        query (str): The statement with ``%s`` placeholders.
+
+    Returns:
+        str: The SQLite statement with ``?`` placeholders.
+    """
+    match = _UPDATE_LIMIT.match(query)
+    if match:
+        table, assignments, condition = match.groups()
+        query = (f"UPDATE {table} {assignments} WHERE rowid IN "
+                 f"(SELECT rowid FROM {table} WHERE {condition} LIMIT %s)")
+    for pattern, replacement in _REWRITES:
+        query = pattern.sub(replacement, query)
+    return query.replace('%s', '?')
+
+
+def _mysql_error(error):
+    """
+    Return the MySQL Connector error matching a SQLite error.
+    """
+    message = str(error)
+    if isinstance(error, sqlite3.IntegrityError):
+        errno = errorcode.ER_DUP_ENTRY if 'UNIQUE' in message else errorcode.ER_NO_REFERENCED_ROW_2
+        return IntegrityError(msg=message, errno=errno)
+    if isinstance(error, sqlite3.OperationalError):
+        if 'locked' in message or 'busy' in message:
+            return OperationalError(msg=message, errno=errorcode.ER_LOCK_WAIT_TIMEOUT)
+        return ProgrammingError(msg=message)
+    if isinstance(error, sqlite3.ProgrammingError):
+        return InterfaceError(msg=message)
+    return DatabaseError(msg=message)
+
+
+def procedure(name):
+    """
+    Register a Python function as a stored procedure, called by ``SQLiteCursor.callproc``.
+
+    Args:
+        name (str): The procedure name.
+
+    Returns:
+        callable: Decorator registering the function.
+    """
+    def register(function):
+        PROCEDURES[name] = function
+        return function
+    return register
+
+
+class _StoredResult:
+    """
+    Result set of a stored procedure.
+    """
+
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+class SQLiteCursor:
+    """
+    sqlite3 cursor with the interface of a MySQL Connector cursor.
+
+    Args:
+        connection (SQLiteConnection): The connection.
+        dictionary (bool): Return rows as dictionaries keyed by column name.
+    """
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self._dictionary = dictionary
+        self._stored_results = []
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, query, params=()):
+        """
+        Execute a statement written for MySQL.
+        """
+        try:
+            self._cursor.execute(translate(query), tuple(params or ()))
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+    def executemany(self, query, seq_params):
+        """
+        Execute a statement written for MySQL once per parameter sequence.
+        """
+        try:
+            self._cursor.executemany(translate(query), [tuple(params) for params in seq_params])
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return self._row(row) if row is not None else None
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def callproc(self, name, args=()):
+        """
+        Call a stored procedure registered with ``procedure``. Its result set is returned by
+        ``stored_results``.
+        """
+        function = PROCEDURES.get(name)
+        if function is None:
+            raise ProgrammingError(msg=f"PROCEDURE {name} does not exist", errno=errorcode.ER_SP_DOES_NOT_EXIST)
+        try:
+            self._stored_results = [_StoredResult(function(self._connection, *args))]
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+        return tuple(args)
+
+    def stored_results(self):
+        return iter(self._stored_results)
+
+    def close(self):
+        self._cursor.close()
+
+    def _row(self, row):
+        if self._dictionary:
+            return {column[0]: value for column, value in zip(self._cursor.description, row)}
+        return row
+
+
+class SQLiteConnection:
+    """
+    sqlite3 connection with the interface of a MySQL Connector connection.
+
+    Args:
+        raw (sqlite3.Connection): The underlying connection.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._closed = False
+
+    def cursor(self, dictionary=False):
+        return SQLiteCursor(self, dictionary=dictionary)
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def is_connected(self):
+        return not self._closed
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.raw.close()
+
+
+def connect(path, busy_timeout=5.0):
+    """
+    Open a connection to a SQLite database file in WAL mode.
+
+    Args:
+        path (str): Path of the database file, created if it does not exist.
+        busy_timeout (float): Seconds a statement waits for a lock held by another connection.
+
+    Returns:
+        SQLiteConnection: The connection.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Connections are handed between threads by the connection pool, one thread at a time
+    raw = sqlite3.connect(path, timeout=busy_timeout, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+    raw.execute('PRAGMA journal_mode = WAL')
+    raw.execute('PRAGMA synchronous = NORMAL')  # Durable at checkpoints, safe against corruption in WAL mode
+    raw.execute('PRAGMA foreign_keys = ON')
+    return SQLiteConnection(raw)
+
+
+@procedure('purchase_plan')
+def purchase_plan(connection, username, plan_name):
+    """
+    The purchase_plan stored procedure of the MySQL schema, see app/migrations.py.
+
+    The procedure runs and commits its own transaction, so it refuses to run while the caller
+    has one open rather than committing the caller's pending writes.
+
+    Returns:
+        list: One (status, amount) row.
+
+    Raises:
+        ProgrammingError: If the connection has an open transaction.
+    """
+    raw = connection.raw
+    if raw.in_transaction:
+        raise ProgrammingError(msg="purchase_plan cannot run inside an open transaction, commit or roll back first.")
+    raw.execute('BEGIN IMMEDIATE')  # Takes the write lock up front, like SELECT ... FOR UPDATE
+    try:
+        row = raw.execute(
+            "SELECT u.id, current_plan.plan_id, new_plan.plan_id, new_plan.price "
+            "FROM users u "
+            "LEFT JOIN subscription_plan current_plan ON current_plan.plan_name = u.plan_name "
+            "LEFT JOIN subscription_plan new_plan ON new_plan.plan_name = ? "
+            "WHERE u.username = ?", (plan_name, username)).fetchone()
+        if row is None:
+            status = 'user_not_found'
+        elif row[1] is None:
+            status = 'current_plan_not_found'
+        elif row[2] is None:
+            status = 'plan_not_found'
+        elif row[2] == row[1]:
+            status = 'same_plan'
+        else:
+            user_id, _, _, price = row
+            raw.execute("UPDATE users SET plan_name = ? WHERE id = ?", (plan_name, user_id))
+            raw.execute(
+                "INSERT INTO payments (user_id, payment_date, amount) VALUES (?, ?, ?)",
+                (user_id, date.today(), price))
+            raw.commit()
+            return [('purchased', price)]
+        raw.rollback()
+        return [(status, None)]
+    except BaseException:
+        raw.rollback()
+        raise
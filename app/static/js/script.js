@@ -116,8 +116,9 @@ function stopCamera() {
 function startCapturing() {
     captureInterval = setInterval(() => {
         if (!recognitionPaused && !limitReached) {
-            const imageData = captureImage().split(',')[1];
-            socket.emit('image', { image: imageData });
+            captureImage().then((imageData) => {
+                socket.emit('image', { image: imageData });
+            });
         }
     }, 1000);
 }
@@ -154,7 +155,7 @@ toggleRecognitionBtn.addEventListener('click', function () {
 
 /**
  * Function to capture an image from the video stream.
- * @returns {string} - The captured image as a base64-encoded data URL.
+ * @returns {Promise<ArrayBuffer>} - The captured image as JPEG bytes, sent as a binary attachment.
  */
 function captureImage() {
     const canvas = document.createElement('canvas');
@@ -162,7 +163,7 @@ function captureImage() {
     canvas.height = video.videoHeight;
     const context = canvas.getContext('2d');
     context.drawImage(video, 0, 0, canvas.width, canvas.height);
-    return canvas.toDataURL('image/jpeg');
+    return new Promise((resolve) => canvas.toBlob(resolve, 'image/jpeg')).then((blob) => blob.arrayBuffer());
 }
 
 // Get Socket.IO
@@ -172,9 +173,13 @@ const socket = io();
  * Event handler for receiving predictions from the server.
  * @param {Object} data - The data received from the server.
  * @param {string} data.prediction - The predicted gesture.
+ * @param {boolean} [data.unchanged] - True when the frame did not change since the last processed one.
  */
 socket.on('prediction', (data) => {
-    if (data.prediction === 'space') {
+    if (data.unchanged) {
+        // Same frame as before, the prediction is already shown and in the history
+        predictionElement.textContent = `Predicted letter: ${data.prediction}`;
+    } else if (data.prediction === 'space') {
         predictionElement.textContent = `Predicted letter: ${data.prediction}`;
         historyText += ' ';
     } else if (data.prediction === 'del') {
@@ -1,9 +1,44 @@
 /**
  * @fileoverview This file contains the client-side JavaScript for handling user data retrieval and display on the web page.
  * It uses jQuery for making AJAX requests to the server and updating the DOM with user information.
+ * The payment history arrives in pages; further pages are loaded when the user asks for them.
  */
 
 $(document).ready(function () {
+    /**
+     * Cursor of the next page of the payment history, null when all payments are shown.
+     * @type {?string}
+     */
+    var nextPaymentsCursor = null;
+
+    /**
+     * Format a payment date for display.
+     * @param {string} dateString - The date returned by the server.
+     * @returns {string} The formatted date.
+     */
+    function formatDate(dateString) {
+        var date = new Date(dateString);
+        var options = { weekday: 'short', year: 'numeric', month: 'short', day: 'numeric' };
+        return date.toLocaleDateString('en-GB', options);
+    }
+
+    /**
+     * Append a page of payments to the payment history and show or hide the load more button.
+     * @param {Array<Object>} payments - The payments of the page.
+     * @param {?string} nextCursor - The cursor of the next page, null on the last page.
+     */
+    function appendPayments(payments, nextCursor) {
+        var paymentHistoryHTML = '';
+        payments.forEach(function (payment) {
+            paymentHistoryHTML += '<p><strong>Payment Date:</strong> ' + formatDate(payment.payment_date) + '</p>';
+            paymentHistoryHTML += '<p><strong>Amount:</strong> ' + payment.amount + '</p>';
+            paymentHistoryHTML += '<hr>'; // Separate each payment entry
+        });
+        $('#paymentHistory').append(paymentHistoryHTML);
+        nextPaymentsCursor = nextCursor;
+        $('#loadMorePayments').toggle(nextCursor !== null);
+    }
+
     /**
      * AJAX request to get user data from the server.
      */
@@ -18,7 +53,8 @@ $(document).ready(function () {
          * @param {string} userData.name - The first name of the user.
          * @param {string} userData.surname - The surname of the user.
          * @param {string} userData.plan_name - The subscription plan of the user.
-         * @param {Array<Object>} userData.payment_history - The payment history of the user.
+         * @param {Array<Object>} userData.payment_history - The first page of the payment history of the user.
+         * @param {?string} userData.payment_history_next - The cursor of the next page of the payment history.
          */
         success: function (userData) {
             $('#username').text(userData.username);
@@ -30,18 +66,7 @@ $(document).ready(function () {
             // Display payment history
             var paymentHistory = userData.payment_history;
             if (paymentHistory && paymentHistory.length > 0) {
-                var paymentHistoryHTML = '';
-                paymentHistory.forEach(function (payment) {
-                    paymentHistoryHTML += '<p><strong>Payment Date:</strong> ' + formatDate(payment.payment_date) + '</p>';
-                    function formatDate(dateString) {
-                        var date = new Date(dateString);
-                        var options = { weekday: 'short', year: 'numeric', month: 'short', day: 'numeric' };
-                        return date.toLocaleDateString('en-GB', options);
-                    }
-                    paymentHistoryHTML += '<p><strong>Amount:</strong> ' + payment.amount + '</p>';
-                    paymentHistoryHTML += '<hr>'; // Separate each payment entry
-                });
-                $('#paymentHistory').html(paymentHistoryHTML);
+                appendPayments(paymentHistory, userData.payment_history_next);
             } else {
                 $('#paymentHistory').html('<p>No payment history available</p>');
             }
@@ -61,4 +86,31 @@ $(document).ready(function () {
             }
         }
     });
+
+    /**
+     * Load the next page of the payment history.
+     */
+    $('#loadMorePayments').on('click', function () {
+        if (nextPaymentsCursor === null) {
+            return;
+        }
+        var button = $(this).prop('disabled', true);
+        $.ajax({
+            url: '/get-payment-history',
+            type: 'GET',
+            data: { after: nextPaymentsCursor },
+            success: function (page) {
+                appendPayments(page.payment_history, page.payment_history_next);
+            },
+            error: function (xhr, status, error) {
+                console.error('Error:', error);
+                if (xhr.status === 401) { // Check for unauthorized status
+                    window.location.href = '/'; // Redirect
+                }
+            },
+            complete: function () {
+                button.prop('disabled', false);
+            }
+        });
+    });
 });
@@ -0,0 +1,209 @@
+"""
+Module: usage
+
+This module contains a write-behind meter of recognized signs.
+
+Recording a recognized sign only increments an in-memory counter. A background thread writes
+the pending counts to ``users.recognized_count`` in batched multi-row UPDATE statements, every
+flush interval or as soon as enough users have pending counts. Pending counts are flushed when
+the process exits. The database lags behind by at most one flush interval; ``pending`` returns
+the counts that are not written yet for readers that need the exact value.
+
+Classes:
+    - UsageMeter: Buffers per-user recognized sign counts and flushes them in batches.
+
+Dependencies:
+    - mysql.connector
+    - threading
+    - atexit
+"""
+
+import atexit
+import threading
+import time
+
+from mysql.connector import Error
+
+from . import config
+from .database import create_connection
+
+# Users updated by one UPDATE statement
+FLUSH_CHUNK = 500
+
+
+class UsageMeter:
+    """
+    Write-behind meter of recognized signs per user.
+
+    Args:
+        connect (callable): Function returning a database connection, or None if none is available.
+        flush_interval (float): Maximum seconds a count stays in memory.
+        max_pending (int): Number of users with pending counts that triggers an early flush.
+    """
+
+    def __init__(self, connect, flush_interval=1.0, max_pending=100):
+        self.connect = connect
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}  # username -> recognized signs not written yet
+        self._wake = threading.Event()
+        self._worker = None
+        self._closed = False
+        self._stats = {
+            'recorded': 0,
+            'flushes': 0,
+            'rows_written': 0,
+            'statements': 0,
+            'errors': 0,
+            'flush_total_ms': 0.0,
+        }
+        atexit.register(self.close)
+
+    def record(self, username, count=1):
+        """
+        Count recognized signs of a user.
+
+        Args:
+            username (str): The user the signs are counted for.
+            count (int): Number of recognized signs.
+        """
+        with self._lock:
+            self._pending[username] = self._pending.get(username, 0) + count
+            self._stats['recorded'] += count
+            full = len(self._pending) >= self.max_pending
+            if self._worker is None and not self._closed:
+                # Started on first use, so processes forked at import time do not inherit it
+                self._worker = threading.Thread(target=self._run, name='usage-meter', daemon=True)
+                self._worker.start()
+        if full:
+            self._wake.set()
+
+    def pending(self, username):
+        """
+        Return the recognized signs of a user that are not written to the database yet.
+
+        Args:
+            username (str): The user.
+
+        Returns:
+            int: Pending count.
+        """
+        with self._lock:
+            return self._pending.get(username, 0)
+
+    def discard(self, username):
+        """
+        Drop the pending count of a user, for example when the count is reset.
+
+        Args:
+            username (str): The user.
+        """
+        with self._lock:
+            self._pending.pop(username, None)
+
+    def flush(self):
+        """
+        Write all pending counts to the database.
+
+        Counts that could not be written are kept and retried on the next flush.
+
+        Returns:
+            int: Number of users written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            written = 0
+            try:
+                written = self._write(batch)
+            except Error as e:
+                print(f"Error: {e}")
+            with self._lock:
+                if written < len(batch):
+                    # Put back what was not written, merged with counts recorded meanwhile
+                    for username, count in list(batch.items())[written:]:
+                        self._pending[username] = self._pending.get(username, 0) + count
+                    self._stats['errors'] += 1
+                self._stats['flushes'] += 1
+                self._stats['rows_written'] += written
+                self._stats['flush_total_ms'] += (time.perf_counter() - started) * 1000.0
+            return written
+
+    def close(self):
+        """
+        Stop the background thread and flush the pending counts.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+        self.flush()
+
+    def stats(self):
+        """
+        Return a snapshot of the meter counters.
+
+        Returns:
+            dict: Recorded signs, flushes, rows and statements written, errors and pending users.
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['pending_users'] = len(self._pending)
+            snapshot['pending_signs'] = sum(self._pending.values())
+        flushes = snapshot['flushes']
+        snapshot['mean_flush_ms'] = snapshot['flush_total_ms'] / flushes if flushes else 0.0
+        return snapshot
+
+    def _write(self, batch):
+        """
+        Add pending counts to ``users.recognized_count``, one UPDATE per chunk of users.
+
+        Returns:
+            int: Number of users written, in the order of ``batch``.
+        """
+        connection = self.connect()
+        if connection is None:
+            return 0
+        items = list(batch.items())
+        written = 0
+        cursor = connection.cursor()
+        try:
+            for start in range(0, len(items), FLUSH_CHUNK):
+                chunk = items[start:start + FLUSH_CHUNK]
+                cases = ' '.join(['WHEN %s THEN %s'] * len(chunk))
+                placeholders = ', '.join(['%s'] * len(chunk))
+                params = [value for item in chunk for value in item] + [username for username, _ in chunk]
+                cursor.execute(
+                    f"UPDATE users SET recognized_count = COALESCE(recognized_count, 0) + "
+                    f"CASE username {cases} END WHERE username IN ({placeholders})", params)
+                connection.commit()
+                written += len(chunk)
+                with self._lock:
+                    self._stats['statements'] += 1
+        finally:
+            cursor.close()
+            connection.close()
+        return written
+
+    def _run(self):
+        """
+        Flush pending counts every flush interval, or earlier when enough users are pending.
+        """
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._closed:
+                break
+            self.flush()
+
+
+# Recognized signs of all sessions of this process
+usage_meter = UsageMeter(
+    create_connection, flush_interval=config.USAGE_FLUSH_INTERVAL, max_pending=config.USAGE_FLUSH_SIZE)
@@ -0,0 +1,99 @@
+"""
+Benchmark of request latency on the MySQL and the embedded SQLite storage backends.
+
+Every backend runs in its own process, since the backend is selected by configuration when
+the application is imported. The process migrates a scratch database, creates a user with a
+payment history and times requests of that user through the Flask test client: the profile
+data with the first payment page, and a further payment page.
+
+MySQL is configured with the usual SLI_DB_* variables and uses the user_auth_bench database
+by default; the SQLite database is a temporary file.
+
+Usage (from the repository root):
+    python benchmarks/bench_backends.py --requests 2000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROUTES = ('/get-user-data', '/get-payment-history')
+
+
+def run_backend(requests):
+    """
+    Time the routes on the backend selected by the environment and print one line per route.
+    """
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from app import app
+    from app.database import create_connection
+    from app.migrations import migrate
+
+    if migrate() is None:
+        sys.exit(1)
+    connection = create_connection()
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM payments WHERE user_id IN (SELECT id FROM users WHERE username = 'bench_user')")
+    cursor.execute("DELETE FROM users WHERE username = 'bench_user'")
+    cursor.execute("INSERT INTO users (username, email, password, name, surname, plan_name) "
+                   "VALUES ('bench_user', 'bench@example.com', 'x', 'Bench', 'User', 'Basic')")
+    cursor.execute("SELECT id FROM users WHERE username = 'bench_user'")
+    user_id = cursor.fetchone()[0]
+    cursor.executemany("INSERT INTO payments (user_id, payment_date, amount) VALUES (%s, CURDATE(), %s)",
+                       [(user_id, 19.99)] * 100)
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['username'] = 'bench_user'
+    next_page = client.get('/get-user-data').json['payment_history_next']
+    urls = {'/get-user-data': '/get-user-data', '/get-payment-history': f'/get-payment-history?after={next_page}'}
+    for route in ROUTES:
+        latencies = np.empty(requests)
+        for i in range(requests):
+            start = time.perf_counter()
+            response = client.get(urls[route])
+            latencies[i] = (time.perf_counter() - start) * 1000.0
+            assert response.status_code == 200, response.json
+        print(f"{route}\t{latencies.mean():.3f}\t{np.percentile(latencies, 50):.3f}\t{np.percentile(latencies, 95):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per route')
+    parser.add_argument('--backends', nargs='+', default=['mysql', 'sqlite'], help='Backends to compare')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_backend(args.requests)
+        return
+
+    print(f"{'backend':<8}{'route':<22}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in args.backends:
+            env = dict(os.environ, SLI_DB_BACKEND=backend, SLI_QUOTA_RESET_SCHEDULER='0')
+            env.setdefault('SLI_DB_NAME', 'user_auth_bench')
+            env.setdefault('SLI_SQLITE_PATH', os.path.join(directory, 'bench.db'))
+            result = subprocess.run(
+                [sys.executable, __file__, '--child', '--requests', str(args.requests)],
+                env=env, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"{backend:<8}unavailable")
+                continue
+            for line in result.stdout.splitlines():
+                fields = line.split('\t')
+                if len(fields) == 4 and fields[0] in ROUTES:
+                    route, mean, p50, p95 = fields
+                    print(f"{backend:<8}{route:<22}{float(mean):>10.3f}{float(p50):>10.3f}{float(p95):>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark of the decode stage ahead of MediaPipe.
+
+Encodes the ASL sign photos shipped in app/static/img as webcam-like JPEG frames and measures the
+CPU time per frame of every decode mode and target long edge. With --accuracy, every decoded
+frame also goes through MediaPipe Hands and the classifier, and the predictions are compared
+with the full-resolution decode and with the sign shown in the photo. A labelled dataset
+(one sub-directory per label, as used for training) can be added with --dataset.
+
+Usage (from the repository root):
+    python benchmarks/bench_decode.py --accuracy
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.features import extract_features
+from app.pipeline import decode_frame, labels
+
+FRAME_SIZES = ((640, 480), (1280, 720))
+TARGET_LONG_EDGES = (480, 320, 240, 160)
+
+
+def webcam_frame(img, width, height):
+    """
+    Center-crop a photo to the aspect ratio of a webcam frame, resize it and encode it as JPEG.
+    """
+    h, w = img.shape[:2]
+    crop_w, crop_h = min(w, h * width // height), min(h, w * height // width)
+    x, y = (w - crop_w) // 2, (h - crop_h) // 2
+    frame = cv2.resize(img[y:y + crop_h, x:x + crop_w], (width, height), interpolation=cv2.INTER_AREA)
+    return cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 92])[1].tobytes()
+
+
+def load_frames(dataset=None):
+    """
+    Build (label, jpeg bytes, frame size) samples from the sign photos and an optional dataset.
+    """
+    photos = []
+    root = os.path.join(os.path.dirname(__file__), '..', 'app', 'static', 'img')
+    for path in sorted(glob.glob(os.path.join(root, '*-americansign.jpeg'))):
+        photos.append((os.path.basename(path)[0].upper(), cv2.imread(path)))
+    if dataset:
+        for label in labels:
+            for path in sorted(glob.glob(os.path.join(dataset, label, '*')))[:20]:
+                photos.append((label, cv2.imread(path)))
+    return [(label, webcam_frame(img, w, h), (w, h)) for label, img in photos for w, h in FRAME_SIZES]
+
+
+def decode_cpu_ms(frames, mode, target, repeat):
+    """
+    CPU time in milliseconds per decoded frame.
+    """
+    start = time.process_time()
+    for _ in range(repeat):
+        for _, data, _ in frames:
+            decode_frame(data, mode, target)
+    return (time.process_time() - start) * 1000.0 / (repeat * len(frames))
+
+
+def predictions(frames, mode, target, model):
+    """
+    Predicted label, or None without a detected hand, for every frame.
+    """
+    import mediapipe as mp
+    hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.5)
+    result = []
+    for _, data, _ in frames:
+        landmarks = extract_features(hands.process(decode_frame(data, mode, target)))
+        if landmarks is None:
+            result.append(None)
+            continue
+        result.append(labels[np.argmax(model.predict(landmarks))])
+    hands.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, help='Decodes per frame for the timing')
+    parser.add_argument('--accuracy', action='store_true', help='Also run MediaPipe and the classifier')
+    parser.add_argument('--dataset', help='Labelled dataset added to the sign photos')
+    parser.add_argument('--model', default='models/final_model/final_model.h5')
+    args = parser.parse_args()
+
+    frames = load_frames(args.dataset)
+    configurations = [('full', None)] + [(mode, target) for mode in ('reduced', 'resize') for target in TARGET_LONG_EDGES]
+
+    model = reference = None
+    if args.accuracy:
+        from app.inference import NumpyBackend
+        model = NumpyBackend(args.model)
+        reference = predictions(frames, 'full', None, model)
+
+    print(f"{len(frames)} frames at {', '.join(f'{w}x{h}' for w, h in FRAME_SIZES)}")
+    header = f"{'mode':<9}{'target':>7}{'cpu ms/frame':>14}{'saved':>8}"
+    if args.accuracy:
+        header += f"{'detected':>10}{'agree w/ full':>15}{'correct':>9}"
+    print(header)
+    baseline = None
+    for mode, target in configurations:
+        cpu_ms = decode_cpu_ms(frames, mode, target, args.repeat)
+        baseline = baseline or cpu_ms
+        row = f"{mode:<9}{target or '-':>7}{cpu_ms:>14.3f}{1 - cpu_ms / baseline:>8.0%}"
+        if args.accuracy:
+            predicted = predictions(frames, mode, target, model)
+            detected = np.mean([p is not None for p in predicted])
+            agreement = np.mean([p == r for p, r in zip(predicted, reference)])
+            correct = np.mean([p == label for p, (label, _, _) in zip(predicted, frames)])
+            row += f"{detected:>10.0%}{agreement:>15.0%}{correct:>9.0%}"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark of the memory of the web tier with and without the standalone inference service.
+
+Every configuration runs in a fresh process that reports its resident set size:
+
+- inline: a web worker that recognizes frames itself, with MediaPipe and the warmed-up model.
+- client: a web worker that forwards frames to the inference service.
+- service: the inference service, with MediaPipe and the warmed-up model.
+
+The totals compare N web workers recognizing inline with N client web workers plus one
+service process.
+
+Usage (from the repository root):
+    python benchmarks/bench_memory.py --web-workers 4
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+MODES = ('inline', 'client', 'service')
+
+
+def rss_mb():
+    """
+    Return the resident set size of this process in MiB.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0  # Peak, in KiB on Linux
+
+
+def run_child(mode):
+    """
+    Set up one configuration and print its resident set size as a JSON line.
+    """
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    if mode == 'service':
+        from app import config
+        from app.inference_service import InferenceService
+        model_path = config.QUANTIZED_MODEL_PATH if config.INFERENCE_BACKEND == 'int8' else config.MODEL_PATH
+        if not InferenceService(config.INFERENCE_BACKEND, model_path).runtime.warm_up():
+            sys.exit(1)
+    else:
+        from app import models
+        if mode == 'inline' and not models.model_runtime.warm_up():
+            sys.exit(1)
+    print(json.dumps({'mode': mode, 'rss_mb': rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--web-workers', type=int, default=4, help='Number of web workers of the totals')
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    rss = {}
+    for mode in MODES:
+        env = dict(os.environ, SLI_MODEL_WARMUP='0', SLI_QUOTA_RESET_SCHEDULER='0', SLI_FRAME_WORKERS='0')
+        if mode == 'inline':
+            env.pop('SLI_INFERENCE_SERVICE', None)
+        else:
+            # Never contacted, the client connects on the first frame
+            env.setdefault('SLI_INFERENCE_SERVICE', '127.0.0.1:6000')
+            env.setdefault('SLI_INFERENCE_SERVICE_AUTHKEY', 'bench-memory')
+        result = subprocess.run([sys.executable, __file__, '--child', mode], env=env, capture_output=True, text=True)
+        lines = [line for line in result.stdout.splitlines() if line.startswith('{')]
+        if result.returncode != 0 or not lines:
+            print(result.stderr.strip() or result.stdout.strip())
+            sys.exit(1)
+        rss[mode] = json.loads(lines[-1])['rss_mb']
+
+    print(f"{'process':<12}{'RSS MiB':>10}")
+    for mode in MODES:
+        print(f"{mode:<12}{rss[mode]:>10.1f}")
+    workers = args.web_workers
+    inline_total = workers * rss['inline']
+    split_total = workers * rss['client'] + rss['service']
+    print(f"\nPer web worker: {rss['inline']:.1f} MiB inline, {rss['client']:.1f} MiB with the service "
+          f"({rss['inline'] - rss['client']:.1f} MiB less)")
+    print(f"{workers} web workers: {inline_total:.1f} MiB inline, {split_total:.1f} MiB with one service process")
+
+
+if __name__ == '__main__':
+    main()
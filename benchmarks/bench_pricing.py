@@ -0,0 +1,84 @@
+"""
+Benchmark of the /pricing page with and without the page cache.
+
+Requests go through the Flask test client, so the numbers are the cost of the application
+itself without a network or a WSGI server in front of it. Three cases are measured, for a
+visitor and for a logged-in user:
+
+- uncached: every request renders the template, as before the page cache.
+- cached: the rendered page is served from the cache.
+- revalidated: the browser sends the ETag of its copy and gets an empty 304 response.
+
+The plans are read from the database once, by the plan catalog, in all cases. The benchmark
+works in its own database, user_auth_bench by default, which it migrates to the latest schema.
+The server is configured with the usual SLI_DB_* variables.
+
+Usage (from the repository root):
+    python benchmarks/bench_pricing.py --requests 2000
+    SLI_DB_BACKEND=sqlite SLI_SQLITE_PATH=/tmp/sli-bench.db python benchmarks/bench_pricing.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('SLI_DB_NAME', 'user_auth_bench')
+os.environ.setdefault('SLI_QUOTA_RESET_SCHEDULER', '0')
+os.environ.setdefault('SLI_MODEL_WARMUP', '0')
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.migrations import migrate
+
+
+def run(client, requests, headers=None):
+    """
+    Requests per second of GET /pricing, checking that every request gets the expected status.
+    """
+    expected = 304 if headers else 200
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get('/pricing', headers=headers)
+        if response.status_code != expected:
+            sys.exit(f"GET /pricing answered {response.status_code}, expected {expected}.")
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per case')
+    args = parser.parse_args()
+
+    if migrate() is None:
+        sys.exit("Failed to migrate the benchmark database.")
+    from app import app
+    from app.page_cache import page_cache
+    from app.plans import plan_catalog
+    if not plan_catalog.load():
+        sys.exit("Failed to load the subscription plans.")
+
+    ttl = page_cache.ttl or 300.0
+    print(f"{'visitor':<12}{'case':<14}{'requests/s':>12}")
+    for visitor in ('guest', 'logged in'):
+        client = app.test_client()
+        if visitor == 'logged in':
+            with client.session_transaction() as sess:
+                sess['username'] = 'bench_user'
+
+        page_cache.ttl = 0.0
+        client.get('/pricing')  # Loads the templates
+        uncached = run(client, args.requests)
+
+        page_cache.ttl = ttl
+        etag = client.get('/pricing').headers['ETag']
+        cached = run(client, args.requests)
+        revalidated = run(client, args.requests, headers={'If-None-Match': etag})
+
+        print(f"{visitor:<12}{'uncached':<14}{uncached:>12.1f}")
+        print(f"{visitor:<12}{'cached':<14}{cached:>12.1f}")
+        print(f"{visitor:<12}{'revalidated':<14}{revalidated:>12.1f}")
+        print(f"{visitor:<12}{'speedup':<14}{cached / uncached:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
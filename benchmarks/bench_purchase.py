@@ -0,0 +1,120 @@
+"""
+Benchmark of plan purchase throughput against a local MySQL server.
+
+Compares the previous purchase path of purchase_plan (four SELECTs, then the plan UPDATE and
+the payment INSERT committed separately) with the single transaction of the purchase_plan
+stored procedure. Every thread buys plans for its own users, alternating between two plans
+so that every purchase changes the plan.
+
+The benchmark works in its own database, user_auth_bench by default, which it migrates to
+the latest schema and fills with benchmark users. The server is configured with the usual
+SLI_DB_* variables.
+
+Usage (from the repository root):
+    python benchmarks/bench_purchase.py --threads 8 --purchases 500
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault('SLI_DB_NAME', 'user_auth_bench')
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import connect, record_purchase
+from app.migrations import migrate
+
+PLANS = ('Standard', 'Unlimited')
+
+
+def legacy_purchase(connection, username, plan_name):
+    """
+    The purchase path before it was moved into one transaction.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT id, plan_name FROM users WHERE username = %s", (username,))
+        user_id, current_plan_name = cursor.fetchone()
+        cursor.execute("SELECT plan_id FROM subscription_plan WHERE plan_name = %s", (current_plan_name,))
+        current_plan_id = cursor.fetchone()[0]
+        cursor.execute("SELECT plan_id FROM subscription_plan WHERE plan_name = %s", (plan_name,))
+        new_plan_id = cursor.fetchone()[0]
+        if new_plan_id == current_plan_id:
+            return 'same_plan', None
+        cursor.execute("SELECT price FROM subscription_plan WHERE plan_name = %s", (plan_name,))
+        amount = cursor.fetchone()[0]
+        cursor.execute("UPDATE users SET plan_name = %s WHERE username = %s", (plan_name, username))
+        connection.commit()
+        cursor.execute(
+            "INSERT INTO payments (user_id, payment_date, amount) VALUES (%s, CURDATE(), %s)", (user_id, amount))
+        connection.commit()
+        return 'purchased', amount
+    finally:
+        cursor.close()
+
+
+def prepare_users(count):
+    """
+    Create the benchmark users on the Basic plan, and clear the payments of earlier runs.
+    """
+    connection = connect()
+    cursor = connection.cursor()
+    cursor.execute("DELETE payments FROM payments JOIN users ON users.id = payments.user_id "
+                   "WHERE users.username LIKE 'bench_%'")
+    cursor.execute("DELETE FROM users WHERE username LIKE 'bench_%'")
+    cursor.executemany(
+        "INSERT INTO users (username, email, password, plan_name) VALUES (%s, %s, 'x', 'Basic')",
+        [(f'bench_{i}', f'bench_{i}@example.com') for i in range(count)])
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+def run(purchase, threads, purchases):
+    """
+    Purchases per second with the given number of threads, one connection per thread.
+    """
+    errors = []
+
+    def worker(index):
+        connection = connect()
+        try:
+            for i in range(purchases):
+                status, _ = purchase(connection, f'bench_{index}', PLANS[i % 2])
+                if status != 'purchased':
+                    errors.append(status)
+        finally:
+            connection.close()
+
+    prepare_users(threads)
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        print(f"  {len(errors)} purchases refused: {sorted(set(errors))}")
+    return threads * purchases / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8], help='Concurrent purchasing threads')
+    parser.add_argument('--purchases', type=int, default=300, help='Purchases per thread')
+    args = parser.parse_args()
+
+    if migrate() is None:
+        sys.exit("Failed to migrate the benchmark database.")
+    print(f"{'path':<14}{'threads':>8}{'purchases/s':>14}")
+    for threads in args.threads:
+        for name, purchase in (('legacy', legacy_purchase), ('transaction', record_purchase)):
+            rate = run(purchase, threads, args.purchases)
+            print(f"{name:<14}{threads:>8}{rate:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark of the cold start of the application.
+
+Every run is a fresh Python process, so nothing is cached between runs. The process measures
+the time to import the web application, whether importing it pulled in TensorFlow and MediaPipe,
+the time to load the model, the duration of the warm-up and the latency of the first frame
+after the warm-up. Track the import time to catch heavy imports creeping back into the web
+process; the warm-up time is what a new process needs before /ready reports it ready.
+
+Usage (from the repository root):
+    python benchmarks/bench_startup.py --runs 5
+    SLI_INFERENCE_BACKEND=numpy python benchmarks/bench_startup.py
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+FIELDS = ('import_ms', 'load_ms', 'warmup_ms', 'first_frame_ms')
+
+
+def run_child():
+    """
+    Import the application, warm it up and print the measurements as one JSON line.
+    """
+    started = time.perf_counter()
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from app import app as web_app  # noqa: F401, builds the web application
+    import_ms = (time.perf_counter() - started) * 1000.0
+    heavy = {name: name in sys.modules for name in ('tensorflow', 'mediapipe')}
+
+    import cv2
+    from app import models
+    from app.pipeline import recognize_frame
+
+    runtime = models.model_runtime
+    if runtime is None:
+        sys.exit("Run with SLI_FRAME_WORKERS=0, the workers load the model in their own processes.")
+    if not runtime.warm_up():
+        sys.exit(1)
+    frame = cv2.imencode('.jpg', np.zeros((480, 640, 3), dtype=np.uint8))[1].tobytes()
+    started = time.perf_counter()
+    with models.hands_pool.acquire('bench') as tracker:
+        recognize_frame(frame, tracker, models.batcher.predict)
+    first_frame_ms = (time.perf_counter() - started) * 1000.0
+
+    stats = runtime.stats()
+    print(json.dumps(dict(heavy, import_ms=import_ms, load_ms=stats['load_ms'],
+                          warmup_ms=stats['warmup_ms'], first_frame_ms=first_frame_ms)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh processes')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child()
+        return
+
+    # The child warms up explicitly, without the background warm-up and the scheduler
+    env = dict(os.environ, SLI_MODEL_WARMUP='0', SLI_QUOTA_RESET_SCHEDULER='0', SLI_FRAME_WORKERS='0')
+    results = []
+    for _ in range(args.runs):
+        result = subprocess.run([sys.executable, __file__, '--child'], env=env, capture_output=True, text=True)
+        lines = [line for line in result.stdout.splitlines() if line.startswith('{')]
+        if result.returncode != 0 or not lines:
+            print(result.stderr.strip() or result.stdout.strip())
+            sys.exit(1)
+        results.append(json.loads(lines[-1]))
+
+    print(f"{'stage':<16}{'mean ms':>10}{'min ms':>10}{'max ms':>10}")
+    for field in FIELDS:
+        values = np.array([result[field] for result in results])
+        print(f"{field:<16}{values.mean():>10.1f}{values.min():>10.1f}{values.max():>10.1f}")
+    for module in ('tensorflow', 'mediapipe'):
+        imported = sum(result[module] for result in results)
+        print(f"{module} imported by the web application in {imported} of {len(results)} runs")
+
+
+if __name__ == '__main__':
+    main()
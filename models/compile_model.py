@@ -1,11 +1,14 @@
 import os
-import numpy as np
-import cv2
+import sys
 import mediapipe as mp
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, Dropout
 from tensorflow.keras.utils import to_categorical
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.features import process_dataset as extract_dataset
+
 # get mp
 mp_hands = mp.solutions.hands.Hands(
     static_image_mode=True, max_num_hands=1, min_detection_confidence=0.5)
@@ -22,32 +25,8 @@ labels = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N',
 
 
 def process_dataset(dataset_path):
-    X = []
-    y = []
-    for label in labels:
-        label_path = os.path.join(dataset_path, label)
-        for img_name in os.listdir(label_path):
-            img_path = os.path.join(label_path, img_name)
-            img = cv2.imread(img_path)
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-            # mp hd
-            results = mp_hands.process(img_rgb)
-
-            if results.multi_hand_landmarks:
-                hand_landmarks = results.multi_hand_landmarks[0]
-                landmarks = []
-                for lm in hand_landmarks.landmark:
-                    landmarks.append([lm.x, lm.y, lm.z])
-
-                landmarks = np.array(landmarks).flatten()
-
-                X.append(landmarks)
-                y.append(labels.index(label))
-
-    X = np.array(X)
-    y = np.array(y)
-    return X, y
+    # normalized landmarks, same features as served by the app
+    return extract_dataset(dataset_path, labels, mp_hands)
 
 
 # process dataset
@@ -0,0 +1,160 @@
+"""
+Export the trained sign classifier as an int8 quantized artifact for CPU-only serving.
+
+The Keras model is converted by the TensorFlow Lite converter, with activation ranges
+calibrated on landmarks extracted from the training set, to a fully int8 .tflite artifact that
+the 'int8' inference backend runs with the integer kernels of the TFLite interpreter. A report
+compares the accuracy of the quantized model against the float model on the test set, together
+with p50/p99 single-vector latency and resident memory of each runtime.
+
+Usage (from the repository root):
+    python models/quantize_model.py --train models/dataset/train --test models/dataset/test
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import mediapipe as mp
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.features import process_dataset as extract_dataset
+from app.inference import Int8Backend, NumpyBackend, export_int8, load_backend
+
+# labels
+labels = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O',
+          'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z', 'del', 'nothing', 'space']
+
+
+def process_dataset(dataset_path, limit=None):
+    """
+    Extract normalized landmark vectors, as served by handle_image, from a labelled dataset.
+
+    Args:
+        dataset_path (str): Directory with one sub-directory of images per label.
+        limit (int, optional): Maximum number of images read per label.
+
+    Returns:
+        tuple: Landmark vectors of shape (n, 63) and label indices of shape (n,).
+    """
+    mp_hands = mp.solutions.hands.Hands(
+        static_image_mode=True, max_num_hands=1, min_detection_confidence=0.5)
+    try:
+        return extract_dataset(dataset_path, labels, mp_hands, limit)
+    finally:
+        mp_hands.close()
+
+
+def measure_latency(backend, X, runs=1000):
+    """
+    Measure single-vector prediction latency, as seen by one frame in handle_image.
+
+    Args:
+        backend (object): Inference backend exposing predict(x).
+        X (np.ndarray): Inputs cycled through during the measurement.
+        runs (int): Number of timed predictions.
+
+    Returns:
+        tuple: p50 and p99 latency in milliseconds.
+    """
+    for i in range(min(20, len(X))):
+        backend.predict(X[i])
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        backend.predict(X[i % len(X)])
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+
+# Loads app/inference.py on its own, so the measured process holds only NumPy, h5py and the
+# runtime (plus TensorFlow for the Keras backend, and for the int8 backend without tflite_runtime)
+# and not the whole web application.
+MEMORY_PROBE = """
+import importlib.util, resource, sys
+import numpy as np
+spec = importlib.util.spec_from_file_location('inference', sys.argv[1])
+inference = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(inference)
+backend = inference.load_backend(sys.argv[2], sys.argv[3])
+backend.predict(np.zeros(63, dtype=np.float32))
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0)
+"""
+
+
+def measure_memory(name, model_path):
+    """
+    Measure the resident memory of a runtime in an isolated process.
+
+    Args:
+        name (str): Backend name.
+        model_path (str): Artifact loaded by the backend.
+
+    Returns:
+        float: Peak resident memory in MiB.
+    """
+    inference_path = os.path.join(os.path.dirname(__file__), '..', 'app', 'inference.py')
+    output = subprocess.check_output([sys.executable, '-c', MEMORY_PROBE, inference_path, name, model_path])
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='models/final_model/final_model.h5')
+    parser.add_argument('--train', default='models/dataset/train', help='Calibration dataset')
+    parser.add_argument('--test', default='models/dataset/test', help='Evaluation dataset')
+    parser.add_argument('--calibration-images', type=int, default=50, help='Images per label used for calibration')
+    parser.add_argument('--output', default='models/quantized_model/quantized_model.tflite')
+    parser.add_argument('--report', default='models/quantized_model/quantization_report.txt')
+    args = parser.parse_args()
+
+    # calibrate and export
+    X_calibration, _ = process_dataset(args.train, limit=args.calibration_images)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    export_int8(args.model, X_calibration, args.output)
+    print(f"int8 model saved at: {args.output}")
+
+    # accuracy
+    X_test, y_test = process_dataset(args.test)
+    float_backend = NumpyBackend(args.model)
+    int8_backend = Int8Backend(args.output)
+    float_pred = np.argmax(float_backend.predict(X_test), axis=1)
+    int8_pred = np.argmax(int8_backend.predict(X_test), axis=1)
+
+    # latency and memory
+    runtimes = [
+        ('keras float32', 'keras', args.model),
+        ('numpy float32', 'numpy', args.model),
+        ('tflite int8', 'int8', args.output),
+    ]
+    rows = []
+    for title, name, path in runtimes:
+        p50, p99 = measure_latency(load_backend(name, path), X_test)
+        rows.append(f"{title:<16}{p50:>10.3f}{p99:>10.3f}{measure_memory(name, path):>12.1f}")
+
+    report = [
+        "Quantization report",
+        "",
+        f"calibration samples: {len(X_calibration)}",
+        f"test samples:        {len(X_test)}",
+        f"artifact size:       {os.path.getsize(args.model) / 1024:.1f} KiB (.h5) -> "
+        f"{os.path.getsize(args.output) / 1024:.1f} KiB (int8 .tflite)",
+        "",
+        f"float32 accuracy:    {np.mean(float_pred == y_test):.4f}",
+        f"int8 accuracy:       {np.mean(int8_pred == y_test):.4f}",
+        f"top-1 agreement:     {np.mean(float_pred == int8_pred):.4f}",
+        "",
+        f"{'runtime':<16}{'p50 ms':>10}{'p99 ms':>10}{'RSS MiB':>12}",
+        *rows,
+    ]
+    with open(args.report, 'w') as f:
+        f.write('\n'.join(report) + '\n')
+    print('\n'.join(report))
+
+
+if __name__ == '__main__':
+    main()
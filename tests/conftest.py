@@ -0,0 +1,25 @@
+"""
+Test configuration: the test suite runs against a throwaway SQLite database, migrated to the
+latest schema before the first test. Set SLI_DB_BACKEND=mysql to run it against MySQL. Emails
+are kept in memory instead of being sent.
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ.setdefault('SLI_DB_BACKEND', 'sqlite')
+os.environ.setdefault('SLI_SQLITE_PATH', os.path.join(tempfile.mkdtemp(prefix='sli-tests-'), 'sli.db'))
+os.environ.setdefault('SLI_QUOTA_RESET_SCHEDULER', '0')
+os.environ.setdefault('SLI_MAIL_TRANSPORT', 'memory')
+os.environ.setdefault('SLI_MODEL_WARMUP', '0')
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def pytest_sessionstart(session):
+    from app.migrations import migrate
+    from app.plans import plan_catalog
+    migrate()
+    plan_catalog.invalidate()
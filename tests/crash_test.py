@@ -14,6 +14,7 @@ app_dir = os.path.join(current_dir, "..")
 sys.path.insert(0, app_dir)
 
 from app import app, socketio
+from app.quota import QuotaContext, quota_contexts
 
 class FlaskTestCase(unittest.TestCase):
     def setUp(self):
@@ -60,9 +61,9 @@ class FlaskTestCase(unittest.TestCase):
         assert received[0]['name'] == 'prediction', "Unexpected response name"
         assert received[0]['args'][0]['prediction'] == 'No hand detected', "Unexpected prediction response"
 
-    @patch('app.models.get_user_sign_limit')
-    def test_handle_image(self, mock_get_user_sign_limit):
-        mock_get_user_sign_limit.return_value = 100
+    @patch.object(quota_contexts, 'get')
+    def test_handle_image(self, mock_get_quota):
+        mock_get_quota.return_value = QuotaContext('guest', None, 100)
 
         img = np.zeros((224, 224, 3), dtype=np.uint8)
         _, buffer = cv2.imencode('.jpg', img)
@@ -79,12 +80,12 @@ class FlaskTestCase(unittest.TestCase):
                 self.assertIn('prediction', response)
                 self.assertIn(response['prediction'], ['Invalid data', 'No hand detected'])
 
-    @patch('app.models.get_user_sign_limit')
-    def test_handle_image_limit_reached(self, mock_get_user_sign_limit):
-        mock_get_user_sign_limit.return_value = 1
-
-        with self.app.session_transaction() as sess:
-            sess['recognized_count'] = 1
+    @patch.object(quota_contexts, 'get')
+    def test_handle_image_limit_reached(self, mock_get_quota):
+        quota = QuotaContext('guest', None, 1)
+        quota.used = 1
+        quota.exhausted = True  # The limit was reached by an earlier sign
+        mock_get_quota.return_value = quota
 
         img = np.zeros((224, 224, 3), dtype=np.uint8)
         _, buffer = cv2.imencode('.jpg', img)
@@ -0,0 +1,74 @@
+import unittest
+import threading
+import sys
+import os
+import numpy as np
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.batching import InferenceBatcher
+
+
+class TestInferenceBatcher(unittest.TestCase):
+
+    def test_single_vector_prediction(self):
+        """Tests that a single vector gets its own row of the model output."""
+        batcher = InferenceBatcher(lambda batch: batch * 2, max_batch_size=4, max_wait_ms=1)
+        result = batcher.predict(np.arange(63, dtype=np.float32), timeout=5)
+        np.testing.assert_allclose(result, np.arange(63) * 2)
+        batcher.close()
+
+    def test_concurrent_requests_share_a_batch(self):
+        """Tests that vectors submitted from several threads are run in one forward pass."""
+        calls = []
+
+        def predict_fn(batch):
+            calls.append(len(batch))
+            return batch[:, :1]
+
+        batcher = InferenceBatcher(predict_fn, max_batch_size=8, max_wait_ms=200)
+        results = {}
+
+        def worker(i):
+            results[i] = batcher.predict(np.full(63, i, dtype=np.float32), timeout=5)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(calls), 8)
+        self.assertLess(len(calls), 8)  # At least some vectors were batched together
+        for i in range(8):
+            self.assertEqual(results[i][0], i)  # Every caller got its own row back
+        stats = batcher.stats()
+        self.assertEqual(stats['items'], 8)
+        self.assertEqual(stats['batches'], len(calls))
+        batcher.close()
+
+    def test_deadline_flushes_partial_batch(self):
+        """Tests that a partial batch is flushed once the deadline passes."""
+        batcher = InferenceBatcher(lambda batch: batch, max_batch_size=100, max_wait_ms=5)
+        batcher.predict(np.zeros(63), timeout=5)
+        stats = batcher.stats()
+        self.assertEqual(stats['flush_deadline'], 1)
+        self.assertEqual(stats['flush_full'], 0)
+        self.assertGreaterEqual(stats['queue_wait_max_ms'], 0.0)
+        batcher.close()
+
+    def test_model_error_is_propagated(self):
+        """Tests that an exception raised by the model reaches every waiting caller."""
+        def predict_fn(batch):
+            raise ValueError('model failure')
+
+        batcher = InferenceBatcher(predict_fn, max_batch_size=2, max_wait_ms=1)
+        with self.assertRaises(ValueError):
+            batcher.predict(np.zeros(63), timeout=5)
+        self.assertEqual(batcher.stats()['errors'], 1)
+        batcher.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
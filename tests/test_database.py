@@ -0,0 +1,58 @@
+from unittest.mock import MagicMock, patch
+import unittest
+import sys
+import os
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mysql.connector import Error
+
+from app.database import record_purchase, reset_recognized_count
+
+
+class TestRecordPurchase(unittest.TestCase):
+
+    def test_calls_procedure(self):
+        """Tests that a purchase is one call of the purchase_plan procedure."""
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        result = MagicMock()
+        result.fetchone.return_value = ('purchased', 19.99)
+        cursor.stored_results.return_value = iter([result])
+        self.assertEqual(record_purchase(connection, 'alice', 'Standard'), ('purchased', 19.99))
+        cursor.callproc.assert_called_once_with('purchase_plan', ('alice', 'Standard'))
+        cursor.execute.assert_not_called()
+        connection.commit.assert_not_called()  # The procedure commits its own transaction
+        cursor.close.assert_called_once()
+
+    def test_missing_result(self):
+        """Tests that a procedure without a result row raises an Error."""
+        connection = MagicMock()
+        connection.cursor.return_value.stored_results.return_value = iter([])
+        with self.assertRaises(Error):
+            record_purchase(connection, 'alice', 'Standard')
+
+
+class TestResetRecognizedCount(unittest.TestCase):
+
+    def test_chunks(self):
+        """Tests that the reset runs bounded chunks, each committed, until one is not full."""
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        rowcounts = iter([2, 2, 1])
+
+        def execute(query, params):
+            cursor.rowcount = next(rowcounts)
+        cursor.execute.side_effect = execute
+        with patch('app.database.create_connection', return_value=connection), patch('builtins.print'):
+            self.assertEqual(reset_recognized_count(chunk_size=2), 5)
+        self.assertEqual(cursor.execute.call_count, 3)
+        self.assertEqual(connection.commit.call_count, 3)
+        query, params = cursor.execute.call_args[0]
+        self.assertIn('LIMIT %s', query)
+        self.assertEqual(params[2], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
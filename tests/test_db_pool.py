@@ -0,0 +1,112 @@
+import unittest
+import threading
+import sys
+import os
+from mysql.connector.errors import OperationalError, PoolError
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db_pool import ConnectionPool
+
+
+class FakeConnection:
+    """Stand-in for a MySQL connection recording rollbacks and closes."""
+
+    def __init__(self):
+        self.connected = True
+        self.in_transaction = True
+        self.rollbacks = 0
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+    def cursor(self):
+        return 'cursor'
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.created = []
+
+        def connect():
+            connection = FakeConnection()
+            self.created.append(connection)
+            return connection
+
+        self.pool = ConnectionPool(connect, max_size=2, checkout_timeout=0.2, health_check_interval=30.0)
+
+    def test_close_returns_connection_for_reuse(self):
+        """Tests that close() gives the connection back and the next checkout reuses it."""
+        connection = self.pool.checkout()
+        self.assertEqual(connection.cursor(), 'cursor')
+        connection.close()
+        connection.close()
+        self.pool.checkout().close()
+        self.assertEqual(len(self.created), 1)
+        self.assertFalse(self.created[0].closed)
+        self.assertEqual(self.created[0].rollbacks, 1)
+        stats = self.pool.stats()
+        self.assertEqual((stats['checkouts'], stats['created'], stats['in_use'], stats['idle']), (2, 1, 0, 1))
+
+    def test_context_manager(self):
+        """Tests that the context manager returns the connection and discards it on connection errors."""
+        with self.pool.connection():
+            self.assertEqual(self.pool.stats()['in_use'], 1)
+        self.assertEqual(self.pool.stats()['idle'], 1)
+        with self.assertRaises(OperationalError):
+            with self.pool.connection():
+                raise OperationalError("Lost connection")
+        self.assertTrue(self.created[0].closed)
+        self.assertEqual(self.pool.stats()['size'], 0)
+
+    def test_checkout_timeout(self):
+        """Tests that a checkout gives up when every connection stays checked out."""
+        held = [self.pool.checkout(), self.pool.checkout()]
+        with self.assertRaises(PoolError):
+            self.pool.checkout()
+        self.assertEqual(self.pool.stats()['timeouts'], 1)
+        self.assertEqual(self.pool.stats()['utilization'], 1.0)
+        for connection in held:
+            connection.close()
+
+    def test_waiting_checkout_gets_returned_connection(self):
+        """Tests that a waiting checkout is served as soon as a connection is returned."""
+        held = [self.pool.checkout(), self.pool.checkout()]
+        timer = threading.Timer(0.05, held[0].close)
+        timer.start()
+        self.pool.checkout().close()
+        timer.join()
+        held[1].close()
+        self.assertEqual(self.pool.stats()['waits'], 1)
+        self.assertEqual(len(self.created), 2)
+
+    def test_health_check_replaces_dropped_connection(self):
+        """Tests that an idle connection dropped by the server is replaced on checkout."""
+        self.pool.health_check_interval = 0.0
+        self.pool.checkout().close()
+        self.created[0].connected = False
+        connection = self.pool.checkout()
+        self.assertIs(connection._connection, self.created[1])
+        connection.close()
+        stats = self.pool.stats()
+        self.assertEqual((stats['health_checks'], stats['discarded'], stats['size']), (1, 1, 1))
+
+    def test_unclosed_connection_frees_its_place(self):
+        """Tests that a connection dropped without close() does not leak its place in the pool."""
+        self.pool.checkout()
+        self.assertEqual(self.pool.stats()['size'], 0)
+        self.assertTrue(self.created[0].closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import subprocess
+import sys
+import os
+from types import SimpleNamespace
+import numpy as np
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.features import FEATURE_SIZE, extract_batch, extract_features, landmark_array, normalize
+
+
+def hand_result(points):
+    """Build a MediaPipe Hands result holding one hand, or no hand if points is None."""
+    if points is None:
+        return SimpleNamespace(multi_hand_landmarks=None)
+    landmark = [SimpleNamespace(x=x, y=y, z=z) for x, y, z in points]
+    return SimpleNamespace(multi_hand_landmarks=[SimpleNamespace(landmark=landmark)])
+
+
+class TestFeatures(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.points = [rng.random((21, 3)) for _ in range(4)]
+
+    def test_landmark_array_matches_loop(self):
+        """Tests that the landmarks are copied in x, y, z order like the former Python loop."""
+        hand = hand_result(self.points[0]).multi_hand_landmarks[0]
+        expected = np.array([[lm.x, lm.y, lm.z] for lm in hand.landmark]).flatten()
+        out = np.empty(FEATURE_SIZE, dtype=np.float32)
+        array = landmark_array(hand, out)
+        self.assertEqual(array.shape, (21, 3))
+        self.assertTrue(np.shares_memory(array, out))
+        np.testing.assert_allclose(out, expected, rtol=1e-6)
+
+    def test_normalize_matches_serving_formula(self):
+        """Tests the vectorized min-max normalization against the per-vector formula."""
+        batch = np.stack([p.flatten() for p in self.points]).astype(np.float32)
+        expected = [(v - np.min(v)) / (np.max(v) - np.min(v)) for v in batch]
+        np.testing.assert_allclose(normalize(batch.copy()), expected, rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(normalize(batch[0].copy()), expected[0], rtol=1e-5, atol=1e-6)
+
+    def test_normalize_constant_vector(self):
+        """Tests that a constant vector becomes zeros instead of NaN."""
+        np.testing.assert_array_equal(normalize(np.full(FEATURE_SIZE, 0.5, dtype=np.float32)), 0.0)
+
+    def test_extract_features(self):
+        """Tests single-result extraction, with and without a detected hand."""
+        self.assertIsNone(extract_features(hand_result(None)))
+        features = extract_features(hand_result(self.points[0]))
+        self.assertEqual((features.shape, features.dtype), ((FEATURE_SIZE,), np.float32))
+        self.assertAlmostEqual(float(features.min()), 0.0)
+        self.assertAlmostEqual(float(features.max()), 1.0)
+
+    def test_batch_equals_single_extraction(self):
+        """Tests that batch extraction skips results without a hand and matches single extraction."""
+        results = [hand_result(self.points[0]), hand_result(None), hand_result(self.points[1])]
+        X, found = extract_batch(results)
+        self.assertEqual(X.shape, (2, FEATURE_SIZE))
+        self.assertEqual(found.tolist(), [True, False, True])
+        np.testing.assert_array_equal(X[0], extract_features(results[0]))
+        np.testing.assert_array_equal(X[1], extract_features(results[2]))
+
+
+class TestOfflineImport(unittest.TestCase):
+
+    def test_import_without_web_tier(self):
+        """Tests that the training scripts can import the features without building the web application."""
+        code = ("import sys, threading, app.features; "
+                "print(sorted(m for m in sys.modules if m.startswith('app.')), threading.active_count())")
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), ["['app.features']", '1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+from unittest.mock import patch
+import unittest
+import sys
+import os
+import signal
+import threading
+import time
+import multiprocessing
+import cv2
+import numpy as np
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.frame_workers import FrameWorkerPool, FrameTooLarge
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'final_model', 'final_model.h5')
+
+
+def wait_for_workers(pool, count, timeout=30):
+    """Wait until the given number of workers reported ready."""
+    deadline = time.monotonic() + timeout
+    while pool.stats()['ready_workers'] < count and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return pool.stats()['ready_workers'] >= count
+
+
+class TestFrameWorkerPool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = FrameWorkerPool(2, 'numpy', MODEL_PATH, slots_per_worker=2, slot_size=64 * 1024,
+                                   hands_pool_size=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_frame_without_hand(self):
+        """Tests that a frame is processed in a worker process and the result comes back."""
+        img_data = cv2.imencode('.jpg', np.zeros((120, 160, 3), dtype=np.uint8))[1].tobytes()
+        self.assertIsNone(self.pool.submit('session-a', img_data).result(timeout=30))
+        stats = self.pool.stats()
+        self.assertGreaterEqual(stats['completed'], 1)
+        self.assertEqual(stats['errors'], 0)
+
+    def test_workers_report_ready(self):
+        """Tests that every worker reports ready once its model is warmed up."""
+        img_data = cv2.imencode('.jpg', np.zeros((120, 160, 3), dtype=np.uint8))[1].tobytes()
+        self.pool.submit('session-r1', img_data).result(timeout=30)
+        self.assertTrue(self.pool.ready())
+        self.assertTrue(wait_for_workers(self.pool, 2))
+
+    def test_session_affinity(self):
+        """Tests that frames of one session always go to the same worker."""
+        index = self.pool._worker_index('session-b')
+        self.assertEqual(self.pool._worker_index('session-b'), index)
+        self.pool.release('session-b')
+        self.assertNotIn('session-b', self.pool._assignments)
+
+    def test_frame_too_large(self):
+        """Tests that a frame larger than a shared memory slot is rejected."""
+        with self.assertRaises(FrameTooLarge):
+            self.pool.submit('session-c', bytes(64 * 1024 + 1))
+
+
+class TestWorkerExit(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = FrameWorkerPool(2, 'numpy', MODEL_PATH, slots_per_worker=1, slot_size=64 * 1024,
+                                    hands_pool_size=2)
+        self.img_data = cv2.imencode('.jpg', np.zeros((120, 160, 3), dtype=np.uint8))[1].tobytes()
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_exited_worker_is_replaced(self):
+        """Tests that the frames of an exited worker fail, its slots are freed and a new process takes over."""
+        self.assertTrue(wait_for_workers(self.pool, 2))
+        index = self.pool._worker_index('session-x0')
+        pid = self.pool._workers[index]['pid']
+        os.kill(pid, signal.SIGSTOP)  # Keeps the frame in flight until the process is killed
+        with patch('builtins.print'):
+            future = self.pool.submit('session-x0', self.img_data, timeout=1)
+            os.kill(pid, signal.SIGKILL)
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=10)
+        deadline = time.monotonic() + 10
+        while self.pool._workers[index]['pid'] is None and time.monotonic() < deadline:
+            time.sleep(0.05)  # The new process is reported by the supervisor after the exit
+        self.assertNotIn(self.pool._workers[index]['pid'], (pid, None))
+        self.assertEqual(self.pool.stats()['respawns'], 1)
+
+        # The other worker takes the session while the new process warms up, then the pool is whole again
+        self.assertTrue(self.pool.ready())
+        self.assertIsNone(self.pool.submit('session-x0', self.img_data, timeout=1).result(timeout=30))
+        self.assertTrue(wait_for_workers(self.pool, 2))
+        self.assertEqual(self.pool.stats()['alive'], 2)
+
+    def test_workers_forked_by_supervisor(self):
+        """Tests that the workers are not forked from the multi-threaded web process."""
+        self.assertTrue(wait_for_workers(self.pool, 2))
+        self.assertGreater(threading.active_count(), 1)
+        children = {child.pid for child in multiprocessing.active_children()}
+        self.assertEqual(children, {self.pool._supervisor_process.pid})
+        self.assertFalse(children & {worker['pid'] for worker in self.pool._workers})
+
+    def test_ready_with_one_worker(self):
+        """Tests that the pool is ready as soon as one worker is, and sessions go to the ready workers."""
+        self.assertTrue(wait_for_workers(self.pool, 2))
+        with self.pool._lock:
+            for worker in self.pool._workers:
+                worker['ready'] = False
+            self.pool._workers[1]['ready'] = True
+        self.assertTrue(self.pool.ready())
+        self.assertEqual({self.pool._worker_index(f'session-y{i}') for i in range(4)}, {1})
+
+
+if __name__ == '__main__':
+    unittest.main()
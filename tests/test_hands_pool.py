@@ -0,0 +1,96 @@
+import unittest
+import threading
+import time
+import sys
+import os
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.hands_pool import HandsPool
+
+
+class FakeHands:
+    """Stand-in for mp.solutions.hands.Hands that records resets."""
+
+    def __init__(self):
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+
+class TestHandsPool(unittest.TestCase):
+
+    def test_session_keeps_its_tracker(self):
+        """Tests that consecutive frames of one session use the same tracker."""
+        pool = HandsPool(FakeHands, max_size=2)
+        with pool.acquire('a') as first:
+            pass
+        with pool.acquire('a') as second:
+            pass
+        self.assertIs(first, second)
+        stats = pool.stats()
+        self.assertEqual(stats['created'], 1)
+        self.assertEqual(stats['affinity_hits'], 1)
+
+    def test_sessions_get_separate_trackers(self):
+        """Tests that different sessions never share tracking state while the pool has room."""
+        pool = HandsPool(FakeHands, max_size=2)
+        with pool.acquire('a') as tracker_a:
+            pass
+        with pool.acquire('b') as tracker_b:
+            pass
+        self.assertIsNot(tracker_a, tracker_b)
+
+    def test_least_recently_used_idle_tracker_is_evicted(self):
+        """Tests that a full pool reclaims the tracker of the least recently used session."""
+        pool = HandsPool(FakeHands, max_size=2)
+        with pool.acquire('a') as tracker_a:
+            pass
+        with pool.acquire('b'):
+            pass
+        with pool.acquire('a'):
+            pass  # 'b' is now the least recently used session
+        with pool.acquire('c') as tracker_c:
+            pass
+        self.assertIsNot(tracker_c, tracker_a)
+        self.assertEqual(tracker_c.resets, 1)  # Tracking state of 'b' was dropped
+        self.assertEqual(pool.stats()['evictions'], 1)
+        self.assertEqual(pool.stats()['size'], 2)
+
+    def test_release_returns_tracker_to_pool(self):
+        """Tests that a released session frees its tracker for the next session."""
+        pool = HandsPool(FakeHands, max_size=1)
+        with pool.acquire('a') as tracker_a:
+            pass
+        pool.release('a')
+        with pool.acquire('b') as tracker_b:
+            pass
+        self.assertIs(tracker_a, tracker_b)
+        self.assertEqual(pool.stats()['evictions'], 0)
+
+    def test_checkout_times_out_when_all_trackers_busy(self):
+        """Tests that a checkout gives up when every tracker stays busy."""
+        pool = HandsPool(FakeHands, max_size=1, checkout_timeout=0.05)
+        pool.checkout('a')
+        with self.assertRaises(TimeoutError):
+            pool.checkout('b')
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_waiting_checkout_gets_tracker_after_checkin(self):
+        """Tests that a waiting session gets a tracker once a busy one is checked in."""
+        pool = HandsPool(FakeHands, max_size=1, checkout_timeout=5)
+        pool.checkout('a')
+        result = {}
+        thread = threading.Thread(target=lambda: result.setdefault('tracker', pool.checkout('b')))
+        thread.start()
+        time.sleep(0.05)
+        pool.checkin('a')
+        thread.join(5)
+        self.assertIn('tracker', result)
+        self.assertEqual(pool.stats()['waits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
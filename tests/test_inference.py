@@ -0,0 +1,137 @@
+import unittest
+import importlib.util
+import tempfile
+import sys
+import os
+import numpy as np
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import patch
+
+from app.inference import NumpyBackend, export_int8, load_backend, load_dense_layers
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'final_model', 'final_model.h5')
+
+
+class TestNumpyBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = NumpyBackend(MODEL_PATH)
+        self.batch = np.random.default_rng(0).random((16, 63), dtype=np.float32)
+
+    def test_layers_match_model_architecture(self):
+        """Tests that the Dense 128 -> Dense 64 -> Dense 29 layers are read from the .h5 file."""
+        layers = load_dense_layers(MODEL_PATH)
+        self.assertEqual([kernel.shape for kernel, _, _ in layers], [(63, 128), (128, 64), (64, 29)])
+        self.assertEqual([activation for _, _, activation in layers], ['relu', 'relu', 'softmax'])
+
+    def test_single_vector_and_batch(self):
+        """Tests that a single vector and a batch give consistent outputs."""
+        single = self.backend.predict(self.batch[0])
+        batched = self.backend.predict(self.batch)
+        self.assertEqual(single.shape, (29,))
+        self.assertEqual(batched.shape, (16, 29))
+        np.testing.assert_allclose(single, batched[0], rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(batched.sum(axis=1), np.ones(16), rtol=1e-5)
+
+    def test_matches_reference_forward_pass(self):
+        """Tests the NumPy backend against a straightforward float64 forward pass."""
+        x = self.batch.astype(np.float64)
+        for kernel, bias, activation in load_dense_layers(MODEL_PATH):
+            x = x @ kernel + bias
+            if activation == 'relu':
+                x = np.maximum(x, 0)
+            else:
+                x = np.exp(x - x.max(axis=1, keepdims=True))
+                x /= x.sum(axis=1, keepdims=True)
+        np.testing.assert_allclose(self.backend.predict(self.batch), x, rtol=1e-4, atol=1e-6)
+
+    @unittest.skipUnless(importlib.util.find_spec('tensorflow'), 'TensorFlow is not installed')
+    def test_matches_keras_outputs(self):
+        """Tests that the NumPy backend matches the Keras model within tolerance."""
+        keras_backend = load_backend('keras', MODEL_PATH)
+        np.testing.assert_allclose(
+            self.backend.predict(self.batch), keras_backend.predict(self.batch), rtol=1e-4, atol=1e-5)
+
+    def test_unknown_backend(self):
+        """Tests that an unknown backend name is rejected."""
+        with self.assertRaises(ValueError):
+            load_backend('onnx', MODEL_PATH)
+
+
+class FakeInterpreter:
+    """TFLite interpreter doubling its input, recording how it was sized."""
+
+    instances = []
+
+    def __init__(self, model_content):
+        self.model_content = model_content
+        self.shape = None
+        self.invocations = 0
+        FakeInterpreter.instances.append(self)
+
+    def get_input_details(self):
+        return [{'index': 0, 'shape': np.array([1, 63])}]
+
+    def get_output_details(self):
+        return [{'index': 1}]
+
+    def resize_tensor_input(self, index, shape):
+        self.shape = list(shape)
+
+    def allocate_tensors(self):
+        pass
+
+    def set_tensor(self, index, value):
+        assert list(value.shape) == self.shape
+        self.value = value
+
+    def invoke(self):
+        self.invocations += 1
+
+    def get_tensor(self, index):
+        return self.value * 2
+
+
+class TestInt8Backend(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.calibration = rng.random((256, 63), dtype=np.float32)
+        self.batch = rng.random((64, 63), dtype=np.float32)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'quantized_model.tflite')
+
+    def test_one_interpreter_per_batch_size(self):
+        """Tests that an interpreter is sized once per batch size and reused."""
+        with open(self.path, 'wb') as f:
+            f.write(b'model')
+        FakeInterpreter.instances = []
+        with patch('app.inference._tflite_interpreter', return_value=FakeInterpreter):
+            backend = load_backend('int8', self.path)
+        np.testing.assert_array_equal(backend.predict(self.batch[0]), self.batch[0] * 2)
+        backend.predict(self.batch[:8])
+        backend.predict(self.batch[8:16])
+        self.assertEqual([interpreter.shape for interpreter in FakeInterpreter.instances], [[1, 63], [8, 63]])
+        self.assertEqual([interpreter.invocations for interpreter in FakeInterpreter.instances], [1, 2])
+        self.assertEqual({interpreter.model_content for interpreter in FakeInterpreter.instances}, {b'model'})
+
+    @unittest.skipUnless(importlib.util.find_spec('tensorflow'), 'TensorFlow is not installed')
+    def test_close_to_float_model(self):
+        """Tests that the exported int8 model is smaller and stays close to the float model."""
+        export_int8(MODEL_PATH, self.calibration, self.path)
+        self.assertLess(os.path.getsize(self.path), os.path.getsize(MODEL_PATH))
+        float_outputs = NumpyBackend(MODEL_PATH).predict(self.batch)
+        backend = load_backend('int8', self.path)
+        int8_outputs = backend.predict(self.batch)
+        self.assertLess(np.abs(float_outputs - int8_outputs).mean(), 0.01)
+        agreement = np.mean(np.argmax(float_outputs, axis=1) == np.argmax(int8_outputs, axis=1))
+        self.assertGreaterEqual(agreement, 0.95)
+        np.testing.assert_allclose(backend.predict(self.batch[0]), int8_outputs[0], atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+from unittest.mock import patch
+import unittest
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import cv2
+import numpy as np
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.inference_client import InferenceClient, parse_address, service_authkey
+from app.inference_service import InferenceService, main
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'final_model', 'final_model.h5')
+AUTHKEY = b'test-key'
+
+
+def start_service(address):
+    """Warm up a service and serve it in a background thread."""
+    service = InferenceService('numpy', MODEL_PATH, hands_pool_size=2)
+    service.runtime.warm_up()
+    with patch('builtins.print'):
+        threading.Thread(target=service.serve, args=(address, AUTHKEY), daemon=True).start()
+        for _ in range(100):
+            if os.path.exists(address):
+                break
+            time.sleep(0.01)
+    return service
+
+
+class TestInferenceService(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='sli-inference-')
+        self.address = os.path.join(self.directory, 'inference.sock')
+        self.service = start_service(self.address)
+        self.client = InferenceClient(self.address, AUTHKEY, max_connections=2, timeout=30)
+        self.frame = cv2.imencode('.jpg', np.zeros((120, 160, 3), dtype=np.uint8))[1].tobytes()
+
+    def tearDown(self):
+        self.client.close()
+        self.service.close()
+        shutil.rmtree(self.directory)
+
+    def test_frame_without_hand(self):
+        """Tests that a frame is recognized by the service and the result comes back."""
+        self.assertTrue(self.client.ready())
+        self.assertIsNone(self.client.submit('session-a', self.frame).result(timeout=0))
+        stats = self.client.stats()
+        self.assertEqual((stats['frames'], stats['errors'], stats['connects']), (1, 0, 1))
+        self.assertEqual(stats['service']['frames'], 1)
+        self.assertTrue(stats['service']['runtime']['ready'])
+
+    def test_release(self):
+        """Tests that releasing a session gives its tracker back to the pool of the service."""
+        self.client.submit('session-b', self.frame)
+        self.assertEqual(self.service.hands_pool.stats()['assigned'], 1)
+        self.client.release('session-b')
+        self.assertEqual(self.service.hands_pool.stats()['assigned'], 0)
+
+    def test_reconnect_after_restart(self):
+        """Tests that the client replaces pooled connections after the service restarted."""
+        self.client.submit('session-c', self.frame)
+        self.service.close()
+        with patch('builtins.print'):
+            with self.assertRaises(ConnectionError):
+                self.client.submit('session-c', self.frame)
+        self.service = start_service(self.address)
+        self.assertIsNone(self.client.submit('session-c', self.frame).result(timeout=0))
+        self.assertEqual(self.client.stats()['reconnects'], 1)
+
+    def test_wrong_key(self):
+        """Tests that a client with another key is refused and the service keeps serving."""
+        intruder = InferenceClient(self.address, b'wrong-key', timeout=5)
+        with self.assertRaises(ConnectionError):
+            intruder.submit('session-d', self.frame)
+        self.assertTrue(self.client.ready())
+
+    def test_unknown_request(self):
+        """Tests that an unknown request is answered with an error."""
+        self.assertEqual(self.service.handle(('train',))[0], 'error')
+
+    def test_import_without_web_tier(self):
+        """Tests that the service process does not build the web application, its database or a client."""
+        code = ("import sys, threading, app.inference_service; "
+                "print(sorted(m for m in ('app.server', 'app.models', 'app.database') if m in sys.modules), "
+                "threading.active_count())")
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        env = dict(os.environ, SLI_INFERENCE_SERVICE='127.0.0.1:6000')
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, env=env, capture_output=True, text=True,
+                                timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), ['[]', '1'])
+
+
+class TestParseAddress(unittest.TestCase):
+
+    def test_addresses(self):
+        """Tests TCP and Unix socket addresses."""
+        self.assertEqual(parse_address('127.0.0.1:6000'), ('127.0.0.1', 6000))
+        self.assertEqual(parse_address(':6000'), ('127.0.0.1', 6000))
+        self.assertEqual(parse_address('/run/sli/inference.sock'), '/run/sli/inference.sock')
+
+
+class TestAuthkey(unittest.TestCase):
+
+    def test_no_default_key(self):
+        """Tests that a key must be configured."""
+        self.assertEqual(service_authkey('secret'), b'secret')
+        with self.assertRaises(ValueError):
+            service_authkey('')
+
+    @patch('builtins.print')
+    @patch('app.inference_service.InferenceService')
+    def test_service_refuses_to_start_without_key(self, mock_service, mock_print):
+        """Tests that the service neither loads the model nor listens without a key."""
+        with patch('app.config.INFERENCE_SERVICE_AUTHKEY', ''):
+            with self.assertRaises(SystemExit):
+                main(['--address', '0.0.0.0:6000'])
+        mock_service.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
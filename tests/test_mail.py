@@ -0,0 +1,137 @@
+from unittest.mock import MagicMock, patch
+import unittest
+import sys
+import os
+import smtplib
+import threading
+from email.mime.text import MIMEText
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.mail import MailOutbox, MemoryTransport, SMTPTransport
+
+
+def make_message(to_email='user@example.com'):
+    message = MIMEText('body')
+    message['From'] = 'sender@example.com'
+    message['To'] = to_email
+    message['Subject'] = 'Subject'
+    return message
+
+
+class FlakyTransport(MemoryTransport):
+    """Fails the first deliveries, then keeps the messages."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.attempts = 0
+
+    def send(self, message):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        super().send(message)
+
+
+class TestMailOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.print_patch = patch('builtins.print')
+        self.print_patch.start()
+
+    def tearDown(self):
+        self.print_patch.stop()
+
+    def test_delivers_in_background(self):
+        """Tests that queued messages are delivered by the background thread."""
+        transport = MemoryTransport()
+        outbox = MailOutbox(transport)
+        self.assertTrue(outbox.send(make_message('a@example.com')))
+        self.assertTrue(outbox.send(make_message('b@example.com')))
+        self.assertTrue(outbox.flush(timeout=5))
+        self.assertEqual([message['To'] for message in transport.messages], ['a@example.com', 'b@example.com'])
+        stats = outbox.stats()
+        self.assertEqual((stats['queued'], stats['sent'], stats['pending']), (2, 2, 0))
+        outbox.close()
+
+    def test_retry_with_backoff(self):
+        """Tests that a failed delivery is retried after the backoff."""
+        transport = FlakyTransport(failures=2)
+        outbox = MailOutbox(transport, max_attempts=3, backoff=0.01)
+        outbox.send(make_message())
+        self.assertTrue(outbox.flush(timeout=5))
+        self.assertEqual(len(transport.messages), 1)
+        self.assertEqual(outbox.stats()['retries'], 2)
+        outbox.close()
+
+    def test_dropped_after_max_attempts(self):
+        """Tests that a message is dropped when every attempt failed."""
+        transport = FlakyTransport(failures=10)
+        outbox = MailOutbox(transport, max_attempts=2, backoff=0.01)
+        outbox.send(make_message())
+        self.assertTrue(outbox.flush(timeout=5))
+        self.assertEqual((transport.attempts, outbox.stats()['failed']), (2, 1))
+        outbox.close()
+
+    def test_full_outbox_refuses(self):
+        """Tests that messages beyond the queue size are refused."""
+        release = threading.Event()
+        transport = MemoryTransport()
+        transport.send = lambda message: release.wait()
+        outbox = MailOutbox(transport, max_size=1)
+        outbox.send(make_message())  # Taken by the worker, which blocks
+        while outbox._queue:
+            threading.Event().wait(0.01)
+        self.assertTrue(outbox.send(make_message()))
+        self.assertFalse(outbox.send(make_message()))
+        self.assertEqual(outbox.stats()['refused'], 1)
+        release.set()
+        outbox.close()
+
+    def test_close_sends_pending(self):
+        """Tests that closing the outbox attempts messages waiting for their backoff."""
+        transport = FlakyTransport(failures=1)
+        outbox = MailOutbox(transport, backoff=60.0)
+        outbox.send(make_message())
+        while not outbox.stats()['retries']:
+            threading.Event().wait(0.01)
+        outbox.close()
+        self.assertEqual(len(transport.messages), 1)
+        self.assertFalse(outbox.send(make_message()))
+
+
+class TestSMTPTransport(unittest.TestCase):
+
+    @patch('app.mail.smtplib.SMTP')
+    def test_connection_reused(self, mock_smtp):
+        """Tests that one connection, with one STARTTLS and login, carries several messages."""
+        transport = SMTPTransport('smtp.example.com', 587, 'user', 'secret')
+        for _ in range(3):
+            transport.send(make_message())
+        mock_smtp.assert_called_once_with('smtp.example.com', 587, timeout=10.0)
+        connection = mock_smtp.return_value
+        connection.starttls.assert_called_once()
+        connection.login.assert_called_once_with('user', 'secret')
+        self.assertEqual(connection.send_message.call_count, 3)
+        transport.close()
+        connection.quit.assert_called_once()
+
+    @patch('app.mail.smtplib.SMTP')
+    def test_reconnects_when_dropped(self, mock_smtp):
+        """Tests that a connection closed by the server is opened again."""
+        stale, fresh = MagicMock(), MagicMock()
+        stale.send_message.side_effect = [None, smtplib.SMTPServerDisconnected()]
+        mock_smtp.side_effect = [stale, fresh]
+        transport = SMTPTransport('localhost', 1025, starttls=False)
+        transport.send(make_message())
+        transport.send(make_message())
+        fresh.send_message.assert_called_once()
+        fresh.starttls.assert_not_called()
+        fresh.login.assert_not_called()
+        self.assertEqual(transport.connects, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
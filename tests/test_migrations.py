@@ -0,0 +1,108 @@
+from unittest.mock import MagicMock, patch
+import unittest
+import sys
+import os
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.migrations import LATEST_VERSION, MIGRATIONS, Migration, add_index, check_schema, migrate
+
+
+@patch('app.config.DB_BACKEND', 'mysql')
+class TestMigrate(unittest.TestCase):
+
+    def run_migrate(self, version, migrations, target=None):
+        """Run migrate against a mocked database at the given schema version."""
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.fetchone.side_effect = lambda: (version,) if 'MAX(version)' in cursor.execute.call_args[0][0] else (1,)
+        with patch('app.migrations.create_database', return_value=True), \
+                patch('app.migrations.create_connection', return_value=connection), \
+                patch('app.migrations.MIGRATIONS', migrations), \
+                patch('builtins.print'):
+            result = migrate(target)
+        statements = [call[0][0] for call in cursor.execute.call_args_list]
+        return result, statements, connection
+
+    def test_applies_pending_in_order(self):
+        """Tests that only migrations above the current version run, each recorded and committed."""
+        migrations = [Migration(1, 'one', ['SQL 1']), Migration(2, 'two', ['SQL 2']), Migration(3, 'three', ['SQL 3'])]
+        result, statements, connection = self.run_migrate(1, migrations)
+        self.assertEqual(result, 3)
+        self.assertNotIn('SQL 1', statements)
+        self.assertLess(statements.index('SQL 2'), statements.index('SQL 3'))
+        self.assertEqual(sum('INSERT INTO schema_version' in s for s in statements), 2)
+        self.assertEqual(connection.commit.call_count, 2)
+        self.assertIn('RELEASE_LOCK', statements[-1])
+
+    def test_target_version(self):
+        """Tests that migrations above the target are left pending."""
+        migrations = [Migration(1, 'one', ['SQL 1']), Migration(2, 'two', ['SQL 2'])]
+        result, statements, _ = self.run_migrate(0, migrations, target=1)
+        self.assertEqual(result, 1)
+        self.assertNotIn('SQL 2', statements)
+
+    def test_up_to_date(self):
+        """Tests that an up-to-date schema runs no migration."""
+        result, statements, connection = self.run_migrate(LATEST_VERSION, MIGRATIONS)
+        self.assertEqual(result, LATEST_VERSION)
+        self.assertFalse(any('CREATE INDEX' in s for s in statements))
+        connection.commit.assert_not_called()
+
+    def test_database_unavailable(self):
+        """Tests that migrate reports an unreachable server."""
+        with patch('app.migrations.create_database', return_value=False), patch('builtins.print'):
+            self.assertIsNone(migrate())
+
+
+@patch('app.config.DB_BACKEND', 'mysql')
+class TestAddIndex(unittest.TestCase):
+
+    def test_created_once(self):
+        """Tests that an index is only created when it does not exist."""
+        cursor = MagicMock()
+        step = add_index('users', 'idx_users_reset_token', 'reset_token')
+        cursor.fetchone.return_value = (1,)
+        step(cursor)
+        self.assertEqual(cursor.execute.call_count, 1)
+        cursor.fetchone.return_value = (0,)
+        step(cursor)
+        cursor.execute.assert_called_with("CREATE INDEX idx_users_reset_token ON users (reset_token)")
+
+    def test_hot_lookups_indexed(self):
+        """Tests that the migrations index the reset token and the plan lookups."""
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (0,)
+        for migration in MIGRATIONS:
+            migration.apply(cursor)
+        created = [call[0][0] for call in cursor.execute.call_args_list if 'CREATE INDEX' in call[0][0]]
+        self.assertTrue(any('(reset_token)' in statement for statement in created))
+        self.assertTrue(any('(plan_name' in statement for statement in created))
+
+
+@patch('app.config.DB_BACKEND', 'mysql')
+class TestCheckSchema(unittest.TestCase):
+
+    def check(self, has_table, version):
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.fetchone.side_effect = [(int(has_table),), (version,)]
+        with patch('app.migrations.create_connection', return_value=connection), patch('builtins.print'):
+            return check_schema(), cursor
+
+    def test_read_only(self):
+        """Tests that checking the schema never runs DDL."""
+        ok, cursor = self.check(True, LATEST_VERSION)
+        self.assertTrue(ok)
+        for call in cursor.execute.call_args_list:
+            self.assertTrue(call[0][0].lstrip().startswith('SELECT'))
+
+    def test_outdated_or_missing(self):
+        """Tests that a missing or older schema is reported."""
+        self.assertFalse(self.check(False, 0)[0])
+        self.assertFalse(self.check(True, LATEST_VERSION - 1)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
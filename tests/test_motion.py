@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+import cv2
+import numpy as np
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.motion import MotionGate, frame_signature
+
+
+def encode(img):
+    """Encode a BGR image as JPEG bytes, like the client does."""
+    return cv2.imencode('.jpg', img)[1].tobytes()
+
+
+class TestMotionGate(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+        self.frame = cv2.GaussianBlur(self.frame, (31, 31), 0)
+        self.moved = np.roll(self.frame, 120, axis=1)
+        self.moved[100:300, 200:400] = 255
+
+    def test_signature(self):
+        """Tests that the signature is a small grayscale image and that bad data gives None."""
+        self.assertEqual(frame_signature(encode(self.frame)).shape, (24, 32))
+        self.assertIsNone(frame_signature(b'not an image'))
+
+    def test_unchanged_frame_reuses_prediction(self):
+        """Tests that a repeated frame skips the pipeline and returns the cached prediction."""
+        gate = MotionGate(threshold=4.0)
+        skip, _, signature = gate.lookup('sid', encode(self.frame))
+        self.assertFalse(skip)
+        gate.store('sid', signature, 'A')
+        self.assertEqual(gate.lookup('sid', encode(self.frame))[:2], (True, 'A'))
+        self.assertFalse(gate.lookup('sid', encode(self.moved))[0])
+        self.assertFalse(gate.lookup('other', encode(self.frame))[0])
+        stats = gate.stats()
+        self.assertEqual((stats['frames'], stats['skipped']), (4, 1))
+        self.assertAlmostEqual(stats['skip_ratio'], 0.25)
+
+    def test_max_skips_forces_refresh(self):
+        """Tests that a still frame is processed again after the maximum number of skips."""
+        gate = MotionGate(threshold=4.0, max_skips=2)
+        img_data = encode(self.frame)
+        gate.store('sid', gate.lookup('sid', img_data)[2], None)
+        self.assertEqual([gate.lookup('sid', img_data)[0] for _ in range(3)], [True, True, False])
+        self.assertEqual(gate.stats()['refreshes'], 1)
+
+    def test_disabled_and_release(self):
+        """Tests that a zero threshold never skips and that released sessions are forgotten."""
+        img_data = encode(self.frame)
+        disabled = MotionGate(threshold=0)
+        disabled.store('sid', frame_signature(img_data), 'A')
+        self.assertFalse(disabled.lookup('sid', img_data)[0])
+
+        gate = MotionGate(threshold=4.0)
+        gate.store('sid', frame_signature(img_data), 'A')
+        gate.release('sid')
+        self.assertFalse(gate.lookup('sid', img_data)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+from unittest.mock import patch
+import unittest
+import sys
+import os
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from app import app
+from app.page_cache import PageCache, page_cache
+from app.plans import plan_catalog
+
+PLANS = [
+    {'plan_id': 1, 'plan_name': 'Basic', 'daily_limit': 25, 'price': 0.0},
+    {'plan_id': 2, 'plan_name': 'Standard', 'daily_limit': 250, 'price': 19.99},
+]
+
+
+class TestPageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.renders = 0
+        self.variant = 'guest'
+        self.version = 'v1'
+        self.cache = PageCache(ttl=300.0, max_entries=2)
+        self.app = Flask(__name__)
+
+        def page():
+            self.renders += 1
+            return f'{self.variant} {self.version}'
+
+        def missing():
+            return 'Not found', 404
+
+        self.app.add_url_rule('/page', view_func=self.cache.cached(
+            page, vary=lambda: self.variant, version=lambda: self.version))
+        self.app.add_url_rule('/missing', view_func=self.cache.cached(missing))
+        self.client = self.app.test_client()
+
+    def test_rendered_once_per_variant(self):
+        """Tests that a page is rendered once per variant and then served from the cache."""
+        self.assertEqual(self.client.get('/page').data, b'guest v1')
+        self.assertEqual(self.client.get('/page').data, b'guest v1')
+        self.variant = 'member'
+        self.assertEqual(self.client.get('/page').data, b'member v1')
+        self.assertEqual(self.renders, 2)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 2, 2))
+
+    def test_conditional_requests(self):
+        """Tests that a matching If-None-Match or If-Modified-Since is answered with an empty 304."""
+        response = self.client.get('/page')
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+        self.assertIn('Cookie', response.headers['Vary'])
+        etag = response.headers['ETag']
+        revalidated = self.client.get('/page', headers={'If-None-Match': etag})
+        self.assertEqual((revalidated.status_code, revalidated.data), (304, b''))
+        revalidated = self.client.get('/page', headers={'If-Modified-Since': response.headers['Last-Modified']})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(self.client.get('/page', headers={'If-None-Match': '"other"'}).status_code, 200)
+        self.assertEqual(self.cache.stats()['not_modified'], 2)
+        self.assertEqual(self.renders, 1)
+
+    def test_version_change_renders_again(self):
+        """Tests that a new version renders the page again with new validators."""
+        first = self.client.get('/page')
+        self.version = 'v2'
+        second = self.client.get('/page', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual((second.status_code, second.data), (200, b'guest v2'))
+        self.assertNotEqual(second.headers['ETag'], first.headers['ETag'])
+        self.assertGreater(second.last_modified, first.last_modified)
+
+    def test_unknown_version_and_errors_are_not_cached(self):
+        """Tests that pages without a version and failed responses are not cached."""
+        self.version = None
+        self.client.get('/page')
+        self.client.get('/page')
+        self.assertEqual(self.renders, 2)
+        self.assertNotIn('ETag', self.client.get('/page').headers)
+        self.assertEqual(self.client.get('/missing').status_code, 404)
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_ttl_and_invalidation(self):
+        """Tests that an expired or invalidated page is rendered again and keeps its ETag if unchanged."""
+        etag = self.client.get('/page').headers['ETag']
+        self.cache.invalidate()
+        self.assertEqual(self.client.get('/page').headers['ETag'], etag)
+        self.cache.ttl = 0.0
+        self.client.get('/page')
+        self.assertEqual(self.renders, 3)
+
+
+class TestPageRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        patcher = patch.object(plan_catalog, 'connect')
+        self.connect = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.connect.return_value.cursor.return_value.fetchall.return_value = PLANS
+        self.addCleanup(plan_catalog.invalidate)
+        self.addCleanup(page_cache.invalidate)
+        plan_catalog.invalidate()
+        page_cache.invalidate()
+
+    def test_pricing_cached_per_login_state(self):
+        """Tests that the pricing page is rendered once per logged-in state."""
+        with patch('app.routes.render_template', return_value='pricing') as render_template:
+            etag = self.client.get('/pricing').headers['ETag']
+            self.assertEqual(self.client.get('/pricing', headers={'If-None-Match': etag}).status_code, 304)
+            with self.client.session_transaction() as sess:
+                sess['username'] = 'test_user'
+            self.client.get('/pricing')
+            self.client.get('/pricing')
+        self.assertEqual(render_template.call_count, 2)
+        self.assertEqual([call.kwargs['logged_in'] for call in render_template.call_args_list], [False, True])
+
+    def test_pricing_follows_plan_changes(self):
+        """Tests that a plan change reaches the cached pricing page."""
+        first = self.client.get('/pricing')
+        self.assertIn(b'19', first.data)
+        self.connect.return_value.cursor.return_value.fetchall.return_value = [
+            dict(PLANS[0]), dict(PLANS[1], price=24.99)]
+        plan_catalog.invalidate()
+        second = self.client.get('/pricing', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(second.status_code, 200)
+        self.assertIn(b'24', second.data)
+
+    def test_pricing_without_plans(self):
+        """Tests that the pricing page is not cached while the plans cannot be loaded."""
+        self.connect.return_value = None
+        plan_catalog.invalidate()
+        self.assertEqual(self.client.get('/pricing').status_code, 500)
+        self.assertEqual(page_cache.stats()['entries'], 0)
+
+    def test_home_and_interpreter(self):
+        """Tests that the home and interpreter pages are served with validators."""
+        for path in ('/', '/sli'):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200)
+            revalidated = self.client.get(path, headers={'If-None-Match': response.headers['ETag']})
+            self.assertEqual(revalidated.status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import threading
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import bcrypt
+
+from app.passwords import HasherBusy, PasswordHasher
+
+
+class TestPasswordHasher(unittest.TestCase):
+
+    def setUp(self):
+        self.hasher = PasswordHasher(rounds=4, workers=1, max_queue=1, timeout=5.0)
+
+    def tearDown(self):
+        self.hasher.close()
+
+    def test_hash_and_verify(self):
+        """Tests that a hash made with the configured cost verifies its password only."""
+        hashed = self.hasher.hash('correct horse')
+        self.assertTrue(hashed.startswith('$2b$04$'))
+        self.assertTrue(self.hasher.verify('correct horse', hashed))
+        self.assertFalse(self.hasher.verify('wrong horse', hashed))
+        self.assertFalse(self.hasher.verify('correct horse', 'not a bcrypt hash'))
+        stats = self.hasher.stats()
+        self.assertEqual((stats['hashes'], stats['checks'], stats['in_flight']), (1, 3, 0))
+
+    def test_needs_rehash(self):
+        """Tests that hashes of another cost factor are flagged for rehashing."""
+        self.assertFalse(self.hasher.needs_rehash(self.hasher.hash('password')))
+        old_hash = bcrypt.hashpw(b'password', bcrypt.gensalt(5)).decode('utf-8')
+        self.assertTrue(self.hasher.needs_rehash(old_hash))
+        self.assertTrue(self.hasher.verify('password', old_hash))
+        self.assertTrue(self.hasher.needs_rehash('garbage'))
+
+    def test_busy_when_saturated(self):
+        """Tests that calls beyond the workers and the queue are refused."""
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocked(*args):
+            started.set()
+            release.wait()
+            return True
+
+        results = []
+        callers = [threading.Thread(target=lambda: results.append(self.hasher._call('checks', blocked)))
+                   for _ in range(2)]
+        for caller in callers:
+            caller.start()
+        started.wait(1.0)
+        while self.hasher.stats()['in_flight'] < 2:
+            threading.Event().wait(0.01)
+        with self.assertRaises(HasherBusy):
+            self.hasher.verify('password', 'hash')
+        release.set()
+        for caller in callers:
+            caller.join()
+        self.assertEqual(results, [True, True])
+        self.assertEqual(self.hasher.stats()['busy'], 1)
+        self.assertTrue(self.hasher.verify('password', self.hasher.hash('password')))
+
+    def test_timeout(self):
+        """Tests that a caller gives up after the timeout and the slot is freed later."""
+        hasher = PasswordHasher(rounds=4, workers=1, max_queue=0, timeout=0.05)
+        release = threading.Event()
+        try:
+            with self.assertRaises(HasherBusy):
+                hasher._call('checks', lambda: release.wait())
+            release.set()
+            while hasher.stats()['in_flight']:
+                threading.Event().wait(0.01)
+            self.assertTrue(hasher.verify('password', hasher.hash('password')))
+            self.assertEqual(hasher.stats()['timeouts'], 1)
+        finally:
+            release.set()
+            hasher.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
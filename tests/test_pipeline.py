@@ -0,0 +1,174 @@
+import unittest
+import base64
+import sys
+import os
+from types import SimpleNamespace
+import cv2
+import numpy as np
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.pipeline import HandTracker, decode_frame, frame_data, jpeg_size, labels, recognize_frame
+
+
+def encode(img):
+    """Encode a BGR image as JPEG bytes, like the client does."""
+    return cv2.imencode('.jpg', img)[1].tobytes()
+
+
+class FakeHands:
+    """Stand-in for mp.solutions.hands.Hands returning fixed landmarks."""
+
+    def __init__(self, points=None):
+        self.points = points
+        self.frames = []
+        self.resets = []
+
+    def reset(self):
+        self.resets.append(len(self.frames))
+
+    def process(self, img):
+        self.frames.append(img)
+        if self.points is None:
+            return SimpleNamespace(multi_hand_landmarks=None)
+        landmark = [SimpleNamespace(x=x, y=y, z=z) for x, y, z in self.points]
+        return SimpleNamespace(multi_hand_landmarks=[SimpleNamespace(landmark=landmark)])
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_decode_frame_returns_rgb(self):
+        """Tests that a JPEG frame is decoded into an RGB image."""
+        img = np.zeros((48, 64, 3), dtype=np.uint8)
+        img[:, :, 2] = 255  # Red in BGR order
+        decoded = decode_frame(encode(img))
+        self.assertEqual(decoded.shape, (48, 64, 3))
+        self.assertGreater(decoded[0, 0, 0], 200)  # Red is the first channel after conversion
+
+    def test_frame_data_binary_attachment(self):
+        """Tests that a binary attachment is passed through without a copy."""
+        img_data = encode(np.zeros((8, 8, 3), dtype=np.uint8))
+        self.assertIs(frame_data(img_data), img_data)
+
+    def test_frame_data_base64_string(self):
+        """Tests that base64 frames from older clients are still accepted."""
+        img_data = encode(np.zeros((8, 8, 3), dtype=np.uint8))
+        self.assertEqual(frame_data(base64.b64encode(img_data).decode('utf-8')), img_data)
+
+    def test_jpeg_size(self):
+        """Tests that the frame size is read from the JPEG header."""
+        self.assertEqual(jpeg_size(encode(np.zeros((480, 640, 3), dtype=np.uint8))), (640, 480))
+        self.assertIsNone(jpeg_size(cv2.imencode('.png', np.zeros((8, 8, 3), dtype=np.uint8))[1].tobytes()))
+
+    def test_reduced_decode(self):
+        """Tests that a reduced-scale decode keeps the long edge at or above the target."""
+        img_data = encode(np.zeros((720, 1280, 3), dtype=np.uint8))
+        self.assertEqual(decode_frame(img_data, 'reduced', 320).shape, (180, 320, 3))
+        self.assertEqual(decode_frame(img_data, 'reduced', 400).shape, (360, 640, 3))
+        self.assertEqual(decode_frame(img_data, 'full', 320).shape, (720, 1280, 3))
+
+    def test_resize_decode(self):
+        """Tests that the resize mode scales large frames down and leaves small ones alone."""
+        self.assertEqual(decode_frame(encode(np.zeros((480, 640, 3), dtype=np.uint8)), 'resize', 320).shape, (240, 320, 3))
+        self.assertEqual(decode_frame(encode(np.zeros((48, 64, 3), dtype=np.uint8)), 'resize', 320).shape, (48, 64, 3))
+
+    def test_decode_frame_invalid_data(self):
+        """Tests that undecodable data gives None instead of raising."""
+        self.assertIsNone(decode_frame(b'not an image'))
+
+    def test_no_hand_detected(self):
+        """Tests that a frame without a hand gives no prediction."""
+        img_data = encode(np.zeros((48, 64, 3), dtype=np.uint8))
+        self.assertIsNone(recognize_frame(img_data, HandTracker(FakeHands()), lambda x: self.fail('model called')))
+
+    def test_prediction_label(self):
+        """Tests that the landmarks of a detected hand are normalized and classified."""
+        points = np.random.default_rng(0).random((21, 3)) * 0.5 + 0.25
+        seen = []
+
+        def predict(landmarks):
+            seen.append(landmarks)
+            probabilities = np.zeros(len(labels))
+            probabilities[labels.index('B')] = 1.0
+            return probabilities
+
+        img_data = encode(np.full((48, 64, 3), 128, dtype=np.uint8))
+        self.assertEqual(recognize_frame(img_data, HandTracker(FakeHands(points)), predict), 'B')
+        self.assertEqual(seen[0].shape, (63,))
+        self.assertAlmostEqual(float(seen[0].min()), 0.0)
+        self.assertAlmostEqual(float(seen[0].max()), 1.0)
+
+
+class TestHandTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.img = np.zeros((200, 400, 3), dtype=np.uint8)
+        # A hand spanning x 0.4..0.5 and y 0.4..0.6 of the frame
+        self.points = np.array([[0.4 + 0.005 * i, 0.4 + 0.01 * i, 0.0] for i in range(21)])
+
+    def test_second_frame_is_cropped(self):
+        """Tests that the frame after a detection only passes the previous hand box to MediaPipe."""
+        hands = FakeHands(self.points)
+        tracker = HandTracker(hands, margin=0.5, min_size=16)
+        tracker.process(self.img)
+        self.assertEqual(hands.frames[0].shape, (200, 400, 3))
+        self.assertIsNotNone(tracker.box)
+        tracker.process(self.img)
+        self.assertLess(hands.frames[1].size, self.img.size)
+
+    def test_crop_landmarks_mapped_to_full_frame(self):
+        """Tests that landmarks found in the crop are returned in full-frame coordinates."""
+        hands = FakeHands(self.points)
+        tracker = HandTracker(hands, margin=0.5, min_size=16)
+        tracker.process(self.img)
+        x0, y0, x1, y1 = tracker.box
+        hands.points = np.tile([0.5, 0.5, 0.1], (21, 1))
+        points = tracker.process(self.img)
+        self.assertAlmostEqual(float(points[0, 0]), (x0 + 0.5 * (x1 - x0)) / 400, places=5)
+        self.assertAlmostEqual(float(points[0, 1]), (y0 + 0.5 * (y1 - y0)) / 200, places=5)
+        self.assertAlmostEqual(float(points[0, 2]), 0.1 * (x1 - x0) / 400, places=5)
+
+    def test_full_frame_fallback_when_hand_is_lost(self):
+        """Tests that a crop without a hand falls back to a full-frame pass."""
+        hands = FakeHands(self.points)
+        tracker = HandTracker(hands, margin=0.5, min_size=16)
+        tracker.process(self.img)
+        hands.points = None
+        self.assertIsNone(tracker.process(self.img))
+        self.assertEqual(hands.frames[-1].shape, (200, 400, 3))
+        self.assertIsNone(tracker.box)
+
+    def test_tracker_reset_when_switching_views(self):
+        """Tests that MediaPipe is reset on every switch between crops and full frames, but not in between."""
+        hands = FakeHands(self.points)
+        tracker = HandTracker(hands, margin=0.5, min_size=16)
+        tracker.process(self.img)  # Full frame
+        tracker.process(self.img)  # Crop
+        tracker.process(self.img)  # Crop
+        hands.points = None
+        tracker.process(self.img)  # Crop misses, then a full frame
+        hands.points = self.points
+        tracker.process(self.img)  # Full frame
+        tracker.process(self.img)  # Crop
+        self.assertEqual([frame.shape == self.img.shape for frame in hands.frames],
+                         [True, False, False, False, True, True, False])
+        # Reset before the first crop, the fallback full frame and the crop after it
+        self.assertEqual(hands.resets, [1, 4, 6])
+
+    def test_disabled_and_reset(self):
+        """Tests that every frame is processed in full with ROI tracking off or after a reset."""
+        hands = FakeHands(self.points)
+        tracker = HandTracker(hands, roi_tracking=False)
+        tracker.process(self.img)
+        tracker.process(self.img)
+        self.assertEqual(hands.frames[1].shape, (200, 400, 3))
+
+        tracker = HandTracker(hands, min_size=16)
+        tracker.process(self.img)
+        tracker.reset()
+        self.assertIsNone(tracker.box)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock, patch
+import unittest
+import sys
+import os
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from app.plans import PlanCatalog, plan_catalog
+
+PLANS = [
+    {'plan_id': 1, 'plan_name': 'Basic', 'daily_limit': 25, 'price': 0.0},
+    {'plan_id': 2, 'plan_name': 'Standard', 'daily_limit': 250, 'price': 19.99},
+    {'plan_id': 3, 'plan_name': 'Unlimited', 'daily_limit': None, 'price': 49.99},
+]
+
+
+def mock_connection(rows):
+    """Build a mocked database connection whose cursor returns the given rows."""
+    connection = MagicMock()
+    connection.cursor.return_value.fetchall.return_value = rows
+    return connection
+
+
+class TestPlanCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = mock_connection(PLANS)
+        self.connect = MagicMock(return_value=self.connection)
+        self.catalog = PlanCatalog(self.connect, ttl=300.0)
+
+    def test_reads_are_served_from_memory(self):
+        """Tests that the plans are loaded once and then read from memory."""
+        self.assertEqual([plan['plan_name'] for plan in self.catalog.plans()], ['Basic', 'Standard', 'Unlimited'])
+        self.assertEqual(self.catalog.get('Standard')['daily_limit'], 250)
+        self.assertIsNone(self.catalog.get('Gold'))
+        self.assertEqual(self.connect.call_count, 1)
+        self.connection.close.assert_called_once()
+
+    def test_returned_plans_are_copies(self):
+        """Tests that callers cannot modify the cached rows."""
+        self.catalog.plans()[0]['dollars'] = 0
+        self.assertNotIn('dollars', self.catalog.get('Basic'))
+
+    def test_ttl_expiry_and_invalidation_reload(self):
+        """Tests that an expired or invalidated catalog is reloaded and its ETag follows the content."""
+        etag = self.catalog.etag
+        self.catalog.ttl = 0.0
+        self.catalog.plans()
+        self.assertEqual(self.catalog.etag, etag)  # Same content, same ETag
+
+        self.connection.cursor.return_value.fetchall.return_value = PLANS[:2]
+        self.catalog.invalidate()
+        self.assertNotEqual(self.catalog.etag, etag)
+        self.assertEqual(len(self.catalog.plans()), 2)
+
+    def test_failed_reload_serves_previous_copy(self):
+        """Tests that a failed reload after expiry keeps the previous plans, but not after invalidation."""
+        self.catalog.plans()
+        self.catalog._expires = 0.0
+        self.connect.return_value = None
+        self.assertEqual(len(self.catalog.plans()), 3)
+        self.catalog.invalidate()
+        self.assertIsNone(self.catalog.plans())
+        self.assertGreaterEqual(self.catalog.stats()['load_errors'], 2)
+
+
+class TestPlanRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+        patcher = patch.object(plan_catalog, 'connect', return_value=mock_connection(PLANS))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(plan_catalog.invalidate)
+        plan_catalog.invalidate()
+
+    def test_get_plans_etag(self):
+        """Tests that /get-plans carries the catalog ETag and answers 304 to a matching If-None-Match."""
+        response = self.client.get('/get-plans')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json[1], {'plan_name': 'Standard', 'price': 19.99})
+        etag = response.headers['ETag']
+        revalidated = self.client.get('/get-plans', headers={'If-None-Match': etag})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.data, b'')
+
+    def test_get_plan_price_etag(self):
+        """Tests the price route, its ETag revalidation and an unknown plan."""
+        response = self.client.get('/get-plan-price/Unlimited')
+        self.assertEqual(response.json, 49.99)
+        revalidated = self.client.get('/get-plan-price/Unlimited', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(self.client.get('/get-plan-price/Gold').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+from unittest.mock import MagicMock, patch
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.quota import DEFAULT_LIMIT, QuotaContext, QuotaContexts, consume_sign, next_reset, resolve_quota
+
+
+class TestQuotaContexts(unittest.TestCase):
+
+    def setUp(self):
+        self.resolved = []
+
+        def resolve(username):
+            self.resolved.append(username)
+            return QuotaContext(username, 'Standard', 250, datetime.now() + timedelta(hours=1))
+
+        self.contexts = QuotaContexts(resolve, max_age=300.0)
+
+    def test_resolved_once_per_connection(self):
+        """Tests that frames of a connection reuse the context resolved on connect."""
+        self.contexts.open('sid', 'alice')
+        for _ in range(5):
+            self.assertEqual(self.contexts.get('sid', 'alice').daily_limit, 250)
+        self.assertEqual(self.resolved, ['alice'])
+        self.assertEqual(self.contexts.stats()['hits'], 5)
+
+    def test_plan_change_and_login_resolve_again(self):
+        """Tests that invalidating a user or a different username resolves the context again."""
+        self.contexts.open('sid', 'alice')
+        self.contexts.open('other', 'bob')
+        self.contexts.invalidate_user('alice')
+        self.contexts.get('sid', 'alice')
+        self.contexts.get('other', 'bob')
+        self.contexts.get('other', 'carol')
+        self.assertEqual(self.resolved, ['alice', 'bob', 'alice', 'carol'])
+
+    def test_reset_boundary_and_max_age(self):
+        """Tests that a context is resolved again after the reset boundary or its maximum age."""
+        context = self.contexts.open('sid', 'alice')
+        context.reset_at = datetime.now() - timedelta(seconds=1)
+        self.contexts.get('sid', 'alice')
+        self.contexts.max_age = 0.0
+        self.contexts.get('sid', 'alice')
+        self.assertEqual(len(self.resolved), 3)
+
+    def test_release(self):
+        """Tests that a disconnected socket drops its context."""
+        self.contexts.open('sid', 'alice')
+        self.contexts.release('sid')
+        self.assertEqual(self.contexts.stats()['contexts'], 0)
+
+
+class TestResolveQuota(unittest.TestCase):
+
+    def resolve(self, user_data, plan):
+        """Resolve the quota of 'alice' against a mocked users row and plan."""
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.fetchone.return_value = user_data
+        with patch('app.quota.create_connection', return_value=connection), \
+                patch('app.quota.plan_catalog') as catalog:
+            catalog.get.return_value = plan
+            return resolve_quota('alice'), cursor, connection
+
+    def test_limit_and_reset_boundary(self):
+        """Tests that the limit comes from the plan and the boundary is the coming midnight."""
+        context, cursor, connection = self.resolve({'plan_name': 'Standard'}, {'plan_name': 'Standard', 'daily_limit': 250})
+        self.assertEqual(context.daily_limit, 250)
+        self.assertEqual(context.reset_at, next_reset())
+        self.assertEqual(context.reset_at.time(), datetime.min.time())
+        self.assertEqual(cursor.execute.call_count, 1)
+        connection.commit.assert_not_called()  # Resets are left to the scheduler
+        connection.close.assert_called_once()
+
+    def test_unlimited_plan(self):
+        """Tests that a plan without a daily limit is unlimited."""
+        context, _, _ = self.resolve({'plan_name': 'Unlimited'}, {'plan_name': 'Unlimited', 'daily_limit': None})
+        self.assertEqual(context.daily_limit, float('inf'))
+
+    def test_guest_and_database_failure(self):
+        """Tests the default limit of guests, and that a failed read is not cached."""
+        context, _, _ = self.resolve(None, None)
+        self.assertEqual((context.daily_limit, context.stale), (DEFAULT_LIMIT, False))
+        with patch('app.quota.create_connection', return_value=None):
+            context = resolve_quota('alice')
+        self.assertEqual((context.daily_limit, context.stale), (DEFAULT_LIMIT, True))
+
+
+class TestConsumeSign(unittest.TestCase):
+
+    def consume(self, context, rowcount):
+        """Consume a sign of a context against a mocked UPDATE affecting rowcount rows."""
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.rowcount = rowcount
+        with patch('app.quota.create_connection', return_value=connection), \
+                patch('app.quota.usage_meter') as meter:
+            return consume_sign(context), cursor, meter
+
+    def test_one_conditional_update(self):
+        """Tests that a limited plan checks and counts the sign in one UPDATE."""
+        context = QuotaContext('alice', 'Basic', 50)
+        allowed, cursor, meter = self.consume(context, 1)
+        self.assertTrue(allowed)
+        self.assertEqual(cursor.execute.call_count, 1)
+        query, params = cursor.execute.call_args[0]
+        self.assertTrue(query.startswith('UPDATE users SET recognized_count = CASE WHEN last_reset IS NULL'))
+        self.assertIn('last_reset < CURDATE()', query)
+        self.assertEqual(params, ('alice', 50))
+        meter.record.assert_not_called()
+
+    def test_refused_at_limit(self):
+        """Tests that no affected row refuses the sign and exhausts the context."""
+        context = QuotaContext('alice', 'Basic', 50)
+        allowed, _, _ = self.consume(context, 0)
+        self.assertFalse(allowed)
+        self.assertTrue(context.exhausted)
+
+    def test_unlimited_plan_uses_meter(self):
+        """Tests that unlimited plans skip the check and are counted by the usage meter."""
+        allowed, cursor, meter = self.consume(QuotaContext('alice', 'Unlimited', float('inf')), 0)
+        self.assertTrue(allowed)
+        cursor.execute.assert_not_called()
+        meter.record.assert_called_once_with('alice')
+
+    def test_guest_counted_on_connection(self):
+        """Tests that guests are counted on their context across a new resolution, until midnight."""
+        contexts = QuotaContexts(lambda username: QuotaContext(username, None, 2, next_reset()))
+        context = contexts.open('sid', 'guest')
+        results = [self.consume(context, 0)[0] for _ in range(2)]
+        context.stale = True
+        context = contexts.get('sid', 'guest')
+        results.append(self.consume(context, 0)[0])
+        self.assertEqual(results, [True, True, False])
+        context.reset_at = datetime.now() - timedelta(seconds=1)
+        context = contexts.get('sid', 'guest')
+        self.assertTrue(self.consume(context, 0)[0])
+
+    def test_database_failure_allows(self):
+        """Tests that a sign is allowed and left to the meter when the database is unavailable."""
+        with patch('app.quota.create_connection', return_value=None), \
+                patch('app.quota.usage_meter') as meter:
+            self.assertTrue(consume_sign(QuotaContext('alice', 'Basic', 50)))
+        meter.record.assert_called_once_with('alice')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from app import app
 from app.routes import *
+from app.plans import plan_catalog
 
 class TestRoutes(unittest.TestCase):
     
@@ -84,6 +85,56 @@ class TestRoutes(unittest.TestCase):
             self.assertEqual(response.status_code, 200)  # Expects response status code 200 (OK)
     
     
+    @patch('app.routes.password_hasher')
+    @patch('app.routes.create_connection')
+    def test_login_rehashes_outdated_cost(self, mock_create_connection, mock_hasher):
+        """Tests that a successful login stores a new hash when the configured cost changed."""
+        connection = mock_create_connection.return_value
+        cursor = connection.cursor.return_value
+        cursor.fetchone.return_value = ('$2b$10$oldhash',)
+        mock_hasher.verify.return_value = True
+        mock_hasher.needs_rehash.return_value = True
+        mock_hasher.hash.return_value = '$2b$12$newhash'
+        response = self.app.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+        self.assertEqual(response.status_code, 200)
+        cursor.execute.assert_called_with(
+            "UPDATE users SET password = %s WHERE username = %s AND password = %s",
+            ('$2b$12$newhash', 'testuser', '$2b$10$oldhash'))
+        connection.commit.assert_called_once()
+
+    @patch('app.routes.password_hasher')
+    @patch('app.routes.create_connection')
+    def test_login_hasher_busy(self, mock_create_connection, mock_hasher):
+        """Tests that a saturated password hasher answers busy."""
+        mock_create_connection.return_value.cursor.return_value.fetchone.return_value = ('$2b$12$hash',)
+        mock_hasher.verify.side_effect = HasherBusy("Password hashing is busy.")
+        response = self.app.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+        self.assertEqual(response.status_code, 503)
+        mock_create_connection.return_value.close.assert_called_once()
+
+    @patch('app.routes.password_hasher')
+    @patch('app.routes.create_connection')
+    def test_login_verifies_without_connection(self, mock_create_connection, mock_hasher):
+        """Tests that the password is checked after the database connection was given back."""
+        connection = mock_create_connection.return_value
+        connection.cursor.return_value.fetchone.return_value = ('$2b$12$hash',)
+        mock_hasher.verify.side_effect = lambda password, hashed: connection.close.called
+        mock_hasher.needs_rehash.return_value = False
+        response = self.app.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+        self.assertEqual(response.status_code, 200)
+
+    @patch('app.routes.password_hasher')
+    @patch('app.routes.create_connection')
+    def test_register_hasher_busy(self, mock_create_connection, mock_hasher):
+        """Tests that registration answers busy without checking out a connection."""
+        mock_hasher.hash.side_effect = HasherBusy("Password hashing is busy.")
+        response = self.app.post('/register', data={
+            'username': 'newuser', 'name': 'New', 'surname': 'User', 'email': 'new@example.com',
+            'password': 'testpassword'})
+        self.assertEqual(response.status_code, 503)
+        mock_create_connection.assert_not_called()
+
+
     # register
     def test_register_get_request(self):
         """Tests whether the registration form is correctly rendered for GET requests."""
@@ -147,6 +198,50 @@ class TestRoutes(unittest.TestCase):
             self.assertIn(b'User Profile', response.data)  # Expects the user profile page to contain the phrase 'User Profile'
 
 
+    # get_user_data, get_payment_history
+    def test_payment_page_keyset(self):
+        """Tests that a payment page seeks past the cursor and returns the cursor of the next page."""
+        from datetime import date
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            {'payment_id': 9, 'payment_date': date(2024, 5, 2), 'amount': 19.99},
+            {'payment_id': 7, 'payment_date': date(2024, 5, 1), 'amount': 49.99},
+            {'payment_id': 4, 'payment_date': date(2024, 4, 1), 'amount': 19.99},
+        ]
+        payments, next_cursor = payment_page(cursor, 1, after=(date(2024, 6, 1), 12), limit=2)
+        self.assertEqual([payment['payment_id'] for payment in payments], [9, 7])
+        self.assertEqual(next_cursor, '2024-05-01:7')
+        self.assertEqual(parse_payment_cursor(next_cursor), (date(2024, 5, 1), 7))
+        query, params = cursor.execute.call_args[0]
+        self.assertIn('ORDER BY payment_date DESC, payment_id DESC LIMIT %s', query)
+        self.assertEqual(params, [1, date(2024, 6, 1), date(2024, 6, 1), 12, 3])
+
+        cursor.fetchall.return_value = cursor.fetchall.return_value[:2]
+        self.assertIsNone(payment_page(cursor, 1, limit=2)[1])
+
+    @patch('app.routes.create_connection')
+    def test_get_user_data_first_page(self, mock_create_connection):
+        """Tests that the profile returns only the displayed columns and the first payment page."""
+        cursor = mock_create_connection.return_value.cursor.return_value
+        cursor.fetchone.return_value = {'id': 1, 'username': 'test_user', 'email': 'test@example.com',
+                                        'name': 'Test', 'surname': 'User', 'plan_name': 'Basic'}
+        cursor.fetchall.return_value = []
+        with self.app.session_transaction() as sess:
+            sess['username'] = 'test_user'
+        response = self.app.get('/get-user-data')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('SELECT *', cursor.execute.call_args_list[0][0][0])
+        self.assertNotIn('id', response.json)
+        self.assertEqual(response.json['payment_history'], [])
+        self.assertIsNone(response.json['payment_history_next'])
+
+    def test_get_payment_history_invalid_cursor(self):
+        """Tests that a malformed cursor is rejected."""
+        with self.app.session_transaction() as sess:
+            sess['username'] = 'test_user'
+        response = self.app.get('/get-payment-history?after=yesterday')
+        self.assertEqual(response.status_code, 400)
+
     # purchase_form
     @patch('app.routes.render_template')
     @patch('app.routes.is_logged_in')
@@ -188,13 +283,17 @@ class TestRoutes(unittest.TestCase):
         response = self.app.get('/get_plan_price?plan_name=NonExistentPlan')
         self.assertEqual(response.status_code, 404)
 
-    @patch('app.routes.create_connection')
+    @patch.object(plan_catalog, 'connect')
     def test_get_plan_price_db_connection_failure(self, mock_create_connection):
+        """Tests retrieval of a price when the plan catalog cannot load the plans."""
         mock_create_connection.return_value = None
+        plan_catalog.invalidate()
+        self.addCleanup(plan_catalog.invalidate)  # Reload the real plans in later tests
 
-        response = get_plan_price("test_plan")
+        response = self.app.get('/get-plan-price/test_plan')
         self.assertEqual(response.status_code, 500)
-        self.assertEqual(response.json()['message'], "Failed to connect to the database.")
+        self.assertEqual(response.json['message'], "Failed to connect to the database.")
+        mock_create_connection.assert_called_once()
 
 
 
@@ -251,6 +350,36 @@ class TestRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 500)
         self.assertEqual(response.json, {"message": "SQL error"})
 
+    def post_purchase(self, status):
+        """Post a valid purchase of 'Standard' whose transaction reports the given status."""
+        with self.app.session_transaction() as sess:
+            sess['username'] = 'test_user'
+        form = {'newplan': 'Standard', 'cardNumber': '1234567812345678', 'cardName': 'Test User',
+                'expiryDate': '12/99', 'cvc': '123'}
+        with patch('app.routes.create_connection') as mock_create_connection, \
+                patch('app.routes.record_purchase', return_value=(status, None)) as mock_record_purchase, \
+                patch('app.routes.quota_contexts') as mock_quota_contexts:
+            response = self.app.post('/purchase_plan', json=form)
+        mock_record_purchase.assert_called_once_with(
+            mock_create_connection.return_value, 'test_user', 'Standard')
+        mock_create_connection.return_value.close.assert_called_once()
+        return response, mock_quota_contexts
+
+    def test_purchase_plan_single_transaction(self):
+        """Tests that a purchase is one transaction and refreshes the quota of the user."""
+        response, mock_quota_contexts = self.post_purchase('purchased')
+        self.assertEqual(response.status_code, 200)
+        mock_quota_contexts.invalidate_user.assert_called_once_with('test_user')
+
+    def test_purchase_plan_refused(self):
+        """Tests the responses to purchases refused by the transaction."""
+        response, mock_quota_contexts = self.post_purchase('same_plan')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json, {"message": "You cannot purchase a plan that is equal to your current plan."})
+        mock_quota_contexts.invalidate_user.assert_not_called()
+        response, _ = self.post_purchase('user_not_found')
+        self.assertEqual(response.status_code, 404)
+
 
     # interpreter
     @patch('app.routes.is_logged_in', return_value=True)
@@ -283,7 +412,7 @@ class TestRoutes(unittest.TestCase):
 
 
     #pricing 
-    @patch('app.routes.create_connection')
+    @patch.object(plan_catalog, 'connect')
     @patch('app.routes.format_price')
     @patch('app.routes.render_template')
     @patch('app.routes.is_logged_in')
@@ -296,6 +425,7 @@ class TestRoutes(unittest.TestCase):
             {'id': 2, 'plan_name': 'Premium', 'price': 20.99},
             {'id': 3, 'plan_name': 'Ultimate', 'price': 30.50}
         ]
+        plan_catalog.invalidate()  # Plans are read through the catalog
         mock_format_price.side_effect = lambda price: (int(price), int((price - int(price)) * 100))
 
         # Mocking is_logged_in function
@@ -370,6 +500,18 @@ class TestRoutes(unittest.TestCase):
         self.assertEqual(response, jsonify({"message": "Password reset email sent.", "reset_link": "http://127.0.0.1:5000/reset/fake_token"}))
 
 
+    @patch('app.routes.send_reset_email', return_value=False)
+    @patch('app.routes.create_connection')
+    def test_reset_password_outbox_full(self, mock_create_connection, mock_send_reset_email):
+        """Tests that the reset token is not stored when its email cannot be queued."""
+        mock_connection = mock_create_connection.return_value
+        mock_connection.cursor.return_value.fetchone.return_value = {'email': 'test@example.com'}
+        response = self.app.post('/reset_password', json={'email': 'test@example.com'})
+        self.assertEqual(response.status_code, 503)
+        mock_connection.rollback.assert_called_once()
+        mock_connection.commit.assert_not_called()
+
+
     #reset_with_token
     @patch('app.routes.render_template')
     @patch('app.routes.redirect')
@@ -384,16 +526,16 @@ class TestRoutes(unittest.TestCase):
         mock_render_template.assert_called_once_with('reset_password.html', token='token123')
 
     @patch('app.routes.flash')
-    @patch('app.routes.bcrypt')
+    @patch('app.routes.password_hasher')
     @patch('app.routes.create_connection')
     @patch('app.routes.redirect')
     @patch('app.routes.url_for')
-    def test_reset_with_token_successful_reset(self, mock_url_for, mock_redirect, mock_create_connection, mock_bcrypt, mock_flash):
+    def test_reset_with_token_successful_reset(self, mock_url_for, mock_redirect, mock_create_connection, mock_hasher, mock_flash):
         """Test reset_with_token function successfully resets password."""
         # Mocking request method and providing form data
         with app.test_request_context('/reset/token123', method='POST', data={'password': 'newpassword', 'confirm_password': 'newpassword'}):
-            # Mocking bcrypt hashpw
-            mock_bcrypt.hashpw.return_value = b'hashed_password'
+            # Mocking the password hasher
+            mock_hasher.hash.return_value = 'hashed_password'
 
             # Mocking database connection
             mock_connection = mock_create_connection.return_value
@@ -406,7 +548,8 @@ class TestRoutes(unittest.TestCase):
             mock_cursor.execute.assert_called_once()
             mock_connection.commit.assert_called_once()
             mock_flash.assert_called_with("Password reset successfully.", "success")
-            mock_redirect.assert_called_with(url_for('login'))
+            mock_url_for.assert_called_with('login')
+            mock_redirect.assert_called_with(mock_url_for.return_value)
             
             
     #reset_password_link           
@@ -0,0 +1,83 @@
+from unittest.mock import patch
+import unittest
+import sys
+import os
+import threading
+import time
+
+import numpy as np
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.runtime import ModelRuntime
+
+
+class FakeBackend:
+    """Records the shapes it was called with."""
+
+    def __init__(self):
+        self.shapes = []
+
+    def predict(self, x):
+        self.shapes.append(np.shape(x))
+        return np.zeros((29,)) if np.ndim(x) == 1 else np.zeros((len(x), 29))
+
+
+class TestModelRuntime(unittest.TestCase):
+
+    def test_lazy_single_load(self):
+        """Tests that the model is loaded on first use, once, also under concurrent first calls."""
+        loads = []
+
+        def slow_load(name, path):
+            loads.append(path)
+            time.sleep(0.05)
+            return FakeBackend()
+
+        with patch('app.runtime.load_backend', side_effect=slow_load):
+            runtime = ModelRuntime('numpy', 'model.h5')
+            self.assertFalse(runtime.stats()['loaded'])
+            threads = [threading.Thread(target=runtime.predict, args=(np.zeros(63),)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(loads, ['model.h5'])
+        self.assertTrue(runtime.stats()['loaded'])
+        # The first prediction paid for the load, the runtime is ready without a warm-up
+        self.assertTrue(runtime.ready())
+
+    def test_warm_up(self):
+        """Tests that the warm-up runs dummy inferences and the further steps, then sets ready."""
+        backend = FakeBackend()
+        steps = []
+        with patch('app.runtime.load_backend', return_value=backend):
+            runtime = ModelRuntime('numpy', 'model.h5', batch_sizes=(1, 32), warm_ups=[lambda: steps.append(1)])
+            self.assertTrue(runtime.warm_up())
+        self.assertEqual(backend.shapes, [(63,), (1, 63), (32, 63)])
+        self.assertEqual(steps, [1])
+        self.assertTrue(runtime.ready())
+        self.assertGreater(runtime.stats()['warmup_ms'], 0.0)
+
+    def test_failed_warm_up(self):
+        """Tests that a failed warm-up leaves the runtime not ready and reports the error."""
+        with patch('app.runtime.load_backend', side_effect=OSError('missing model')), patch('builtins.print'):
+            runtime = ModelRuntime('numpy', 'missing.h5')
+            self.assertFalse(runtime.warm_up())
+        self.assertFalse(runtime.ready())
+        self.assertEqual(runtime.stats()['error'], 'missing model')
+
+    def test_background_warm_up(self):
+        """Tests that the warm-up can run in a background thread."""
+        with patch('app.runtime.load_backend', return_value=FakeBackend()):
+            runtime = ModelRuntime('numpy', 'model.h5')
+            runtime.start_warm_up()
+            runtime.start_warm_up()
+            runtime._warming.join(timeout=5)
+        self.assertTrue(runtime.ready())
+        self.assertEqual(runtime.stats()['loads'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+from unittest.mock import MagicMock, patch
+import unittest
+import sys
+import os
+from datetime import date
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.scheduler import DailyJob
+
+
+class TestDailyJob(unittest.TestCase):
+
+    def make_job(self, claim_rowcounts, finished_at=None, rows=3):
+        """Create a job against a mocked job_runs table."""
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        rowcounts = iter(claim_rowcounts)
+
+        def execute(query, params):
+            cursor.rowcount = next(rowcounts) if query.startswith(('INSERT', 'UPDATE job_runs SET started_at')) else 1
+        cursor.execute.side_effect = execute
+        cursor.fetchone.return_value = (finished_at,)
+        self.runs = []
+
+        def work(day):
+            self.runs.append(day)
+            return rows
+        return DailyJob('quota_reset', work, lambda: connection), cursor
+
+    def statements(self, cursor):
+        return [call[0][0] for call in cursor.execute.call_args_list]
+
+    def test_claims_and_finishes(self):
+        """Tests that the first process claims the day, runs the job and marks it finished."""
+        job, cursor = self.make_job([1])
+        self.assertEqual(job.run_once(date(2024, 5, 1)), 'ran')
+        self.assertEqual(self.runs, [date(2024, 5, 1)])
+        self.assertTrue(self.statements(cursor)[-1].startswith('UPDATE job_runs SET finished_at'))
+        self.assertEqual(job.stats()['rows_affected'], 3)
+
+    def test_other_process_ran_or_running(self):
+        """Tests that a day claimed by another process is not run again."""
+        job, _ = self.make_job([0], finished_at=date(2024, 5, 1))
+        self.assertEqual(job.run_once(date(2024, 5, 1)), 'done')
+        job, _ = self.make_job([0, 0])
+        self.assertEqual(job.run_once(date(2024, 5, 1)), 'busy')
+        self.assertEqual(self.runs, [])
+
+    def test_stale_claim_taken_over(self):
+        """Tests that an unfinished claim of a dead process is taken over."""
+        job, _ = self.make_job([0, 1])
+        self.assertEqual(job.run_once(date(2024, 5, 1)), 'ran')
+
+    def test_failure_releases_claim(self):
+        """Tests that a failed job drops its claim so that it is attempted again."""
+        job, cursor = self.make_job([1], rows=None)
+        self.assertEqual(job.run_once(date(2024, 5, 1)), 'failed')
+        self.assertTrue(self.statements(cursor)[-1].startswith('DELETE FROM job_runs'))
+        self.assertEqual(job.stats()['failures'], 1)
+
+    def test_database_unavailable(self):
+        """Tests that the job does not run without a database."""
+        job = DailyJob('quota_reset', MagicMock(), lambda: None)
+        self.assertEqual(job.run_once(date(2024, 5, 1)), 'failed')
+        job.job.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+from unittest.mock import MagicMock, patch
+import unittest
+import sys
+import os
+import time
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import models, server
+from app.frame_workers import FrameTooLarge
+from app.quota import QuotaContext
+from app.runtime import ModelRuntime
+
+
+class TestStartup(unittest.TestCase):
+
+    @patch.object(server.quota_reset, 'start')
+    @patch.object(server.plan_catalog, 'load')
+    @patch('app.server.check_schema')
+    def test_startup(self, mock_check_schema, mock_load, mock_start):
+        """Tests that startup checks the schema, loads the plans and starts the daily reset."""
+        with patch.object(server.config, 'QUOTA_RESET_SCHEDULER', True):
+            server.startup()
+        mock_check_schema.assert_called_once()
+        mock_load.assert_called_once()
+        mock_start.assert_called_once()
+
+    @patch.object(server.quota_reset, 'start')
+    @patch.object(server.plan_catalog, 'load')
+    @patch('app.server.check_schema')
+    def test_startup_warms_up_model(self, mock_check_schema, mock_load, mock_start):
+        """Tests that the model warm-up is started by startup, and only when it is enabled."""
+        runtime = MagicMock()
+        with patch.object(server, 'model_runtime', runtime):
+            with patch.object(server.config, 'MODEL_WARMUP', False):
+                server.startup()
+            runtime.start_warm_up.assert_not_called()
+            with patch.object(server.config, 'MODEL_WARMUP', True):
+                server.startup()
+        runtime.start_warm_up.assert_called_once()
+
+    @patch.object(server.quota_reset, 'start')
+    @patch.object(server.plan_catalog, 'load')
+    @patch('app.server.check_schema')
+    def test_startup_without_scheduler(self, mock_check_schema, mock_load, mock_start):
+        """Tests that the daily reset is left to another process when the scheduler is off."""
+        with patch.object(server.config, 'QUOTA_RESET_SCHEDULER', False):
+            server.startup()
+        mock_start.assert_not_called()
+
+
+
+class TestReadinessWithoutStartup(unittest.TestCase):
+    """The application served by a WSGI server or 'flask run', which do not call startup()."""
+
+    def setUp(self):
+        backend = MagicMock()
+        patcher = patch('app.runtime.load_backend', return_value=backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.runtime = ModelRuntime('numpy', 'model.h5')
+        for patcher in (patch.object(models, 'model_runtime', self.runtime),
+                        patch.object(models, 'frame_pool', None),
+                        patch.object(models.config, 'MODEL_WARMUP', True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_first_probe_starts_warm_up(self):
+        """Tests that the first readiness check starts the warm-up, which then makes /ready answer 200."""
+        client = server.app.test_client()
+        self.assertEqual(client.get('/ready').status_code, 503)
+        deadline = time.monotonic() + 5.0
+        while not models.is_ready() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(client.get('/ready').status_code, 200)
+
+    def test_lazy_load_marks_ready(self):
+        """Tests that a model loaded by a prediction makes the process ready."""
+        self.runtime.predict(MagicMock())
+        self.assertTrue(models.is_ready())
+
+
+
+class TestFrameRejections(unittest.TestCase):
+
+    @patch.object(models.quota_contexts, 'get', return_value=QuotaContext('guest', None, 100))
+    @patch.object(models.quota_contexts, 'open')
+    def test_frame_too_large_is_answered(self, mock_open, mock_get):
+        """Tests that a frame too large for the frame workers gets an answer instead of none."""
+        frame_pool = MagicMock(slot_size=1024)
+        frame_pool.submit.side_effect = FrameTooLarge("Frame of 2048 bytes exceeds the slot size of 1024 bytes.")
+        with patch.object(models, 'frame_pool', frame_pool), patch.object(models.config, 'MODEL_WARMUP', False):
+            client = server.socketio.test_client(server.app)
+            with self.assertLogs('app.models', 'WARNING'):
+                client.emit('image', {'image': bytes(2048)})
+            received = client.get_received()
+            client.disconnect()
+        self.assertEqual(received[-1]['name'], 'frame_too_large')
+        self.assertEqual(received[-1]['args'], [{'max_size': 1024}])
+
+
+if __name__ == '__main__':
+    unittest.main()
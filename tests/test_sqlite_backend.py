@@ -0,0 +1,162 @@
+from unittest.mock import patch
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mysql.connector import errorcode
+from mysql.connector.errors import IntegrityError, ProgrammingError
+
+from app import database
+from app.db_pool import ConnectionPool
+from app.migrations import LATEST_VERSION, check_schema, migrate
+from app.quota import QuotaContext, consume_sign
+from app.routes import parse_payment_cursor, payment_page
+from app.scheduler import DailyJob
+from app.sqlite_backend import translate
+
+
+class TestTranslate(unittest.TestCase):
+
+    def test_dialect(self):
+        """Tests the translation of the MySQL statements used by the application."""
+        self.assertEqual(translate("SELECT id FROM users WHERE username = %s"), "SELECT id FROM users WHERE username = ?")
+        self.assertIn('INSERT OR IGNORE', translate("INSERT IGNORE INTO job_runs (job_name) VALUES (%s)"))
+        self.assertIn('INTEGER PRIMARY KEY AUTOINCREMENT', translate("CREATE TABLE t (id INT AUTO_INCREMENT PRIMARY KEY)"))
+        self.assertIn("date('now', 'localtime')", translate("INSERT INTO payments (payment_date) VALUES (CURDATE())"))
+
+    def test_update_limit(self):
+        """Tests that UPDATE ... LIMIT becomes a rowid subquery."""
+        self.assertEqual(
+            translate("UPDATE users SET recognized_count = 0 WHERE plan_name = %s LIMIT %s"),
+            "UPDATE users SET recognized_count = 0 WHERE rowid IN "
+            "(SELECT rowid FROM users WHERE plan_name = ? LIMIT ?)")
+
+
+class TestSQLiteBackend(unittest.TestCase):
+    """Runs the database code of the application against a migrated SQLite database."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='sli-sqlite-')
+        pool = ConnectionPool(database.connect, max_size=2)
+        self.patches = [
+            patch('app.config.DB_BACKEND', 'sqlite'),
+            patch('app.config.SQLITE_PATH', os.path.join(self.directory, 'sli.db')),
+            patch('app.database.db_pool', pool),
+            patch('builtins.print'),
+        ]
+        for p in self.patches:
+            p.start()
+        self.pool = pool
+        self.assertEqual(migrate(), LATEST_VERSION)
+        self.connection = database.create_connection()
+        self.cursor = self.connection.cursor(dictionary=True)
+        self.cursor.execute(
+            "INSERT INTO users (username, email, password, plan_name) VALUES (%s, %s, %s, %s)",
+            ('alice', 'alice@example.com', 'x', 'Basic'))
+        self.connection.commit()
+
+    def tearDown(self):
+        self.cursor.close()
+        self.connection.close()
+        self.pool.close()
+        for p in reversed(self.patches):
+            p.stop()
+        shutil.rmtree(self.directory)
+
+    def test_wal_mode_and_schema(self):
+        """Tests that the database runs in WAL mode and the schema is up to date."""
+        self.cursor.execute("PRAGMA journal_mode")
+        self.assertEqual(self.cursor.fetchone()['journal_mode'], 'wal')
+        self.assertTrue(check_schema())
+        self.assertEqual(migrate(), LATEST_VERSION)  # Applying again is a no-op
+
+    def test_duplicate_entry(self):
+        """Tests that a unique violation is raised as the MySQL duplicate entry error."""
+        with self.assertRaises(IntegrityError) as raised:
+            self.cursor.execute(
+                "INSERT INTO users (username, email, password) VALUES (%s, %s, %s)", ('alice', 'other@example.com', 'x'))
+        self.assertEqual(raised.exception.errno, errorcode.ER_DUP_ENTRY)
+
+    def test_purchase_procedure(self):
+        """Tests the purchase_plan procedure of the SQLite backend."""
+        self.assertEqual(database.record_purchase(self.connection, 'alice', 'Standard'), ('purchased', 19.99))
+        self.assertEqual(database.record_purchase(self.connection, 'alice', 'Standard'), ('same_plan', None))
+        self.assertEqual(database.record_purchase(self.connection, 'bob', 'Standard'), ('user_not_found', None))
+        self.assertEqual(database.record_purchase(self.connection, 'alice', 'Gold'), ('plan_not_found', None))
+        self.cursor.execute("SELECT plan_name FROM users WHERE username = %s", ('alice',))
+        self.assertEqual(self.cursor.fetchone()['plan_name'], 'Standard')
+        self.cursor.execute("SELECT amount, payment_date FROM payments")
+        self.assertEqual(self.cursor.fetchall(), [{'amount': 19.99, 'payment_date': date.today()}])
+        with self.assertRaises(ProgrammingError):
+            self.connection.cursor().callproc('missing_procedure')
+
+    def test_purchase_procedure_refuses_open_transaction(self):
+        """Tests that the purchase procedure leaves an open transaction of the caller alone."""
+        self.cursor.execute("UPDATE users SET email = %s WHERE username = %s", ('new@example.com', 'alice'))
+        with self.assertRaises(ProgrammingError):
+            database.record_purchase(self.connection, 'alice', 'Standard')
+        self.assertTrue(self.connection.in_transaction)
+        self.connection.rollback()
+        self.cursor.execute("SELECT email, plan_name FROM users WHERE username = %s", ('alice',))
+        self.assertNotEqual(self.cursor.fetchone()['email'], 'new@example.com')
+        self.assertEqual(database.record_purchase(self.connection, 'alice', 'Standard'), ('purchased', 19.99))
+
+    def test_quota_and_daily_reset(self):
+        """Tests the conditional increment and the chunked daily reset."""
+        context = QuotaContext('alice', 'Basic', 2)
+        self.assertEqual([consume_sign(context) for _ in range(3)], [True, True, False])
+        # The signs were counted yesterday
+        self.cursor.execute(
+            "UPDATE users SET last_reset = %s WHERE username = %s", (datetime.now() - timedelta(days=1), 'alice'))
+        self.connection.commit()
+        self.assertEqual(database.reset_recognized_count(chunk_size=1), 1)
+        self.cursor.execute("SELECT recognized_count, last_reset FROM users WHERE username = %s", ('alice',))
+        row = self.cursor.fetchone()
+        self.assertEqual(row['recognized_count'], 0)
+        self.assertIsInstance(row['last_reset'], datetime)
+        self.assertEqual(database.reset_recognized_count(), 0)
+
+    def test_quota_reset_without_scheduler(self):
+        """Tests that a count from before today is reset by the conditional increment itself."""
+        self.cursor.execute(
+            "UPDATE users SET recognized_count = %s, last_reset = %s WHERE username = %s",
+            (2, datetime.now() - timedelta(days=2), 'alice'))
+        self.connection.commit()
+        context = QuotaContext('alice', 'Basic', 2)
+        self.assertEqual([consume_sign(context) for _ in range(3)], [True, True, False])
+        self.cursor.execute("SELECT recognized_count, last_reset FROM users WHERE username = %s", ('alice',))
+        row = self.cursor.fetchone()
+        self.assertEqual(row['recognized_count'], 2)
+        self.assertEqual(row['last_reset'].date(), date.today())
+        # Counts started today are left to the next midnight
+        self.assertEqual(database.reset_recognized_count(), 0)
+
+    def test_job_claimed_once(self):
+        """Tests that a daily job claimed in job_runs runs once."""
+        runs = []
+        job = DailyJob('test', lambda day: runs.append(day) or 0, database.create_connection)
+        self.assertEqual(job.run_once(date(2024, 5, 1)), 'ran')
+        self.assertEqual(job.run_once(date(2024, 5, 1)), 'done')
+        self.assertEqual(runs, [date(2024, 5, 1)])
+
+    def test_payment_page(self):
+        """Tests the keyset pagination of the payment history."""
+        self.cursor.executemany(
+            "INSERT INTO payments (user_id, payment_date, amount) VALUES (1, %s, %s)",
+            [(date(2024, 5, day), day) for day in range(1, 6)])
+        self.connection.commit()
+        payments, next_cursor = payment_page(self.cursor, 1, limit=3)
+        self.assertEqual([payment['amount'] for payment in payments], [5, 4, 3])
+        payments, next_cursor = payment_page(self.cursor, 1, parse_payment_cursor(next_cursor), limit=3)
+        self.assertEqual([payment['amount'] for payment in payments], [2, 1])
+        self.assertIsNone(next_cursor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+from mysql.connector import Error
+
+# Adjust the import path based on your project structure
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.usage import UsageMeter
+
+
+class FakeCursor:
+    """Stand-in for a MySQL cursor recording executed statements."""
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def execute(self, query, params=()):
+        if self.owner.fail:
+            raise Error("Lost connection")
+        self.owner.statements.append((query, list(params)))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Stand-in for a pooled MySQL connection."""
+
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.fail = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+class TestUsageMeter(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = FakeConnection()
+        self.meter = UsageMeter(lambda: self.connection, flush_interval=60.0, max_pending=1000)
+
+    def tearDown(self):
+        self.meter.close()
+
+    def test_counts_are_batched_into_one_update(self):
+        """Tests that counts of several users are written by a single multi-row UPDATE."""
+        for username in ('alice', 'bob', 'alice', 'alice'):
+            self.meter.record(username)
+        self.assertEqual(self.meter.pending('alice'), 3)
+        self.assertEqual(self.connection.statements, [])
+        self.assertEqual(self.meter.flush(), 2)
+        self.assertEqual(len(self.connection.statements), 1)
+        query, params = self.connection.statements[0]
+        self.assertIn('CASE username', query)
+        self.assertEqual(params, ['alice', 3, 'bob', 1, 'alice', 'bob'])
+        self.assertEqual(self.meter.pending('alice'), 0)
+
+    def test_failed_flush_keeps_counts(self):
+        """Tests that counts survive a failed write and are merged with new ones."""
+        self.meter.record('alice', 2)
+        self.connection.fail = True
+        self.assertEqual(self.meter.flush(), 0)
+        self.meter.record('alice')
+        self.assertEqual(self.meter.pending('alice'), 3)
+        self.connection.fail = False
+        self.meter.flush()
+        self.assertEqual(self.connection.statements[0][1][:2], ['alice', 3])
+        self.assertEqual(self.meter.stats()['errors'], 1)
+
+    def test_size_threshold_triggers_flush(self):
+        """Tests that the background thread flushes as soon as enough users are pending."""
+        self.meter.max_pending = 2
+        self.meter.record('alice')
+        self.meter.record('bob')
+        for _ in range(100):
+            if self.connection.statements:
+                break
+            self.meter._worker.join(0.01)
+        self.assertEqual(len(self.connection.statements), 1)
+
+    def test_close_flushes_and_discard_drops(self):
+        """Tests that closing the meter writes pending counts and that discarded counts are not written."""
+        self.meter.record('alice')
+        self.meter.record('bob')
+        self.meter.discard('bob')
+        self.meter.close()
+        self.assertEqual(self.connection.statements[0][1], ['alice', 1, 'alice'])
+
+
+if __name__ == '__main__':
+    unittest.main()